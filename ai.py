@@ -0,0 +1,193 @@
+"""
+Computer opponents for Tic Tac Toe.
+
+NegamaxPlayer searches the game tree with alpha-beta pruning and a transposition table. Positions that are rotations
+or reflections of each other share one table entry, which cuts the 3x3 tree by close to a factor of eight. Search
+deepens one move at a time until the time budget runs out, so a move is always ready within one frame. On grids larger
+than 4x4 a ThreatTracker follows the search, so each position branches over the few boxes its open lines rank highest
+and leaves are scored from line values it keeps up to date.
+"""
+import time
+
+from symmetry import canonical_key, symmetry_tables
+from threats import ThreatTracker
+
+
+# Score of a won position. Wins found sooner score higher, so the search goes for the quickest win it can see
+WIN = 100000
+
+# Transposition table flags: the stored value is exact, a lower bound or an upper bound
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Grids with at most this many boxes are searched over every empty box, which keeps play perfect on 3x3 and 4x4
+EXHAUSTIVE_SIZE = 16
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class NegamaxPlayer(object):
+    """
+    Alpha-beta negamax search with iterative deepening and a transposition table folded by symmetry.
+    Given enough time it plays perfectly on 3x3 and 4x4 grids
+    """
+
+    def __init__(self, time_budget=1.0 / 30, max_table_size=1000000, threat_moves=16):
+        """
+        :param time_budget: seconds allowed per move. The default fits in one frame of the 30 FPS game loop
+        :param max_table_size: number of positions kept in the transposition table before it is cleared
+        :param threat_moves: on grids larger than 4x4, the number of boxes searched in each position, best first by
+                             ThreatTracker.ranked; None searches every empty box on any grid
+        """
+        self.time_budget = time_budget
+        self.max_table_size = max_table_size
+        self.threat_moves = threat_moves
+        self.tracker = None
+        self.table = {}
+        self.rules = None
+        self.order = None
+        self.deadline = None
+        self.nodes = 0
+
+    def choose_move(self, game):
+        """
+        Picks a move for the player whose turn it is. The game itself is not changed
+        :param game: GameState
+        :return: box index
+        """
+        moves = game.legal_moves()
+        if not moves:
+            raise ValueError('The game is over')
+        if len(moves) == 1:
+            return moves[0]
+        # The table depends on the rules, so it starts again if the grid or win length changes
+        rules = (game.grid_size, game.win_length)
+        if rules != self.rules or len(self.table) > self.max_table_size:
+            self.table = {}
+            self.rules = rules
+            self.order = sorted(range(game.size), key=lambda index: -len(game.cell_lines[index]))
+
+        start = time.perf_counter()
+        best_move = None
+        for depth in range(1, len(moves) + 1):
+            # The first iteration always finishes, so there is a move to return however small the budget
+            self.deadline = float('inf') if depth == 1 else start + self.time_budget
+            search_game = game.copy()
+            self.tracker = None
+            if self.threat_moves and game.size > EXHAUSTIVE_SIZE:
+                self.tracker = ThreatTracker(search_game)
+            try:
+                value = self.search(search_game, depth, -WIN - 1, WIN + 1)
+            except _OutOfTime:
+                break
+            best_move = self.table_move(game)
+            if abs(value) > WIN - game.size - 1:
+                break
+            if time.perf_counter() - start > self.time_budget / 2:
+                # The next depth would take several times longer than this one
+                break
+        return best_move
+
+    def table_move(self, game):
+        """
+        Looks up the best move stored for a position, mapped back from the position's canonical form
+        :param game: GameState
+        :return: box index, or None if the position is not in the table
+        """
+        key, symmetry = canonical_key(game)
+        entry = self.table.get(key)
+        if entry is None or entry[3] is None:
+            return None
+        return symmetry_tables(game.grid_size)[1][symmetry][entry[3]]
+
+    def evaluate(self, game):
+        """
+        Scores a position that is not searched any further, for the player whose turn it is. Each line still open to
+        only one player counts for that player, more so the more of it they hold
+        :param game: GameState
+        :return: int
+        """
+        if self.tracker is not None:
+            totals = self.tracker.totals
+            return totals[game.turn] - totals[3 - game.turn]
+        me = game.counts[game.turn]
+        them = game.counts[3 - game.turn]
+        score = 0
+        for mine, theirs in zip(me, them):
+            if mine and not theirs:
+                score += 1 << (2 * mine)
+            elif theirs and not mine:
+                score -= 1 << (2 * theirs)
+        return score
+
+    def search(self, game, depth, alpha, beta):
+        """
+        Scores a position for the player whose turn it is, searching up to depth moves ahead
+        :param game: GameState that is changed during the search and restored afterwards
+        :param depth: number of moves to look ahead
+        :param alpha: score the player to move is already assured of
+        :param beta: score the opponent is already assured of
+        :return: int
+        """
+        self.nodes += 1
+        if not self.nodes & 255 and time.perf_counter() > self.deadline:
+            raise _OutOfTime()
+        if game.winner:
+            # The player who just moved has won
+            return game.moves - WIN
+        empty = game.size - game.moves
+        if not empty:
+            return 0
+        if depth == 0:
+            return self.evaluate(game)
+        # Searching further than the number of empty boxes gives the same answer, so those depths share an entry
+        depth = min(depth, empty)
+
+        key, symmetry = canonical_key(game)
+        permutations, inverses = symmetry_tables(game.grid_size)
+        entry = self.table.get(key)
+        first = None
+        if entry is not None:
+            entry_depth, value, flag, move = entry
+            first = inverses[symmetry][move]
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        alpha_start = alpha
+        best_value = -WIN - 1
+        best_move = None
+        if self.tracker is None:
+            occupied = game.occupied
+            moves = [index for index in self.order if not occupied & (1 << index) and index != first]
+        else:
+            moves = [index for index in self.tracker.ranked(game.turn, self.threat_moves) if index != first]
+        if first is not None:
+            moves.insert(0, first)
+        for move in moves:
+            game.place(move)
+            value = -self.search(game, depth - 1, -beta, -alpha)
+            game.undo()
+            if value > best_value:
+                best_value = value
+                best_move = move
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break
+
+        if best_value <= alpha_start:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (depth, best_value, flag, permutations[symmetry][best_move])
+        return best_value
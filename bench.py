@@ -0,0 +1,249 @@
+"""
+Benchmarks for the rules, rendering and AI hot paths.
+
+Each benchmark is run for every grid size and timed over enough calls to fill its share of a time budget, several
+times over; the median time per call is kept. Results are written as JSON so runs from two commits can be compared:
+
+    python bench.py --output before.json
+    python bench.py --output after.json
+    python bench.py --compare before.json after.json    (exits with 1 if anything got slower than the threshold)
+
+Rendering runs on SDL's dummy video driver, so no window is opened.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from ai import NegamaxPlayer
+from lib import Board
+from mcts import MCTSPlayer
+
+
+GRID_SIZES = (3, 5, 15, 50)
+
+# Marks in a row needed to win for each benchmarked grid size
+WIN_LENGTHS = {3: 3, 5: 4, 15: 5, 50: 5}
+
+# A result more than this many times slower than the one it is compared with counts as a regression
+THRESHOLD = 1.25
+
+
+def box_size(grid_size):
+    """
+    Picks a box size that keeps the window around 600 pixels
+    :param grid_size: number of boxes along one side of the grid
+    :return: pixels
+    """
+    return max(4, 600 // grid_size)
+
+
+def played_board(grid_size, headless=True, fraction=0.5, seed=0):
+    """
+    Makes a board partway through a game of random moves that nobody has won yet
+    :param grid_size: number of boxes along one side of the grid
+    :param headless: False to draw on a surface
+    :param fraction: share of the boxes to mark
+    :param seed: seed for the moves
+    :return: Board
+    """
+    board = Board(grid_size, box_size(grid_size), 10, 1, headless=headless, win_length=WIN_LENGTHS[grid_size])
+    generator = random.Random(seed)
+    moves = board.game.legal_moves()
+    generator.shuffle(moves)
+    for index in moves[:int(len(moves) * fraction)]:
+        board.play_turn(board.boxes[index])
+        if board.check_for_winner():
+            board.undo()
+    return board
+
+
+def bench_setup(grid_size):
+    board = Board(grid_size, box_size(grid_size), 10, 1, headless=True, win_length=WIN_LENGTHS[grid_size])
+    return board.setup
+
+
+def bench_check_for_winner(grid_size):
+    return played_board(grid_size).check_for_winner
+
+
+def bench_check_game_over(grid_size):
+    return played_board(grid_size).check_game_over
+
+
+def bench_get_box_at_pixel(grid_size):
+    board = played_board(grid_size)
+    generator = random.Random(0)
+    width = 2 * board.border + grid_size * board.box_size + (grid_size - 1) * board.line_width
+    pixels = [(generator.randrange(width), generator.randrange(width)) for _ in range(100)]
+    get_box_at_pixel = board.get_box_at_pixel
+
+    def run():
+        for x, y in pixels:
+            get_box_at_pixel(x, y)
+    # Times one lookup, not the hundred
+    run.calls = len(pixels)
+    return run
+
+
+def bench_render_move(grid_size):
+    board = played_board(grid_size, headless=False)
+    board.game.remove_observer(board.sounds)
+    index = board.game.legal_moves()[0]
+    box = board.boxes[index]
+
+    def run():
+        # Draws a mark and clears it again, and pushes both boxes to the display as the game loop would
+        board.play_turn(box)
+        board.undo()
+        pygame.display.update(board.pop_dirty_rects())
+    run.calls = 2
+    return run
+
+
+def bench_negamax_move(grid_size):
+    if grid_size != 3:
+        # Only the 3x3 grid is searched to the end; larger grids stop at the time budget, so the rate is fixed
+        return None
+    board = played_board(grid_size, fraction=0)
+
+    def run():
+        NegamaxPlayer(time_budget=60).choose_move(board.game)
+    return run
+
+
+def bench_mcts_move(grid_size):
+    board = played_board(grid_size, fraction=0.1)
+
+    def run():
+        MCTSPlayer(iterations=100, time_budget=None, seed=0).choose_move(board.game)
+    return run
+
+
+BENCHMARKS = (
+    ('setup', bench_setup),
+    ('check_for_winner', bench_check_for_winner),
+    ('check_game_over', bench_check_game_over),
+    ('get_box_at_pixel', bench_get_box_at_pixel),
+    ('render_move', bench_render_move),
+    ('negamax_move', bench_negamax_move),
+    ('mcts_move', bench_mcts_move),
+)
+
+
+def measure(function, min_time=0.2, repeat=5):
+    """
+    Times a function
+    :param function: callable taking no arguments; a calls attribute says how many operations one call makes
+    :param min_time: seconds to spend over all repeats
+    :param repeat: number of timed runs
+    :return: median seconds per operation
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat:
+            break
+        number *= 10 if elapsed < min_time / repeat / 10 else 2
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+    times.sort()
+    return times[len(times) // 2] / getattr(function, 'calls', 1)
+
+
+def run_benchmarks(grid_sizes=GRID_SIZES, names=None, min_time=0.2, repeat=5):
+    """
+    Runs benchmarks for several grid sizes
+    :param grid_sizes: grid sizes to run
+    :param names: benchmark names to run, or None for all
+    :param min_time: seconds to spend on each benchmark and grid size
+    :param repeat: number of timed runs of each
+    :return: dict with the machine details and, under 'results', seconds per operation keyed by 'name/grid_size'
+    """
+    pygame.init()
+    results = {}
+    for name, setup in BENCHMARKS:
+        if names is not None and name not in names:
+            continue
+        for grid_size in grid_sizes:
+            function = setup(grid_size)
+            if function is not None:
+                results['%s/%d' % (name, grid_size)] = measure(function, min_time, repeat)
+    return {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(before, after, threshold=THRESHOLD):
+    """
+    Compares two sets of results
+    :param before: dict from run_benchmarks
+    :param after: dict from run_benchmarks
+    :param threshold: ratio of after to before above which a benchmark counts as slower
+    :return: list of (key, before seconds, after seconds, ratio) for every benchmark in both, and the list of keys
+        that got slower
+    """
+    rows = []
+    slower = []
+    for key in sorted(set(before['results']) & set(after['results'])):
+        ratio = after['results'][key] / before['results'][key]
+        rows.append((key, before['results'][key], after['results'][key], ratio))
+        if ratio > threshold:
+            slower.append(key)
+    return rows, slower
+
+
+def format_seconds(seconds):
+    """
+    Formats a duration with a unit that suits it
+    :param seconds: float
+    :return: str
+    """
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return '%.3g %s' % (seconds / scale, unit)
+    return '%.3g ns' % (seconds * 1e9)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the rules, rendering and AI hot paths')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--grid-sizes', type=int, nargs='+', default=list(GRID_SIZES))
+    parser.add_argument('--only', nargs='+', help='names of the benchmarks to run')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per benchmark and grid size')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='compare two JSON result files')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as before_file, open(args.compare[1]) as after_file:
+            rows, slower = compare(json.load(before_file), json.load(after_file), args.threshold)
+        for key, before, after, ratio in rows:
+            print('%-22s %10s %10s  %5.2fx%s' % (key, format_seconds(before), format_seconds(after), ratio,
+                                                 '  SLOWER' if key in slower else ''))
+        sys.exit(1 if slower else 0)
+
+    report = run_benchmarks(args.grid_sizes, args.only, args.min_time)
+    for key, seconds in sorted(report['results'].items()):
+        print('%-22s %10s  %12.0f/s' % (key, format_seconds(seconds), 1 / seconds))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
@@ -0,0 +1,74 @@
+"""
+Blocking client for server.py, for front ends that run their own loop.
+
+A background thread reads the server's lines and hands each one to a callback; the pygame front end posts them to its
+event queue so the main thread applies them between frames.
+"""
+import socket
+import threading
+
+
+class RemoteGame(object):
+    """
+    Connection to a match server
+    """
+
+    def __init__(self, host, port, on_message):
+        """
+        :param host: server address
+        :param port: server port
+        :param on_message: called from the reader thread with each line from the server, without the newline, and
+            with None once the connection is closed
+        """
+        self.socket = socket.create_connection((host, port))
+        self.on_message = on_message
+        self.thread = threading.Thread(target=self.read_lines, daemon=True)
+        self.thread.start()
+
+    def read_lines(self):
+        """
+        Passes lines from the server to on_message until the connection closes
+        :return:
+        """
+        try:
+            for line in self.socket.makefile('rb'):
+                self.on_message(line.decode('ascii').strip())
+        except OSError:
+            pass
+        self.on_message(None)
+
+    def send(self, line):
+        """
+        Sends a line to the server
+        :param line: message without the newline
+        :return:
+        """
+        self.socket.sendall(line.encode('ascii') + b'\n')
+
+    def join(self, grid_size=3, win_length=None):
+        """
+        Asks for a match
+        :param grid_size: number of boxes along one side of the grid
+        :param win_length: marks in a row needed to win, defaults to grid_size
+        :return:
+        """
+        self.send('JOIN %d %d' % (grid_size, grid_size if win_length is None else win_length))
+
+    def send_move(self, index):
+        """
+        Asks the server to mark a box; it is only marked once the server sends MOVED back
+        :param index: box index
+        :return:
+        """
+        self.send('MOVE %d' % index)
+
+    def close(self):
+        """
+        Leaves the server
+        :return:
+        """
+        try:
+            self.send('QUIT')
+        except OSError:
+            pass
+        self.socket.close()
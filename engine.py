@@ -0,0 +1,367 @@
+"""
+Headless game state for Tic Tac Toe.
+
+Each player's marks are kept as an integer bitmask where bit i is set when box i of the board holds that player's mark,
+every winning line is a precomputed mask, and each line keeps a counter per player that is updated as boxes are marked.
+A bytearray holds the mark in each box as well, so reading one box does not shift a bitmask as large as the board.
+Box i is the i-th entry of Board.boxes. Nothing in here imports pygame: drawing and sound are observers attached to a
+GameState, so games can be played without a window or an audio device.
+"""
+import random
+import struct
+from array import array
+
+
+# Line tables shared by every GameState with the same grid size and win length, keyed by (grid_size, win_length)
+_line_tables = {}
+
+# Zobrist keys keyed by number of boxes
+_zobrist_tables = {}
+
+# Grid size and win length at the start of GameState.to_bytes, followed by each player's marks
+_PAYLOAD_HEADER = struct.Struct('<HH')
+
+
+def winning_lines(grid_size, win_length=None):
+    """
+    Calculates the winning combinations for a square grid: every run of win_length boxes in a column, a row or either
+    diagonal. Box index is x * grid_size + y, so a step of 1 moves down a column and a step of grid_size along a row
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win, defaults to grid_size
+    :return: tuple of tuples of box indices
+    """
+    if win_length is None:
+        win_length = grid_size
+    if not 1 <= win_length <= grid_size:
+        raise ValueError('Win length must be between 1 and %d' % grid_size)
+    if win_length == 1:
+        return tuple((index,) for index in range(grid_size * grid_size))
+    # Each line is collected as the x, y of its first box and the index step between its boxes
+    starts = range(0, grid_size - win_length + 1)
+    lines = []
+
+    # Vertical combinations
+    lines += [(x, y, 1) for x in range(0, grid_size) for y in starts]
+
+    # Horizontal combinations
+    lines += [(x, y, grid_size) for y in range(0, grid_size) for x in starts]
+
+    # Diagonal combinations
+    lines += [(x, y, grid_size + 1) for x in starts for y in starts]
+    lines += [(x, y, grid_size - 1) for x in starts for y in range(win_length - 1, grid_size)]
+
+    return tuple(tuple(range(x * grid_size + y, x * grid_size + y + step * win_length, step)) for x, y, step in lines)
+
+
+def line_mask(line):
+    """
+    Turns a tuple of box indices into a bitmask
+    :param line: iterable of box indices
+    :return: int with one bit set per box
+    """
+    mask = 0
+    for index in line:
+        mask |= 1 << index
+    return mask
+
+
+def line_table(grid_size, win_length=None):
+    """
+    Gets the winning lines for a grid along with their bitmasks and the lines through each box. Each table is built
+    once per (grid_size, win_length) and shared, so boards do not rebuild it on every new game
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win, defaults to grid_size
+    :return: tuple of (lines, line_masks, cell_lines)
+    """
+    if win_length is None:
+        win_length = grid_size
+    key = (grid_size, win_length)
+    table = _line_tables.get(key)
+    if table is None:
+        lines = winning_lines(grid_size, win_length)
+        cell_lines = [[] for _ in range(grid_size * grid_size)]
+        for number, line in enumerate(lines):
+            for index in line:
+                cell_lines[index].append(number)
+        table = (lines, tuple(line_mask(line) for line in lines), tuple(tuple(numbers) for numbers in cell_lines))
+        _line_tables[key] = table
+    return table
+
+
+def zobrist_table(size):
+    """
+    Gets the random 64-bit keys used to hash positions: one per box and player, plus a base for the empty board.
+    The generator is seeded with the number of boxes, so every process gets the same keys and hashes can be stored
+    in files
+    :param size: number of boxes on the grid
+    :return: tuple of (base, keys), where keys[player][index] is XORed in when the player marks the box
+    """
+    table = _zobrist_tables.get(size)
+    if table is None:
+        generator = random.Random(size)
+        base = generator.getrandbits(64) | 1
+        keys = (None, tuple(generator.getrandbits(64) for _ in range(size)),
+                tuple(generator.getrandbits(64) for _ in range(size)))
+        table = (base, keys)
+        _zobrist_tables[size] = table
+    return table
+
+
+class Observer(object):
+    """
+    Base class for objects following a game, such as a renderer or a sound player. Every method does nothing unless
+    overridden
+    """
+
+    def on_reset(self, game):
+        """
+        Called when the game is cleared for a new round
+        :param game: GameState
+        :return:
+        """
+
+    def on_move(self, game, index, player):
+        """
+        Called after a box is marked
+        :param game: GameState
+        :param index: box index
+        :param player: player who marked the box
+        :return:
+        """
+
+    def on_undo(self, game, index, player):
+        """
+        Called after a mark is taken back
+        :param game: GameState
+        :param index: box index
+        :param player: player whose mark was removed
+        :return:
+        """
+
+    def on_game_over(self, game, winner):
+        """
+        Called after the move that ends the game, following on_move
+        :param game: GameState
+        :param winner: 1 or 2, or 0 for a draw
+        :return:
+        """
+
+
+class GameState(object):
+    """
+    Marks, turn and winner of one game, without any drawing or sound
+    """
+
+    def __init__(self, grid_size=3, win_length=None):
+        """
+        :param grid_size: number of boxes along one side of the grid
+        :param win_length: marks in a row needed to win, defaults to grid_size
+        """
+        self.grid_size = grid_size
+        self.win_length = grid_size if win_length is None else win_length
+        self.size = grid_size * grid_size
+        self.full_mask = (1 << self.size) - 1
+
+        # cell_lines holds the lines passing through each box, so a move only updates the lines it can complete
+        self.lines, self.line_masks, self.cell_lines = line_table(grid_size, self.win_length)
+        self.hash_base, self.hash_keys = zobrist_table(self.size)
+        self.observers = []
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the marks and gives the first move to player 1
+        :return:
+        """
+        # marks[0] is unused so that marks[player] works for players 1 and 2
+        self.marks = [0, 0, 0]
+        # cells[index] is the player holding the box, or 0
+        self.cells = bytearray(self.size)
+        # counts[player][line] is how many of the line's boxes the player holds, as unsigned shorts
+        self.counts = [None, array('H', bytes(2 * len(self.lines))), array('H', bytes(2 * len(self.lines)))]
+        self.moves = 0
+        # Zobrist hash of the position, updated with one XOR per move
+        self.hash = self.hash_base
+        self.history = []
+        self.turn = 1
+        self.winner = 0
+        for observer in self.observers:
+            observer.on_reset(self)
+
+    def add_observer(self, observer):
+        """
+        Attaches an observer that is told about every reset, move, undo and game end
+        :param observer: Observer
+        :return:
+        """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Detaches an observer
+        :param observer: Observer
+        :return:
+        """
+        self.observers.remove(observer)
+
+    @property
+    def occupied(self):
+        """
+        Bitmask of every box holding a mark
+        :return: int
+        """
+        return self.marks[1] | self.marks[2]
+
+    @property
+    def full(self):
+        """
+        True when every box holds a mark
+        :return: bool
+        """
+        return self.moves == self.size
+
+    @property
+    def game_over(self):
+        """
+        True when a player has won or the board is full
+        :return: bool
+        """
+        return self.winner != 0 or self.full
+
+    def state_at(self, index):
+        """
+        Gets the mark in a box
+        :param index: box index
+        :return: 0 if the box is empty, otherwise the player (1 or 2) who marked it
+        """
+        return self.cells[index]
+
+    def is_legal(self, index):
+        """
+        Checks if the player whose turn it is may mark a box
+        :param index: box index
+        :return: bool
+        """
+        if self.game_over or not 0 <= index < self.size:
+            return False
+        return not self.cells[index]
+
+    def legal_moves(self):
+        """
+        Lists the empty boxes, or nothing once the game is over
+        :return: list of box indices
+        """
+        if self.game_over:
+            return []
+        return [index for index, cell in enumerate(self.cells) if not cell]
+
+    def place(self, index):
+        """
+        Marks a box for the player whose turn it is, updates the counters of the lines through it, then passes the turn
+        :param index: box index
+        :return: the player who made the move
+        """
+        if not self.is_legal(index):
+            raise ValueError('Box %d cannot be marked' % index)
+        player = self.turn
+        self.marks[player] |= 1 << index
+        self.cells[index] = player
+        self.moves += 1
+        self.hash ^= self.hash_keys[player][index]
+        counts = self.counts[player]
+        win_length = self.win_length
+        for line in self.cell_lines[index]:
+            counts[line] += 1
+            if counts[line] == win_length:
+                self.winner = player
+        self.history.append(index)
+        self.turn = 3 - player
+        for observer in self.observers:
+            observer.on_move(self, index, player)
+        if self.game_over:
+            for observer in self.observers:
+                observer.on_game_over(self, self.winner)
+        return player
+
+    def copy(self):
+        """
+        Makes a copy of the game without its observers, for searching ahead without drawing or playing sounds
+        :return: GameState
+        """
+        game = GameState(self.grid_size, self.win_length)
+        game.marks = list(self.marks)
+        game.cells = bytearray(self.cells)
+        game.counts = [None, array('H', self.counts[1]), array('H', self.counts[2])]
+        game.moves = self.moves
+        game.hash = self.hash
+        game.history = list(self.history)
+        game.turn = self.turn
+        game.winner = self.winner
+        return game
+
+    def to_bytes(self):
+        """
+        Packs the rules and each player's marks into a few bytes, for sending a position to another process
+        :return: bytes
+        """
+        width = (self.size + 7) // 8
+        return (_PAYLOAD_HEADER.pack(self.grid_size, self.win_length) +
+                self.marks[1].to_bytes(width, 'little') + self.marks[2].to_bytes(width, 'little'))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Unpacks a position made by to_bytes. The order the moves were played in is not stored, so the history starts
+        empty and the moves already on the grid cannot be undone
+        :param data: bytes
+        :return: GameState
+        """
+        grid_size, win_length = _PAYLOAD_HEADER.unpack_from(data)
+        game = cls(grid_size, win_length)
+        width = (game.size + 7) // 8
+        start = _PAYLOAD_HEADER.size
+        if len(data) != start + 2 * width:
+            raise ValueError('Payload is %d bytes, expected %d' % (len(data), start + 2 * width))
+        marks = [0, int.from_bytes(data[start:start + width], 'little'),
+                 int.from_bytes(data[start + width:], 'little')]
+        boxes = [None] + [[index for index in range(game.size) if marks[player] & (1 << index)] for player in (1, 2)]
+        if marks[1] & marks[2] or marks[1] > game.full_mask or marks[2] > game.full_mask or \
+                len(boxes[1]) - len(boxes[2]) not in (0, 1):
+            raise ValueError('Payload does not hold a reachable position')
+
+        game.marks = marks
+        for player in (1, 2):
+            counts = game.counts[player]
+            for number, mask in enumerate(game.line_masks):
+                counts[number] = bin(marks[player] & mask).count('1')
+                if counts[number] == game.win_length:
+                    game.winner = player
+            for index in boxes[player]:
+                game.cells[index] = player
+                game.hash ^= game.hash_keys[player][index]
+        game.moves = len(boxes[1]) + len(boxes[2])
+        game.turn = 1 if len(boxes[1]) == len(boxes[2]) else 2
+        return game
+
+    def undo(self):
+        """
+        Takes back the last move and gives the turn back to the player who made it
+        :return: index of the box that was cleared
+        """
+        if not self.history:
+            raise ValueError('There is no move to undo')
+        index = self.history.pop()
+        player = 3 - self.turn
+        self.marks[player] &= ~(1 << index)
+        self.cells[index] = 0
+        self.moves -= 1
+        self.hash ^= self.hash_keys[player][index]
+        counts = self.counts[player]
+        for line in self.cell_lines[index]:
+            counts[line] -= 1
+        # No move can follow a win, so the move being taken back is the one that won
+        self.winner = 0
+        self.turn = player
+        for observer in self.observers:
+            observer.on_undo(self, index, player)
+        return index
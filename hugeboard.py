@@ -0,0 +1,310 @@
+"""
+Huge-board mode: play on a grid far larger than the window, such as 1000x1000 with 5 in a row.
+
+The game is a SparseGameState and the window shows a viewport onto it. Only the boxes inside the viewport are drawn, and
+a move repaints just its own box, so drawing costs the same on any grid size. Left click marks a box, dragging with the
+right mouse button or the arrow keys scroll, the mouse wheel zooms around the cursor, U takes a move back and N starts
+a new game.
+
+    python hugeboard.py --grid-size 1000 --win-length 5
+"""
+import argparse, sys
+
+import pygame
+
+from engine import Observer
+from lib import BLACK, GREEN, RED, WHITE, SoundEffects, mark_sprite, sound_bank, text_surface
+from sparse import SparseGameState
+
+
+# Smallest and largest box sizes, in pixels, the zoom goes between
+MIN_BOX_SIZE = 4
+MAX_BOX_SIZE = 160
+
+# Box size change for one notch of the mouse wheel
+ZOOM_STEP = 1.25
+
+
+class Viewport(Observer):
+    """
+    Draws the part of a game's grid that fits in a surface, and turns pixels into boxes
+    """
+
+    def __init__(self, game, surface, box_size=40, line_width=1):
+        """
+        :param game: SparseGameState
+        :param surface: pygame.Surface to draw on
+        :param box_size: width of a box in pixels
+        :param line_width: width of the grid lines in pixels
+        """
+        self.game = game
+        self.surface = surface
+        self.box_size = box_size
+        self.line_width = line_width
+        # Position of the surface's top left corner on the whole grid, in pixels
+        self.left = 0
+        self.top = 0
+        # Areas of the surface drawn on since the display was last updated
+        self.dirty_rects = []
+        # True while the game over banner is on the surface
+        self.banner = False
+        self.centre_on(game.grid_size // 2, game.grid_size // 2)
+        game.add_observer(self)
+
+    @property
+    def pitch(self):
+        """
+        Distance in pixels from the start of one box to the start of the next
+        :return: int
+        """
+        return self.box_size + self.line_width
+
+    def mark_dirty(self, rect=None):
+        """
+        Records an area of the surface that has to be pushed to the display
+        :param rect: pygame.Rect, or None for the whole surface
+        :return:
+        """
+        self.dirty_rects.append(self.surface.get_rect() if rect is None else pygame.Rect(rect))
+
+    def pop_dirty_rects(self):
+        """
+        Hands over the areas drawn on since the last call, for pygame.display.update
+        :return: list of pygame.Rect, empty if nothing changed
+        """
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return dirty_rects
+
+    def clamp(self):
+        """
+        Keeps the viewport on the grid
+        :return:
+        """
+        grid_pixels = self.game.grid_size * self.pitch - self.line_width
+        width, height = self.surface.get_size()
+        self.left = max(0, min(self.left, grid_pixels - width))
+        self.top = max(0, min(self.top, grid_pixels - height))
+
+    def centre_on(self, x, y):
+        """
+        Moves the viewport so a box is in the middle of the surface
+        :param x: column
+        :param y: row
+        :return:
+        """
+        width, height = self.surface.get_size()
+        self.left = x * self.pitch + self.box_size // 2 - width // 2
+        self.top = y * self.pitch + self.box_size // 2 - height // 2
+        self.clamp()
+
+    def visible_boxes(self):
+        """
+        Gets the columns and rows that are at least partly inside the surface
+        :return: (first column, first row, last column, last row), the last ones included
+        """
+        width, height = self.surface.get_size()
+        pitch = self.pitch
+        last = self.game.grid_size - 1
+        return (self.left // pitch, self.top // pitch,
+                min(last, (self.left + width - 1) // pitch), min(last, (self.top + height - 1) // pitch))
+
+    def box_rect(self, x, y):
+        """
+        Gets where a box is on the surface
+        :param x: column
+        :param y: row
+        :return: pygame.Rect, possibly outside the surface
+        """
+        return pygame.Rect(x * self.pitch - self.left, y * self.pitch - self.top, self.box_size, self.box_size)
+
+    def box_at_pixel(self, x, y):
+        """
+        Finds the box under a point of the surface
+        :param x: x position on the surface
+        :param y: y position on the surface
+        :return: box index, or None on a grid line or off the grid
+        """
+        column, column_offset = divmod(x + self.left, self.pitch)
+        row, row_offset = divmod(y + self.top, self.pitch)
+        grid_size = self.game.grid_size
+        if column_offset >= self.box_size or row_offset >= self.box_size or \
+                not (0 <= column < grid_size and 0 <= row < grid_size):
+            return None
+        return column * grid_size + row
+
+    def draw_mark(self, x, y, player):
+        """
+        Clears a box and draws its mark, if it is in view
+        :param x: column
+        :param y: row
+        :param player: 0 to leave the box empty, 1 for an x, 2 for an o
+        :return:
+        """
+        rect = self.box_rect(x, y)
+        if not rect.colliderect(self.surface.get_rect()):
+            return
+        self.surface.fill(BLACK, rect)
+        if player:
+            stroke = max(1, self.box_size // 20)
+            self.surface.blit(mark_sprite('x', self.box_size, stroke, GREEN) if player == 1 else
+                              mark_sprite('o', self.box_size, stroke, RED), rect)
+        self.mark_dirty(rect)
+
+    def draw_banner(self):
+        """
+        Draws who won across the middle of the surface
+        :return:
+        """
+        winner = self.game.winner
+        text = text_surface('Player %d won!' % winner if winner else 'Draw!', self.surface.get_height() // 10)
+        rect = text.get_rect(center=self.surface.get_rect().center)
+        self.surface.blit(text, rect)
+        self.banner = True
+        self.mark_dirty(rect)
+
+    def draw(self):
+        """
+        Draws the grid lines and marks in view. The marks are found through the chunks that overlap the view, so this
+        costs the same whatever the size of the grid
+        :return:
+        """
+        surface = self.surface
+        surface.fill(BLACK)
+        first_column, first_row, last_column, last_row = self.visible_boxes()
+        pitch = self.pitch
+        grid_pixels = self.game.grid_size * pitch - self.line_width
+        width = min(surface.get_width(), grid_pixels - self.left)
+        height = min(surface.get_height(), grid_pixels - self.top)
+        last_line = self.game.grid_size - 1
+        for column in range(first_column, min(last_column + 1, last_line)):
+            surface.fill(WHITE, ((column + 1) * pitch - self.line_width - self.left, 0, self.line_width, height))
+        for row in range(first_row, min(last_row + 1, last_line)):
+            surface.fill(WHITE, (0, (row + 1) * pitch - self.line_width - self.top, width, self.line_width))
+        for x, y, player in self.game.marks_in(first_column, first_row, last_column, last_row):
+            self.draw_mark(x, y, player)
+        self.dirty_rects = []
+        self.banner = False
+        if self.game.game_over:
+            self.draw_banner()
+        self.mark_dirty()
+
+    def scroll(self, dx, dy):
+        """
+        Moves the viewport across the grid
+        :param dx: pixels to the right
+        :param dy: pixels down
+        :return:
+        """
+        self.left += dx
+        self.top += dy
+        self.clamp()
+        self.draw()
+
+    def zoom(self, steps, x, y):
+        """
+        Makes the boxes bigger or smaller, keeping the point under the cursor where it is
+        :param steps: notches of the mouse wheel, positive to zoom in
+        :param x: x position of the cursor on the surface
+        :param y: y position of the cursor on the surface
+        :return:
+        """
+        box_size = max(MIN_BOX_SIZE, min(MAX_BOX_SIZE, int(round(self.box_size * ZOOM_STEP ** steps))))
+        if box_size == self.box_size:
+            return
+        grid_x = (x + self.left) / float(self.pitch)
+        grid_y = (y + self.top) / float(self.pitch)
+        self.box_size = box_size
+        self.left = int(grid_x * self.pitch) - x
+        self.top = int(grid_y * self.pitch) - y
+        self.clamp()
+        self.draw()
+
+    def process_click(self, x, y):
+        """
+        Marks the box under a point for the player whose turn it is, if it is empty
+        :param x: x position on the surface
+        :param y: y position on the surface
+        :return: box index marked, or None
+        """
+        index = self.box_at_pixel(x, y)
+        if index is None or not self.game.is_legal(index):
+            return None
+        self.game.place(index)
+        return index
+
+    def on_reset(self, game):
+        pygame.display.set_caption('Tic Tac Toe - Player 1 Start')
+        self.draw()
+
+    def on_move(self, game, index, player):
+        x, y = divmod(index, game.grid_size)
+        self.draw_mark(x, y, player)
+        pygame.display.set_caption('Tic Tac Toe - Player %d Turn' % game.turn)
+
+    def on_undo(self, game, index, player):
+        if self.banner:
+            # The game over banner covers part of the view, so everything in view is drawn again
+            self.draw()
+        else:
+            x, y = divmod(index, game.grid_size)
+            self.draw_mark(x, y, 0)
+        pygame.display.set_caption('Tic Tac Toe - Player %d Turn' % game.turn)
+
+    def on_game_over(self, game, winner):
+        if winner:
+            pygame.display.set_caption('Tic Tac Toe - Player %d Won' % winner)
+        else:
+            pygame.display.set_caption('Tic Tac Toe - Draw Game')
+        self.draw_banner()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tic Tac Toe on a huge grid')
+    parser.add_argument('--grid-size', type=int, default=1000, help='boxes along one side of the grid')
+    parser.add_argument('--win-length', type=int, default=5, help='marks in a row needed to win')
+    parser.add_argument('--box-size', type=int, default=40, help='starting width of a box in pixels')
+    parser.add_argument('--window', type=int, default=800, help='width and height of the window in pixels')
+    args = parser.parse_args()
+
+    pygame.display.init()
+    clock = pygame.time.Clock()
+    game = SparseGameState(args.grid_size, args.win_length)
+    viewport = Viewport(game, pygame.display.set_mode((args.window, args.window)), args.box_size)
+    viewport.draw()
+    game.add_observer(SoundEffects())
+    sound_bank().load_in_background()
+
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION,
+                              pygame.MOUSEWHEEL, pygame.VIDEOEXPOSE])
+    scroll_keys = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
+
+    while True:
+        dirty_rects = viewport.pop_dirty_rects()
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        for event in [pygame.event.wait()] + pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                viewport.process_click(*event.pos)
+            elif event.type == pygame.MOUSEMOTION and event.buttons[2]:
+                viewport.scroll(-event.rel[0], -event.rel[1])
+            elif event.type == pygame.MOUSEWHEEL:
+                viewport.zoom(event.y, *pygame.mouse.get_pos())
+            elif event.type == pygame.KEYDOWN and event.key in scroll_keys:
+                dx, dy = scroll_keys[event.key]
+                viewport.scroll(dx * args.window // 4, dy * args.window // 4)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_u and game.history:
+                game.undo()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_n:
+                game.reset()
+            elif event.type == pygame.VIDEOEXPOSE:
+                viewport.mark_dirty()
+        clock.tick(60)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,6 @@
-import pygame, itertools, time, sys, unittest
+import pygame, sys, threading
+
+from engine import GameState, Observer
 
 
 WHITE = (255, 255, 255)
@@ -8,54 +10,371 @@ BLACK = (0, 0, 0)
 GREEN = (0, 255, 0)
 YELLOW = (255, 255, 0)
 
+# Pre-rendered x and o sprites keyed by (mark, box size, line width, colour)
+_sprites = {}
+
+# Fonts keyed by size, and rendered text keyed by (text, size)
+_fonts = {}
+_texts = {}
+
+
+def mark_sprite(mark, size, line_width, colour):
+    """
+    Gets a transparent box-sized surface with an x or an o drawn on it, rendering it the first time it is asked for
+    :param mark: 'x' or 'o'
+    :param size: box size in pixels
+    :param line_width: width of the strokes
+    :param colour: RGB tuple
+    :return: pygame.Surface
+    """
+    key = (mark, size, line_width, colour)
+    sprite = _sprites.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        centre = size // 2
+        radius = (size / 2) - (size / 8)
+        if mark == 'x':
+            pygame.draw.line(sprite, colour, (centre - radius, centre - radius), (centre + radius, centre + radius), line_width)
+            pygame.draw.line(sprite, colour, (centre - radius, centre + radius), (centre + radius, centre - radius), line_width)
+        else:
+            pygame.draw.circle(sprite, colour, (centre, centre), int(radius), int(line_width))
+        _sprites[key] = sprite
+    return sprite
+
+
+def text_surface(text, size):
+    """
+    Gets text rendered in yellow on blue, creating the font and rendering the text the first time they are asked for
+    :param text: string
+    :param size: font size
+    :return: pygame.Surface
+    """
+    key = (text, size)
+    surface = _texts.get(key)
+    if surface is None:
+        font = _fonts.get(size)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = _fonts[size] = pygame.font.Font('freesansbold.ttf', size)
+        surface = _texts[key] = font.render(text, True, YELLOW, BLUE)
+    return surface
+
 
 class Box(object):
-    state = 0
-    
-    def __init__(self, x, y, size, board):
-        """
-        Box where the x's and o's are drawn
+    """
+    Box where the x's and o's are drawn. A box only names a position on its board: the mark comes from the game state
+    and the geometry from the board's sizes, so boxes are made when asked for and a large board holds none of them
+    """
+    __slots__ = ('board', 'index')
 
-        :param x:
-        :param y:
-        :param size:
-        :param board:
+    def __init__(self, board, index):
+        """
+        :param board: Board the box is on
+        :param index: position of the box in board.boxes and in the board's game state
         """
-        self.size = size
-        self.line_width = int(self.size / 40) if self.size > 40 else 1
-        self.radius = (self.size / 2) - (self.size / 8)
-        self.rect = pygame.Rect(x, y, size, size)
         self.board = board
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, Box) and self.index == other.index and self.board is other.board
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return self.index
+
+    @property
+    def size(self):
+        """
+        Width of the box in pixels
+        :return: int
+        """
+        return self.board.box_size
+
+    @property
+    def line_width(self):
+        """
+        Width of the strokes of the mark
+        :return: int
+        """
+        return int(self.size / 40) if self.size > 40 else 1
+
+    @property
+    def radius(self):
+        """
+        Radius of the o
+        :return: float
+        """
+        return (self.size / 2) - (self.size / 8)
+
+    @property
+    def rect(self):
+        """
+        Area of the surface covered by the box. Box index is column * grid_size + row
+        :return: pygame.Rect
+        """
+        board = self.board
+        column, row = divmod(self.index, board.grid_size)
+        pitch = board.box_size + board.line_width
+        return pygame.Rect(board.border + column * pitch, board.border + row * pitch, board.box_size, board.box_size)
+
+    @property
+    def state(self):
+        """
+        Mark in this box, read from the board's game state
+        :return: 0 if empty, 1 for an x, 2 for an o
+        """
+        return self.board.game.cells[self.index]
     
     def mark_x(self):
         """
         Draws an X in the box
         :return:
         """
-        pygame.draw.line(self.board.surface, GREEN, (self.rect.centerx - self.radius, self.rect.centery - self.radius), (self.rect.centerx + self.radius, self.rect.centery + self.radius), self.line_width)
-        pygame.draw.line(self.board.surface, GREEN, (self.rect.centerx - self.radius, self.rect.centery + self.radius), (self.rect.centerx + self.radius, self.rect.centery - self.radius), self.line_width)
+        self.board.surface.blit(mark_sprite('x', self.size, self.line_width, GREEN), self.rect)
     
     def mark_o(self):
         """
         Draws a circle in the box
         :return:
         """
-        pygame.draw.circle(self.board.surface, RED, (int(self.rect.centerx), int(self.rect.centery)), int(self.radius), int(self.line_width))
+        self.board.surface.blit(mark_sprite('o', self.size, self.line_width, RED), self.rect)
+
+    def redraw(self, highlight=False):
+        """
+        Clears the box and draws its mark again, with an outline if it is highlighted
+        :param highlight: True to outline the box
+        :return:
+        """
+        rect = self.rect
+        self.board.surface.fill(BLACK, rect)
+        if self.state == 1:
+            self.mark_x()
+        elif self.state == 2:
+            self.mark_o()
+        if highlight:
+            pygame.draw.rect(self.board.surface, YELLOW, rect, max(self.line_width, 2))
+
+
+class BoxGrid(object):
+    """
+    Sequence of a board's boxes, each made when it is looked up
+    """
+    __slots__ = ('board',)
+
+    def __init__(self, board):
+        """
+        :param board: Board
+        """
+        self.board = board
+
+    def __len__(self):
+        return self.board.game.size
+
+    def __getitem__(self, index):
+        size = self.board.game.size
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('box index out of range')
+        return Box(self.board, index)
+
+    def __iter__(self):
+        board = self.board
+        return (Box(board, index) for index in range(board.game.size))
+
+
+class BoardRenderer(Observer):
+    """
+    Draws a game onto its board's surface and keeps the window caption up to date
+    """
+
+    def __init__(self, board):
+        self.board = board
+
+    def on_reset(self, game):
+        self.board.highlighted = None
+        pygame.display.set_caption('Tic Tac Toe - Player 1 Start')
+        self.board.surface.fill(BLACK)
+        self.board.draw_lines()
+        self.board.mark_dirty()
+
+    def on_move(self, game, index, player):
+        box = self.board.boxes[index]
+        if box == self.board.highlighted:
+            self.board.highlighted = None
+            box.redraw()
+        elif player == 1:
+            box.mark_x()
+        else:
+            box.mark_o()
+        self.board.mark_dirty(box.rect)
+        pygame.display.set_caption('Tic Tac Toe - Player %d Turn' % game.turn)
+
+    def on_undo(self, game, index, player):
+        if self.board.game_over:
+            # The game over banner and menu cover part of the grid, so everything is drawn again
+            self.board.redraw()
+        else:
+            box = self.board.boxes[index]
+            box.redraw(box == self.board.highlighted)
+            self.board.mark_dirty(box.rect)
+        pygame.display.set_caption('Tic Tac Toe - Player %d Turn' % game.turn)
+
+    def on_game_over(self, game, winner):
+        # The banner goes over the grid, so the outline is taken off now rather than by the next mouse move, which
+        # would repaint the box over the banner
+        highlighted = self.board.highlighted
+        if highlighted is not None:
+            self.board.highlighted = None
+            highlighted.redraw()
+            self.board.mark_dirty(highlighted.rect)
+        self.board.display_game_over(winner)
+
+
+class SoundBank(object):
+    """
+    Sound effects decoded once into pygame.mixer.Sound objects. Each sound plays on its own mixer channel, so a move
+    sound and the victory sound overlap instead of cutting each other off
+    """
+    files = {'x': 'limit.wav', 'o': 'bolt2.wav', 'victory': 'victory.wav', 'draw': 'aww.wav'}
+
+    def __init__(self, files=None):
+        """
+        :param files: dict mapping sound name to WAV file, defaults to the game's sounds
+        """
+        if files is not None:
+            self.files = dict(files)
+        self.sounds = {}
+        self.lock = threading.Lock()
+        # Thread started by load_in_background
+        self.loader = None
+
+    def load(self):
+        """
+        Reads and decodes every sound not loaded yet. Needs the mixer to be initialized
+        :return:
+        """
+        with self.lock:
+            for name, path in self.files.items():
+                if name not in self.sounds:
+                    self.sounds[name] = pygame.mixer.Sound(path)
+
+    def load_in_background(self):
+        """
+        Starts the mixer if needed and loads the sounds on another thread, so the window can be drawn in the meantime.
+        Until they are loaded, or if there is no audio device, sounds are skipped instead of waited for
+        :return: threading.Thread
+        """
+        def run():
+            if not pygame.mixer.get_init():
+                try:
+                    pygame.mixer.init()
+                except pygame.error:
+                    return
+            self.load()
+        self.loader = threading.Thread(target=run, name='sound loader', daemon=True)
+        self.loader.start()
+        return self.loader
+
+    def play(self, name):
+        """
+        Plays a sound on a free mixer channel, or on the channel that has been playing longest if none is free
+        :param name: key of files
+        :return:
+        """
+        sound = self.sounds.get(name)
+        if sound is None:
+            if self.loader is not None:
+                return
+            self.load()
+            sound = self.sounds[name]
+        pygame.mixer.find_channel(True).play(sound)
+
+
+# Sound bank shared by every board, so new boards and Play again do not load the files again
+_sound_bank = None
+
+
+def sound_bank():
+    """
+    Gets the sound bank shared by every board
+    :return: SoundBank
+    """
+    global _sound_bank
+    if _sound_bank is None:
+        _sound_bank = SoundBank()
+    return _sound_bank
+
+
+class SoundEffects(Observer):
+    """
+    Plays a sound for each move and for the end of the game
+    """
+    move_sounds = {1: 'x', 2: 'o'}
+
+    def __init__(self, bank=None):
+        """
+        :param bank: SoundBank, defaults to the shared one
+        """
+        self.bank = sound_bank() if bank is None else bank
+
+    def play_move(self, player):
+        """
+        Plays the sound of a player's move
+        :param player: 1 or 2
+        :return:
+        """
+        self.bank.play(self.move_sounds[player])
+
+    def on_move(self, game, index, player):
+        self.play_move(player)
+
+    def on_game_over(self, game, winner):
+        self.bank.play('victory' if winner else 'draw')
 
 
 class Board(object):
     """
     An object of this class is the Tic Tac Toe board
     """
-    turn = 1
 
-    def __init__(self, grid_size=3, box_size=200, border=20, line_width=5):
+    def __init__(self, grid_size=3, box_size=200, border=20, line_width=5, headless=False, win_length=None):
+        """
+        :param grid_size: number of boxes along one side of the grid
+        :param box_size: width of a box in pixels
+        :param border: space around the grid in pixels
+        :param line_width: width of the grid lines in pixels
+        :param headless: if True, the board opens no window and plays no sound, so it only needs the rules engine
+        :param win_length: marks in a row needed to win, defaults to grid_size
+        """
         self.grid_size = grid_size
         self.box_size = box_size
         self.border = border
         self.line_width = line_width
-        surface_size = (self.grid_size * self.box_size) + (self.border * 2) + (self.line_width * (self.grid_size - 1))
-        self.surface = pygame.display.set_mode((surface_size, surface_size), 0, 32)
+        self.headless = headless
+        self.game = GameState(self.grid_size, win_length)
+        self.surface = None
+        self.sounds = None
+        self.solved = None
+        self.book = None
+        self.recorder = None
+        # Boxes taken back with undo, the last one on top, until a different move is played
+        self.redo_moves = []
+        # Box outlined under the mouse cursor
+        self.highlighted = None
+        # Areas of the surface drawn on since the display was last updated
+        self.dirty_rects = []
+        if not headless:
+            surface_size = (self.grid_size * self.box_size) + (self.border * 2) + (self.line_width * (self.grid_size - 1))
+            self.surface = pygame.display.set_mode((surface_size, surface_size), 0, 32)
+            self.sounds = SoundEffects()
+            if pygame.mixer.get_init():
+                self.sounds.bank.load()
+            self.game.add_observer(BoardRenderer(self))
+            self.game.add_observer(self.sounds)
         self.setup()
 
         
@@ -64,13 +383,31 @@ class Board(object):
         Initializes the board, including setting game_over variable to False
         :return:
         """
-        pygame.display.set_caption('Tic Tac Toe - Player 1 Start')
-        self.surface.fill(BLACK)
-        self.draw_lines()
+        if self.recorder is not None:
+            self.recorder.abandon(self.game)
+        self.game.reset()
+        self.redo_moves = []
         self.initialize_boxes()
         self.calculate_winners()
         self.game_over = False
 
+    def mark_dirty(self, rect=None):
+        """
+        Records an area of the surface that has to be pushed to the display
+        :param rect: pygame.Rect, or None for the whole surface
+        :return:
+        """
+        self.dirty_rects.append(self.surface.get_rect() if rect is None else pygame.Rect(rect))
+
+    def pop_dirty_rects(self):
+        """
+        Hands over the areas drawn on since the last call, for pygame.display.update
+        :return: list of pygame.Rect, empty if nothing changed
+        """
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return dirty_rects
+
     def draw_lines(self):
         """
         Draws the boundary lines for the tictactoe grid
@@ -84,31 +421,104 @@ class Board(object):
     
     def initialize_boxes(self):
         """
-        Initializes 9 box objects to use for the grid
+        Sets up the sequence of boxes for the grid. Boxes are views made on lookup, so this allocates nothing per box
         :return:
         """
-        self.boxes = []
-        
-        top_left_numbers = []
-        for i in range(0, self.grid_size):
-            num = ((i * self.box_size) + self.border + (i *self.line_width))
-            top_left_numbers.append(num)
-        
-        box_coordinates = list(itertools.product(top_left_numbers, repeat=2))
-        for x, y in box_coordinates:
-            self.boxes.append(Box(x, y, self.box_size, self))
-    
+        self.boxes = BoxGrid(self)
+
     def get_box_at_pixel(self, x, y):
         """
-        Gets the box object referenced by the mouse cursor
+        Gets the box object referenced by the mouse cursor. The column and row come straight from the coordinates,
+        since every box is box_size wide and followed by a line_width grid line
         :param x: x coordinate of cursor
         :param y: y coordinate of cursor
-        :return: box object corresponding to mouseclick
+        :return: box object corresponding to mouseclick, or None if the cursor is on the border or a grid line
+        """
+        pitch = self.box_size + self.line_width
+        column, offset_x = divmod(x - self.border, pitch)
+        row, offset_y = divmod(y - self.border, pitch)
+        if not (0 <= column < self.grid_size and 0 <= row < self.grid_size):
+            return None
+        if offset_x >= self.box_size or offset_y >= self.box_size:
+            return None
+        return self.boxes[column * self.grid_size + row]
+
+    def highlight_at(self, x, y):
+        """
+        Outlines the empty box under the mouse cursor, and removes the outline from the box it was on before
+        :param x: x coordinate of cursor
+        :param y: y coordinate of cursor
+        :return:
+        """
+        box = self.get_box_at_pixel(x, y)
+        if box is not None and (box.state != 0 or self.game_over):
+            box = None
+        if box == self.highlighted or self.headless:
+            return
+        if self.highlighted is not None:
+            self.highlighted.redraw()
+            self.mark_dirty(self.highlighted.rect)
+        self.highlighted = box
+        if box is not None:
+            box.redraw(highlight=True)
+            self.mark_dirty(box.rect)
+
+    @property
+    def turn(self):
+        """
+        Player whose turn it is, read from the game state
+        :return: 1 or 2
+        """
+        return self.game.turn
+    
+    def load_solved(self, path):
+        """
+        Opens a solved-position file for this board's rules, after which best_move is a single table probe
+        :param path: file written by solvedb.py
+        :return:
+        """
+        # Imported here so that starting the game does not load modules only some options use
+        import solvedb
+        solved = solvedb.SolvedPositions(path)
+        if not solved.matches(self.game):
+            solved.close()
+            raise ValueError('%s was not solved for a %dx%d grid with %d in a row'
+                             % (path, self.grid_size, self.grid_size, self.game.win_length))
+        self.solved = solved
+
+    def load_book(self, path):
+        """
+        Loads an opening book for this board's rules, after which best_move answers the first moves of a game from it
+        :param path: file written by openingbook.py
+        :return:
+        """
+        import openingbook
+        book = openingbook.load(path)
+        if not book.matches(self.game):
+            raise ValueError('%s was not built for a %dx%d grid with %d in a row'
+                             % (path, self.grid_size, self.grid_size, self.game.win_length))
+        self.book = book
+
+    def record(self, path):
+        """
+        Appends every game played on this board to a move log, including games cleared with Play again before their end
+        :param path: log file, created if it does not exist
+        :return:
+        """
+        import movelog
+        self.recorder = movelog.MoveRecorder(movelog.MoveLogWriter(path))
+        self.game.add_observer(self.recorder)
+
+    def best_move(self):
+        """
+        Looks up the best move for the player whose turn it is, in the solved-position file by the hash the game state
+        keeps up to date, or else in the opening book
+        :return: box index, or None if neither is loaded or the position is in neither
         """
-        for index, box in enumerate(self.boxes):
-            if box.rect.collidepoint(x, y):
-                return box
-        return None
+        if self.solved is None:
+            return None if self.book is None else self.book.lookup(self.game)
+        entry = self.solved.lookup(self.game.hash)
+        return None if entry is None else entry[1]
     
     def process_click(self, x, y):
         """
@@ -121,7 +531,7 @@ class Board(object):
         if box is not None and not self.game_over:
             self.play_turn(box)
             self.check_game_over()
-        if self.game_over:
+        if self.game_over and not self.headless:
             self.ending_menu(x, y)
 
     def display_end_menu(self):
@@ -130,10 +540,9 @@ class Board(object):
         :return: nothing
         """
         surface_size = self.surface.get_height()
-        font = pygame.font.Font('freesansbold.ttf', int(surface_size / 16))
 
-        text1 = font.render("Play again", True, YELLOW, BLUE)
-        text2 = font.render("Quit game", True, YELLOW, BLUE)
+        text1 = text_surface("Play again", int(surface_size / 16))
+        text2 = text_surface("Quit game", int(surface_size / 16))
 
         self.rect1 = text1.get_rect()
         self.rect2 = text2.get_rect()
@@ -141,6 +550,8 @@ class Board(object):
         self.rect2.center = ((surface_size * 2) / 3, surface_size / 12)
         self.surface.blit(text1, self.rect1)
         self.surface.blit(text2, self.rect2)
+        self.mark_dirty(self.rect1)
+        self.mark_dirty(self.rect2)
 
     def ending_menu(self, x, y):
         """
@@ -158,174 +569,110 @@ class Board(object):
 
     def play_sound(self):
         """
-        Loads the mixer with a sound corresponding to the player whose turn it is, then plays sound
+        Plays the move sound of the player whose turn it is
         :return:
         """
-        if self.turn == 1:
-            pygame.mixer.music.load('limit.wav')
-        elif self.turn == 2:
-            pygame.mixer.music.load('bolt2.wav')
-        pygame.mixer.music.play()
+        if self.sounds is not None:
+            self.sounds.play_move(self.turn)
 
     def play_turn(self, box):
         """
-        Marks x or o if cursor clicks empty box, calls play_sound method with each drawn x or o
-        changes caption to display whose turn it currently is
+        Marks the box for the player whose turn it is if it is empty. The observers attached to the game draw the x or o,
+        play the sound and change the caption to display whose turn it currently is
         :param box: box object
         :return:
         """
         if box.state != 0:
             return
-        if self.turn == 1:
-            box.mark_x()
-            box.state = 1
-            self.play_sound()
-            self.turn = 2
-        elif self.turn == 2:
-            box.mark_o()
-            box.state = 2
-            self.play_sound()
-            self.turn = 1
-        pygame.display.set_caption('Tic Tac Toe - Player %d Turn' % self.turn)
+        self.game.place(box.index)
+        self.redo_moves = []
         return
+
+    def undo(self):
+        """
+        Takes back the last move. The game state reverses only the counters of the lines through the box, and only that
+        box is repainted unless the game over banner has to be cleared
+        :return: index of the box cleared, or None if no move has been played
+        """
+        if not self.game.history:
+            return None
+        index = self.game.undo()
+        self.redo_moves.append(index)
+        self.game_over = False
+        return index
+
+    def redo(self):
+        """
+        Plays the last move taken back with undo again
+        :return: index of the box marked, or None if there is nothing to redo
+        """
+        if not self.redo_moves:
+            return None
+        index = self.redo_moves.pop()
+        self.game.place(index)
+        self.check_game_over()
+        return index
+
+    def redraw(self):
+        """
+        Draws the grid and every mark again, keeping the current boxes
+        :return:
+        """
+        self.surface.fill(BLACK)
+        self.draw_lines()
+        cells = self.game.cells
+        for index in range(self.game.size):
+            if cells[index]:
+                self.boxes[index].redraw()
+        if self.highlighted is not None:
+            self.highlighted.redraw(highlight=True)
+        self.mark_dirty()
     
     def calculate_winners(self):
         """
-        Calculates the winning combinations
+        Gets the winning combinations and, for each box, the numbers of the combinations passing through it.
+        Both come from a table shared by every board with the same grid size and win length, and the game state keeps
+        a counter per combination and player as boxes are marked
         :return:
         """
-        self.winning_combinations = []
-        indices = [x for x in range(0, self.grid_size * self.grid_size)]
-        
-        # Vertical combinations
-        self.winning_combinations += ([tuple(indices[i:i+self.grid_size]) for i in range(0, len(indices), self.grid_size)])
-        
-        # Horizontal combinations
-        self.winning_combinations += [tuple([indices[x] for x in range(y, len(indices), self.grid_size)]) for y in range(0, self.grid_size)]
-        
-        # Diagonal combinations
-        self.winning_combinations.append(tuple(x for x in range(0, len(indices), self.grid_size + 1)))
-        self.winning_combinations.append(tuple(x for x in range(self.grid_size - 1, len(indices), self.grid_size - 1)))
+        self.winning_combinations = self.game.lines
+        self.box_lines = self.game.cell_lines
     
     def check_for_winner(self):
         """
-        Checks to see if there is a winner
+        Checks to see if there is a winner. The game state updates the counters of the lines through each box as it is
+        marked, so this is a lookup rather than a scan
         :return:
         """
-        winner = 0
-        for combination in self.winning_combinations:
-            states = []
-            for index in combination:
-                states.append(self.boxes[index].state)
-            if all(x == 1 for x in states):
-                winner = 1
-            if all(x == 2 for x in states):
-                winner = 2
-        return winner
+        return self.game.winner
     
     def check_game_over(self):
         """
         Checks to see if the win or draw condition has been met
         :return:
         """
-        winner = self.check_for_winner()
-        if winner:
-            self.game_over = True
-        elif all(box.state in [1, 2] for box in self.boxes):
+        if self.check_for_winner() or self.game.full:
             self.game_over = True
-        if self.game_over:
-            self.display_game_over(winner)
     
     def display_game_over(self, winner):
         """
-        Makes rectangle to display game over, plays victory or draw sound
+        Makes rectangle to display game over
         :param winner: Winner of game, type int = 1 or 2
         :return:
         """
         surface_size = self.surface.get_height()
-        font = pygame.font.Font('freesansbold.ttf', int(surface_size / 8))
 
         if winner:
             text = 'Player %s won!' % winner
             pygame.display.set_caption('Tic Tac Toe - Player %s Won' % winner)
-            pygame.mixer.music.load('victory.wav')
         else:
             text = 'Draw!'
             pygame.display.set_caption('Tic Tac Toe - Draw Game')
-            pygame.mixer.music.load('aww.wav')
 
-        text = font.render(text, True, YELLOW, BLUE)
+        text = text_surface(text, int(surface_size / 8))
         rect = text.get_rect()
         rect.center = (surface_size / 2, surface_size / 2)
 
-        pygame.mixer.music.play()
-
         self.surface.blit(text, rect)
+        self.mark_dirty(rect)
         self.display_end_menu()
-
-class TicTacTest(unittest.TestCase):
-    def test_init(self):
-        """
-        Initializes board object with not default sizes, checks to see that the sizes are correct
-        :return:
-        """
-        board = Board(5, 100, 10, 3)
-        self.assertTrue(board.grid_size == 5)
-        self.assertFalse(board.box_size == 200)
-        self.assertTrue(board.border == 10)
-        self.assertTrue(board.line_width == 3)
-
-    def test_setup(self):
-        """
-        Initializes board object, checks to see if game_over initalized to 0
-        :return:
-        """
-        board = Board()
-        self.assertTrue(board.game_over == False)
-
-    def test_initialize_boxes(self):
-        """
-        Initializes board object, checks to see if there are 9 box objects, iteratures through self.boxes to make sure
-        all the items are box objects
-        :return:
-        """
-        board = Board()
-        self.assertTrue(len(board.boxes) == 9)
-        for i in board.boxes:
-            self.assertIsInstance(i, Box)
-
-    def test_get_box_at_pixel(self):
-        """
-        Initializes a board object, checks to see if pos 0,0 is a not a box and 30, 30 is a box
-        :return:
-        """
-        board = Board()
-        self.assertNotIsInstance(board.get_box_at_pixel(0, 0), Box)
-        self.assertIsInstance(board.get_box_at_pixel(30, 30), Box)
-
-    def test_play_sound(self):
-        """
-        Initializes a board object, calls the play sound method and checks if sound is playing, pauses for 3 seconds
-        to check if the sound isn't playing
-        :return:
-        """
-        board = Board()
-        pygame.init()
-        board.play_sound()
-        self.assertTrue(pygame.mixer.music.get_busy() == True)
-        time.sleep(3)
-        self.assertFalse(pygame.mixer.music.get_busy())
-
-    def test_process_click(self):
-        """
-        Initializes board object, plays a turn, checks to see if it is player two's turn
-        :return:
-        """
-        board = Board()
-        pygame.init()
-        board.process_click(30, 30)
-        self.assertTrue(board.turn == 2)
-
-
-if __name__ == "__main__":
-    unittest.main()
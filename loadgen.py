@@ -0,0 +1,159 @@
+"""
+Load generator for server.py.
+
+Opens many client connections, each playing random legal moves in back-to-back games, and reports the moves per
+second the server handled and the latency of each move, from sending MOVE to receiving the matching MOVED.
+
+    python loadgen.py --port 8765 --clients 1000 --games 10
+    python loadgen.py --serve --clients 1000     (runs a server in the same process)
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from engine import GameState
+from server import GameServer
+
+
+def percentile(values, fraction):
+    """
+    Gets a percentile of a list of numbers by the nearest-rank method
+    :param values: sorted list
+    :param fraction: 0.5 for the median, 0.99 for p99
+    :return: number, or 0 for an empty list
+    """
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+async def run_client(host, port, games, grid_size, win_length, seed, latencies, timeout=30):
+    """
+    Plays games through one connection, giving up if no opponent turns up in time
+    :param host: server address
+    :param port: server port
+    :param games: number of games to play
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win
+    :param seed: seed for picking moves
+    :param latencies: list to append each move's latency in seconds to
+    :param timeout: seconds to wait for an opponent before closing the connection
+    :return: number of games finished
+    """
+    generator = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    finished = 0
+    sent_at = None
+
+    def send_move(game):
+        writer.write(b'MOVE %d\n' % generator.choice(game.legal_moves()))
+        return time.perf_counter()
+
+    try:
+        for _ in range(games):
+            writer.write(b'JOIN %d %d\n' % (grid_size, win_length))
+            game = None
+            player = 0
+            while True:
+                if game is None:
+                    try:
+                        line = await asyncio.wait_for(reader.readline(), timeout)
+                    except asyncio.TimeoutError:
+                        return finished
+                else:
+                    line = await reader.readline()
+                words = line.split()
+                if not words:
+                    return finished
+                command = words[0]
+                if command == b'START':
+                    player = int(words[1])
+                    game = GameState(grid_size, win_length)
+                    if player == 1:
+                        sent_at = send_move(game)
+                elif command == b'MOVED':
+                    mover, index = int(words[1]), int(words[2])
+                    game.place(index)
+                    if mover == player:
+                        latencies.append(time.perf_counter() - sent_at)
+                    elif not game.game_over:
+                        sent_at = send_move(game)
+                elif command == b'OVER':
+                    finished += 1
+                    break
+                elif command == b'LEFT':
+                    break
+                elif command == b'ERROR':
+                    raise RuntimeError(b' '.join(words).decode('ascii'))
+        writer.write(b'QUIT\n')
+        await writer.drain()
+    finally:
+        writer.close()
+    return finished
+
+
+async def run_load(host, port, clients=100, games=10, grid_size=3, win_length=None, seed=0, timeout=30):
+    """
+    Runs many clients at once against a server
+    :param host: server address
+    :param port: server port
+    :param clients: number of connections, two per match, so it must be even
+    :param games: games per connection
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win, defaults to grid_size
+    :param seed: seed the clients' seeds are derived from
+    :param timeout: seconds a client waits for an opponent before giving up
+    :return: dict with the games finished, moves, seconds, moves per second, and p50 and p99 latency in milliseconds
+    """
+    if clients % 2:
+        raise ValueError('clients play in pairs, so their number must be even')
+    if win_length is None:
+        win_length = grid_size
+    latencies = []
+    start = time.perf_counter()
+    finished = await asyncio.gather(*[run_client(host, port, games, grid_size, win_length, seed * clients + number,
+                                                 latencies, timeout) for number in range(clients)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'games': sum(finished) // 2,
+        'moves': len(latencies),
+        'seconds': elapsed,
+        'moves_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Play random games against a Tic Tac Toe server and time the moves')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve', action='store_true', help='run a server in this process on a free port')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--grid-size', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=30, help='seconds a client waits for an opponent')
+    args = parser.parse_args()
+    if args.clients < 2 or args.clients % 2:
+        parser.error('--clients must be a positive even number, as clients play in pairs')
+
+    async def main():
+        server = None
+        port = args.port
+        if args.serve:
+            server = GameServer()
+            port = await server.start(args.host, 0)
+        try:
+            return await run_load(args.host, port, args.clients, args.games, args.grid_size, args.win_length,
+                                  args.seed, args.timeout)
+        finally:
+            if server is not None:
+                await server.stop()
+
+    report = asyncio.run(main())
+    for name in ('games', 'moves', 'seconds', 'moves_per_second', 'p50_ms', 'p99_ms'):
+        print('%-17s %s' % (name, report[name]))
@@ -0,0 +1,174 @@
+"""
+Monte Carlo Tree Search player for grids too large to search exactly.
+
+Each iteration walks down the tree by UCT, adds one node, plays random moves to the end of the game on a copy of the
+headless GameState and credits the result to every node on the way back up. Nodes use __slots__ and keep their
+untried moves in an array of unsigned shorts, and the tree under the move actually played is kept for the next turn.
+"""
+import math
+import random
+import time
+from array import array
+
+
+class Node(object):
+    """
+    One position in the search tree, reached by playing move
+    """
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried', 'wins', 'visits')
+
+    def __init__(self, move, player, parent):
+        """
+        :param move: box index played to reach this position, or None for the root
+        :param player: player who played move
+        :param parent: Node or None
+        """
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        # Filled in on the first visit, so leaves that are never revisited cost no move list
+        self.untried = None
+        self.wins = 0.0
+        self.visits = 0
+
+
+class MCTSPlayer(object):
+    """
+    UCT search with random playouts, limited by a number of iterations, a time budget or both
+    """
+
+    def __init__(self, iterations=None, time_budget=1.0, exploration=math.sqrt(2), seed=None):
+        """
+        :param iterations: playouts per move, or None to use only the time budget
+        :param time_budget: seconds per move, or None to use only the iteration count
+        :param exploration: UCT exploration constant
+        :param seed: seed for the random playouts, so searches with an iteration count can be repeated
+        """
+        if iterations is None and time_budget is None:
+            raise ValueError('Either iterations or time_budget must be set')
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.root = None
+        self.root_history = None
+
+    def advance(self, game):
+        """
+        Moves the root down to the position of a game, keeping the subtree already searched below it when the game
+        continues from the last search
+        :param game: GameState
+        :return: Node
+        """
+        root = None
+        history = game.history
+        if self.root is not None and len(history) == game.moves and \
+                history[:len(self.root_history)] == self.root_history:
+            root = self.root
+            for move in history[len(self.root_history):]:
+                root = next((child for child in root.children if child.move == move), None)
+                if root is None:
+                    break
+        if root is None:
+            root = Node(None, 3 - game.turn, None)
+        root.parent = None
+        # A position unpacked from bytes has no history, so its tree cannot be matched to a later position
+        self.root = root if len(history) == game.moves else None
+        self.root_history = list(history)
+        return root
+
+    def search(self, game):
+        """
+        Runs the search from the position of a game, within the iteration and time limits. The game is not changed
+        :param game: GameState
+        :return: root Node
+        """
+        if game.game_over:
+            raise ValueError('The game is over')
+        root = self.advance(game)
+        state = game.copy()
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        iteration = 0
+        while self.iterations is None or iteration < self.iterations:
+            if deadline is not None and iteration and time.perf_counter() > deadline:
+                break
+            self.iterate(root, state)
+            iteration += 1
+        return root
+
+    def choose_move(self, game):
+        """
+        Picks the most visited move for the player whose turn it is. The game itself is not changed
+        :param game: GameState
+        :return: box index
+        """
+        root = self.search(game)
+        return max(root.children, key=lambda child: (child.visits, -child.move)).move
+
+    def iterate(self, root, state):
+        """
+        Runs one selection, expansion, playout and backup from the root
+        :param root: Node for the position of state
+        :param state: GameState that is changed during the iteration and restored afterwards
+        :return:
+        """
+        node = root
+        depth = 0
+        log = math.log
+        sqrt = math.sqrt
+        exploration = self.exploration
+
+        # Selection: follow UCT while the node has been expanded and every move from it has a child
+        while node.untried is not None and not node.untried and node.children:
+            log_visits = log(node.visits)
+            node = max(node.children, key=lambda child: child.wins / child.visits +
+                       exploration * sqrt(log_visits / child.visits))
+            state.place(node.move)
+            depth += 1
+
+        # Expansion: add one child for a move not tried yet
+        if not state.game_over:
+            if node.untried is None:
+                moves = state.legal_moves()
+                self.random.shuffle(moves)
+                node.untried = array('H', moves)
+            if node.untried:
+                move = node.untried.pop()
+                child = Node(move, state.turn, node)
+                node.children.append(child)
+                node = child
+                state.place(move)
+                depth += 1
+
+        # Playout: random moves on a copy until the game ends
+        winner = self.playout(state)
+
+        # Backup
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1.0
+            elif not winner:
+                node.wins += 0.5
+            node = node.parent
+        for _ in range(depth):
+            state.undo()
+
+    def playout(self, state):
+        """
+        Plays random moves from a position until the game ends
+        :param state: GameState, which is not changed
+        :return: winner, or 0 for a draw
+        """
+        if state.game_over:
+            return state.winner
+        playout = state.copy()
+        moves = playout.legal_moves()
+        self.random.shuffle(moves)
+        place = playout.place
+        for move in moves:
+            place(move)
+            if playout.winner:
+                break
+        return playout.winner
@@ -0,0 +1,297 @@
+"""
+Append-only binary log of finished games.
+
+Each game is written as one record when it ends, so a log never holds half a game and can be copied or read while
+games are still being added. A sidecar index file holds the offset of every record, so game N of a large archive is
+one seek away. Readers are generators that keep only the current game in memory.
+
+File layout, all little-endian:
+    header: magic b'TTTL', version (uint16)
+    record: grid_size, win_length (uint16 each), winner (uint8, 0 for a draw, UNFINISHED for an abandoned game),
+            payload length (uint32), then the moves: one byte per move on grids of up to 256 boxes, otherwise
+            each box index as a varint (7 bits per byte, low bits first, high bit set on every byte but the last)
+Index, at the log's path plus '.idx': the offset of every record as a uint64.
+
+    python movelog.py games.log            (prints a summary of every game)
+    python movelog.py games.log --game 5   (replays one game)
+"""
+import argparse
+import os
+import struct
+
+from engine import GameState, Observer
+
+
+MAGIC = b'TTTL'
+VERSION = 1
+HEADER = struct.Struct('<4sH')
+RECORD = struct.Struct('<HHBI')
+OFFSET = struct.Struct('<Q')
+
+# Winner stored for a game that was cleared before it ended
+UNFINISHED = 0xFF
+
+# Largest number of boxes whose moves are stored as one byte each
+BYTE_MOVES_BOXES = 256
+
+
+def index_path(path):
+    """
+    Gets the path of a log's index file
+    :param path: log path
+    :return: str
+    """
+    return path + '.idx'
+
+
+def encode_moves(size, moves):
+    """
+    Packs a game's moves
+    :param size: number of boxes on the grid
+    :param moves: box indices in the order they were played
+    :return: bytes
+    """
+    if size <= BYTE_MOVES_BOXES:
+        return bytes(moves)
+    data = bytearray()
+    for index in moves:
+        while index >= 0x80:
+            data.append(index & 0x7F | 0x80)
+            index >>= 7
+        data.append(index)
+    return bytes(data)
+
+
+def decode_moves(size, data):
+    """
+    Unpacks moves packed by encode_moves
+    :param size: number of boxes on the grid
+    :param data: bytes
+    :return: sequence of box indices
+    """
+    if size <= BYTE_MOVES_BOXES:
+        return data
+    moves = []
+    index = shift = 0
+    for byte in data:
+        index |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            moves.append(index)
+            index = shift = 0
+    return moves
+
+
+class MoveLogWriter(object):
+    """
+    Appends games to a log and their offsets to its index
+    """
+
+    def __init__(self, path):
+        """
+        :param path: log path; a new log is started if the file does not exist
+        """
+        self.path = path
+        self.log = open(path, 'ab')
+        if self.log.tell() == 0:
+            self.log.write(HEADER.pack(MAGIC, VERSION))
+            self.log.flush()
+        elif not os.path.exists(index_path(path)):
+            build_index(path)
+        self.index = open(index_path(path), 'ab')
+        self.games = self.index.tell() // OFFSET.size
+
+    def close(self):
+        """
+        Closes the log and its index
+        :return:
+        """
+        self.log.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_game(self, grid_size, win_length, winner, moves):
+        """
+        Appends one game. The record is flushed before its offset is added to the index, so the index never points
+        past the end of the log
+        :param grid_size: number of boxes along one side of the grid
+        :param win_length: marks in a row needed to win
+        :param winner: 1 or 2, 0 for a draw, or UNFINISHED
+        :param moves: box indices in the order they were played
+        :return: number of the game in the log, counting from 0
+        """
+        payload = encode_moves(grid_size * grid_size, moves)
+        offset = self.log.tell()
+        self.log.write(RECORD.pack(grid_size, win_length, winner, len(payload)) + payload)
+        self.log.flush()
+        self.index.write(OFFSET.pack(offset))
+        self.index.flush()
+        self.games += 1
+        return self.games - 1
+
+
+class MoveRecorder(Observer):
+    """
+    Writes every game played on a GameState to a log: finished games when they end, and games cleared before their
+    end as UNFINISHED. Each game is written once; taking moves back and playing them again to the same end does not
+    write it again, while playing on to a different end writes the new game
+    """
+
+    def __init__(self, writer):
+        """
+        :param writer: MoveLogWriter
+        """
+        self.writer = writer
+        # Moves of the last game written since the last reset, or None
+        self.written = None
+
+    def is_written(self, game):
+        """
+        Checks whether a game's moves are those of the last game written, or the start of them after taking moves back
+        :param game: GameState
+        :return: bool
+        """
+        history = game.history
+        return self.written is not None and history == self.written[:len(history)]
+
+    def on_reset(self, game):
+        self.written = None
+
+    def on_game_over(self, game, winner):
+        if not self.is_written(game):
+            self.writer.write_game(game.grid_size, game.win_length, winner, game.history)
+            self.written = list(game.history)
+
+    def abandon(self, game):
+        """
+        Writes the game so far as UNFINISHED, unless it is empty or was already written; call before clearing a game
+        that has not ended
+        :param game: GameState
+        :return:
+        """
+        if game.history and not self.is_written(game):
+            self.writer.write_game(game.grid_size, game.win_length, UNFINISHED, game.history)
+            self.written = list(game.history)
+
+
+def _check_header(log, path):
+    """
+    Reads and checks the header at the start of a log
+    :param log: file opened for binary reading
+    :param path: log path, for the error message
+    :return:
+    """
+    data = log.read(HEADER.size)
+    if len(data) != HEADER.size or HEADER.unpack(data) != (MAGIC, VERSION):
+        raise ValueError('%s is not a move log' % path)
+
+
+def count_games(path):
+    """
+    Gets the number of games in a log from its index
+    :param path: log path
+    :return: int
+    """
+    return os.path.getsize(index_path(path)) // OFFSET.size
+
+
+def game_offset(path, number):
+    """
+    Looks up where a game starts in a log
+    :param path: log path
+    :param number: number of the game, counting from 0
+    :return: byte offset of the game's record
+    """
+    with open(index_path(path), 'rb') as index:
+        index.seek(number * OFFSET.size)
+        data = index.read(OFFSET.size)
+    if len(data) != OFFSET.size:
+        raise IndexError('%s has no game %d' % (path, number))
+    return OFFSET.unpack(data)[0]
+
+
+def read_games(path, start=0):
+    """
+    Reads games from a log one at a time
+    :param path: log path
+    :param start: number of the first game to read, found through the index
+    :return: generator of (grid_size, win_length, winner, moves) tuples
+    """
+    with open(path, 'rb') as log:
+        _check_header(log, path)
+        if start:
+            log.seek(game_offset(path, start))
+        while True:
+            data = log.read(RECORD.size)
+            if len(data) < RECORD.size:
+                return
+            grid_size, win_length, winner, length = RECORD.unpack(data)
+            payload = log.read(length)
+            if len(payload) < length:
+                return
+            yield grid_size, win_length, winner, decode_moves(grid_size * grid_size, payload)
+
+
+def replay(path, start=0):
+    """
+    Plays the games of a log through the rules engine one at a time, checking each ends the way the log says
+    :param path: log path
+    :param start: number of the first game to replay
+    :return: generator of GameState, each at the end of its game
+    """
+    for grid_size, win_length, winner, moves in read_games(path, start):
+        game = GameState(grid_size, win_length)
+        for index in moves:
+            game.place(index)
+        if winner != UNFINISHED and (not game.game_over or game.winner != winner):
+            raise ValueError('Game %s on a %dx%d grid does not end with winner %d'
+                             % (list(moves), grid_size, grid_size, winner))
+        yield game
+
+
+def build_index(path):
+    """
+    Rewrites the index of a log by walking its record headers, for logs copied without their index
+    :param path: log path
+    :return: number of games found
+    """
+    games = 0
+    with open(path, 'rb') as log, open(index_path(path), 'wb') as index:
+        _check_header(log, path)
+        end = os.fstat(log.fileno()).st_size
+        offset = log.tell()
+        while offset + RECORD.size <= end:
+            length = RECORD.unpack(log.read(RECORD.size))[3]
+            if offset + RECORD.size + length > end:
+                break
+            index.write(OFFSET.pack(offset))
+            games += 1
+            offset = log.seek(length, os.SEEK_CUR)
+    return games
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Summarize or replay the games in a move log')
+    parser.add_argument('path')
+    parser.add_argument('--game', type=int, default=None, help='replay only this game, counting from 0')
+    args = parser.parse_args()
+    if args.game is not None:
+        game = next(replay(args.path, args.game))
+        for y in range(game.grid_size):
+            print(' '.join('.xo'[game.state_at(x * game.grid_size + y)] for x in range(game.grid_size)))
+        print('moves %s, winner %d' % (game.history, game.winner))
+    else:
+        totals = {}
+        for grid_size, win_length, winner, moves in read_games(args.path):
+            key = (grid_size, win_length, winner)
+            totals[key] = totals.get(key, 0) + 1
+        for (grid_size, win_length, winner), games in sorted(totals.items()):
+            print('%dx%d, %d in a row, %s: %d' % (grid_size, grid_size, win_length,
+                                                 'unfinished' if winner == UNFINISHED else
+                                                 'draw' if winner == 0 else 'player %d won' % winner, games))
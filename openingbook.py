@@ -0,0 +1,244 @@
+"""
+Opening books built from self-play.
+
+build() plays games between two copies of a bot, playing a random move now and then during the opening so the games
+differ, and counts how each move played in the first few positions scored for the player who made it. The book keeps
+the best scoring move of every position seen often enough, keyed by the position's canonical key, so one entry
+covers all 8 rotations and reflections of a position. A player then looks its first moves up instead of searching,
+which matters most on large grids where search is slowest.
+
+File layout, all little-endian:
+    header:  magic b'TTTB', version, grid_size, win_length, depth (4 x uint16 after the magic), entry count (uint32)
+    entries: canonical key (2 * grid_size * grid_size bits, rounded up to whole bytes), move in the canonical frame
+             (uint16), games the move was played in (uint32)
+
+    python openingbook.py book15.bin --grid-size 15 --win-length 5 --games 2000 --depth 4 --bot mcts:300
+    python tictactoe.py --ai --book book3.bin
+"""
+import argparse
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import GameState
+from symmetry import canonical_key, canonical_move, symmetry_tables
+
+
+MAGIC = b'TTTB'
+VERSION = 1
+HEADER = struct.Struct('<4sHHHHI')
+ENTRY = struct.Struct('<HI')
+
+# Books keyed by path, so every player in a process shares one copy
+_books = {}
+
+
+class OpeningBook(object):
+    """
+    Best known move of the positions in the first moves of a game, for one grid size and win length
+    """
+
+    def __init__(self, grid_size, win_length, depth, moves=None):
+        """
+        :param grid_size: number of boxes along one side of the grid
+        :param win_length: marks in a row needed to win
+        :param depth: number of moves into the game the book covers
+        :param moves: dict mapping a canonical key to (move in the canonical frame, games it was played in)
+        """
+        self.grid_size = grid_size
+        self.win_length = win_length
+        self.depth = depth
+        self.moves = {} if moves is None else moves
+
+    def __len__(self):
+        return len(self.moves)
+
+    def matches(self, game):
+        """
+        Checks the book was built for a game's rules
+        :param game: GameState
+        :return: bool
+        """
+        return (self.grid_size, self.win_length) == (game.grid_size, game.win_length)
+
+    def lookup(self, game):
+        """
+        Finds the book move for the player whose turn it is
+        :param game: GameState
+        :return: box index, or None if the position is not in the book
+        """
+        if game.moves >= self.depth or not self.matches(game):
+            return None
+        key, symmetry = canonical_key(game)
+        entry = self.moves.get(key)
+        if entry is None:
+            return None
+        return symmetry_tables(game.grid_size)[1][symmetry][entry[0]]
+
+    def write(self, path):
+        """
+        Writes the book to a file
+        :param path: file to create or replace
+        :return:
+        """
+        key_size = (2 * self.grid_size * self.grid_size + 7) // 8
+        with open(path, 'wb') as book:
+            book.write(HEADER.pack(MAGIC, VERSION, self.grid_size, self.win_length, self.depth, len(self.moves)))
+            for key in sorted(self.moves):
+                book.write(key.to_bytes(key_size, 'little'))
+                book.write(ENTRY.pack(*self.moves[key]))
+
+    @classmethod
+    def read(cls, path):
+        """
+        Reads a book written by write
+        :param path: book file
+        :return: OpeningBook
+        """
+        with open(path, 'rb') as book:
+            data = book.read()
+        if len(data) < HEADER.size:
+            raise ValueError('%s is not an opening book' % path)
+        magic, version, grid_size, win_length, depth, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('%s is not an opening book' % path)
+        key_size = (2 * grid_size * grid_size + 7) // 8
+        if len(data) != HEADER.size + count * (key_size + ENTRY.size):
+            raise ValueError('%s is truncated' % path)
+        moves = {}
+        offset = HEADER.size
+        for _ in range(count):
+            key = int.from_bytes(data[offset:offset + key_size], 'little')
+            moves[key] = ENTRY.unpack_from(data, offset + key_size)
+            offset += key_size + ENTRY.size
+        return cls(grid_size, win_length, depth, moves)
+
+
+def load(path):
+    """
+    Gets the book in a file, reading it only the first time it is asked for
+    :param path: book file
+    :return: OpeningBook
+    """
+    path = os.path.abspath(path)
+    book = _books.get(path)
+    if book is None:
+        book = _books[path] = OpeningBook.read(path)
+    return book
+
+
+class BookPlayer(object):
+    """
+    Plays book moves while the position is in the book, then lets another player choose
+    """
+
+    def __init__(self, book, player):
+        """
+        :param book: OpeningBook
+        :param player: object with a choose_move(game) method, used outside the book
+        """
+        self.book = book
+        self.player = player
+
+    def choose_move(self, game):
+        """
+        Picks a move for the player whose turn it is
+        :param game: GameState
+        :return: box index
+        """
+        move = self.book.lookup(game)
+        if move is None:
+            move = self.player.choose_move(game)
+        return move
+
+
+def self_play(job):
+    """
+    Plays one game between two copies of a bot, sometimes playing a random move instead during the opening
+    :param job: tuple of (bot spec as in tournament.py, grid_size, win_length, depth, chance of a random move, seed)
+    :return: tuple of (moves played, winner)
+    """
+    # Imported here because tournament loads pygame through lib
+    from tournament import make_bot
+    spec, grid_size, win_length, depth, explore, seed = job
+    game = GameState(grid_size, win_length)
+    generator = random.Random(seed)
+    bots = (None, make_bot(spec, seed), make_bot(spec, seed + 1))
+    while not game.game_over:
+        if game.moves < depth and generator.random() < explore:
+            move = generator.choice(game.legal_moves())
+        else:
+            move = bots[game.turn].choose_move(game)
+        game.place(move)
+    return game.history, game.winner
+
+
+def build(grid_size, win_length, games, depth, bot='mcts:200', explore=0.25, min_games=3, workers=None, seed=0):
+    """
+    Builds a book from self-play. A move scores 1 for a win, 0.5 for a draw and 0 for a loss of the player who made it,
+    and each position keeps the move with the best average score among those played at least min_games times
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win
+    :param games: number of games to play
+    :param depth: number of moves into the game the book covers
+    :param bot: bot spec as in tournament.py
+    :param explore: chance of a random move instead of the bot's during the opening
+    :param min_games: games a move must have been played in to go in the book
+    :param workers: number of processes, defaults to the number of CPUs; 1 plays the games in this process
+    :param seed: seed of the first game
+    :return: OpeningBook
+    """
+    jobs = [(bot, grid_size, win_length, depth, explore, seed + 2 * number) for number in range(games)]
+    workers = workers or os.cpu_count() or 1
+    # Games and points for each move, keyed by canonical key and then by move in the canonical frame
+    statistics = {}
+
+    def count(results):
+        for history, winner in results:
+            game = GameState(grid_size, win_length)
+            for move in history[:depth]:
+                key, canonical = canonical_move(game, move)
+                points = 2 if winner == game.turn else 1 if winner == 0 else 0
+                entry = statistics.setdefault(key, {}).setdefault(canonical, [0, 0])
+                entry[0] += 1
+                entry[1] += points
+                game.place(move)
+
+    if workers == 1:
+        count(map(self_play, jobs))
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            count(executor.map(self_play, jobs, chunksize=max(1, games // (workers * 16))))
+
+    book = OpeningBook(grid_size, win_length, depth)
+    for key, moves in statistics.items():
+        played = [(points / float(played), played, move) for move, (played, points) in moves.items()
+                  if played >= min_games]
+        if played:
+            _, played, move = max(played)
+            book.moves[key] = (move, played)
+    return book
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build an opening book from self-play')
+    parser.add_argument('path')
+    parser.add_argument('--grid-size', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None, help='defaults to the grid size')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--depth', type=int, default=4, help='number of moves into the game the book covers')
+    parser.add_argument('--bot', default='mcts:200', help='bot spec as in tournament.py')
+    parser.add_argument('--explore', type=float, default=0.25,
+                        help='chance of a random move instead of the bot\'s during the opening')
+    parser.add_argument('--min-games', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    built = build(args.grid_size, args.win_length or args.grid_size, args.games, args.depth, args.bot, args.explore,
+                  args.min_games, args.workers, args.seed)
+    built.write(args.path)
+    print('%d positions from %d games written to %s in %.1f s'
+          % (len(built), args.games, args.path, time.perf_counter() - started))
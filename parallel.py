@@ -0,0 +1,107 @@
+"""
+Root-parallel Monte Carlo Tree Search over a process pool.
+
+Each worker process receives the position as the few bytes of GameState.to_bytes, grows its own MCTS tree from it
+with its own seed, and sends back the visit and win totals of the root's children. The totals are summed in worker
+order and the most visited move is played, so with an iteration limit the same seed always gives the same move.
+"""
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import GameState
+from mcts import MCTSPlayer
+
+
+def search_worker(payload, iterations, time_budget, exploration, seed):
+    """
+    Searches a position in a worker process
+    :param payload: bytes from GameState.to_bytes
+    :param iterations: playouts, or None to use only the time budget
+    :param time_budget: seconds, or None to use only the iteration count
+    :param exploration: UCT exploration constant
+    :param seed: seed for this worker's playouts
+    :return: list of (move, visits, wins) for each move tried from the position
+    """
+    player = MCTSPlayer(iterations, time_budget, exploration, seed)
+    root = player.search(GameState.from_bytes(payload))
+    return [(child.move, child.visits, child.wins) for child in root.children]
+
+
+def merge_results(results):
+    """
+    Sums the root statistics of several searches
+    :param results: lists of (move, visits, wins), one per worker, in worker order
+    :return: dict mapping move to [visits, wins]
+    """
+    totals = {}
+    for result in results:
+        for move, visits, wins in result:
+            total = totals.setdefault(move, [0, 0.0])
+            total[0] += visits
+            total[1] += wins
+    return totals
+
+
+class ParallelMCTSPlayer(object):
+    """
+    Runs one MCTS search per worker process on the same position and plays the move with the most visits overall
+    """
+
+    def __init__(self, workers=None, iterations=None, time_budget=1.0, exploration=math.sqrt(2), seed=0):
+        """
+        :param workers: number of processes, defaults to the number of CPUs
+        :param iterations: playouts per worker per move, or None to use only the time budget
+        :param time_budget: seconds per move, or None to use only the iteration count
+        :param exploration: UCT exploration constant
+        :param seed: seed the worker seeds are drawn from
+        """
+        if iterations is None and time_budget is None:
+            raise ValueError('Either iterations or time_budget must be set')
+        self.workers = workers or os.cpu_count() or 1
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.executor = None
+
+    def close(self):
+        """
+        Shuts the worker processes down
+        :return:
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search(self, game):
+        """
+        Searches a position in every worker and merges the results
+        :param game: GameState, which is not changed
+        :return: dict mapping move to [visits, wins]
+        """
+        if game.game_over:
+            raise ValueError('The game is over')
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+        payload = game.to_bytes()
+        seeds = [self.random.getrandbits(32) for _ in range(self.workers)]
+        futures = [self.executor.submit(search_worker, payload, self.iterations, self.time_budget, self.exploration,
+                                        seed) for seed in seeds]
+        return merge_results([future.result() for future in futures])
+
+    def choose_move(self, game):
+        """
+        Picks the move with the most visits across all workers, the lowest box on a tie
+        :param game: GameState
+        :return: box index
+        """
+        totals = self.search(game)
+        return max(totals, key=lambda move: (totals[move][0], -move))
@@ -0,0 +1,313 @@
+"""
+Opt-in frame profiler for the game loop.
+
+A Profiler keeps the durations of the last few hundred runs of each named section, such as event handling, drawing or
+display updates, and the time between frames. Sections are timed either with the section context manager or by wrap,
+which swaps a method on one object for a timed one, so nothing is timed and nothing is slower unless profiling is on.
+The overlay shows FPS and the p50/p99 frame time in a corner of the window, and on exit the profiler can write a
+Chrome trace (open it at chrome://tracing or https://ui.perfetto.dev) and a cProfile dump.
+
+    TICTACTOE_PROFILE=1 python tictactoe.py
+    python tictactoe.py --profile --trace frames.json --cprofile game.prof
+"""
+import atexit
+import bisect
+import collections
+import os
+import threading
+import time
+
+import pygame
+
+
+# Set to anything but an empty string to profile without the command line flag
+ENVIRONMENT_VARIABLE = 'TICTACTOE_PROFILE'
+
+# Upper bounds, in milliseconds, of the histogram buckets; the last one holds everything slower
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 1000 / 60.0, 1000 / 30.0, 50, 100, float('inf'))
+
+# Trace events kept for the Chrome trace; later sections are still timed but not traced
+MAX_TRACE_EVENTS = 1000000
+
+OVERLAY_TEXT = (255, 255, 0)
+OVERLAY_BACKGROUND = (0, 0, 0)
+
+
+def enabled_from_environment():
+    """
+    Checks if profiling was turned on through the environment
+    :return: bool
+    """
+    return bool(os.environ.get(ENVIRONMENT_VARIABLE))
+
+
+def percentile(samples, fraction):
+    """
+    Gets a percentile of some samples by the nearest-rank method
+    :param samples: iterable of numbers
+    :param fraction: 0.5 for the median, 0.99 for p99
+    :return: number, or 0 without samples
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class _Section(object):
+    """
+    Context manager timing one run of a section
+    """
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+
+
+class _NullSection(object):
+    """
+    Context manager that does nothing, handed out while profiling is off
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_SECTION = _NullSection()
+
+
+class Profiler(object):
+    """
+    Rolling timings of the game loop's sections and frames
+    """
+
+    def __init__(self, enabled=True, window=300, trace_path=None, cprofile_path=None):
+        """
+        :param enabled: False to make every method a no-op
+        :param window: number of recent runs kept per section
+        :param trace_path: Chrome trace JSON file to write on close, or None
+        :param cprofile_path: cProfile stats file to write on close, or None
+        """
+        self.enabled = enabled
+        self.window = window
+        self.trace_path = trace_path
+        self.cprofile_path = cprofile_path
+        # Durations in seconds, keyed by section name. Sections can be recorded on other threads, such as the computer's
+        # search or the sound loader, so samples and trace_events are only touched while holding the lock
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.trace_events = []
+        self.origin = time.perf_counter()
+        self.last_frame = None
+        self.frames = 0
+        self.font = None
+        self.saved = None
+        self.cprofile = None
+        self.closed = False
+        if enabled and cprofile_path:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        if enabled and (trace_path or cprofile_path):
+            atexit.register(self.close)
+
+    def record(self, name, start, end):
+        """
+        Adds a run of a section
+        :param name: section name
+        :param start: time.perf_counter at the start
+        :param end: time.perf_counter at the end
+        :return:
+        """
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = collections.deque(maxlen=self.window)
+            samples.append(end - start)
+            if self.trace_path and len(self.trace_events) < MAX_TRACE_EVENTS:
+                self.trace_events.append({'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                                          'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6})
+
+    def section_samples(self, name):
+        """
+        Copies a section's recent durations, so they can be read while other threads record
+        :param name: section name
+        :return: list of seconds
+        """
+        with self.lock:
+            return list(self.samples.get(name, ()))
+
+    def section_names(self):
+        """
+        Lists the sections recorded so far
+        :return: list of section names
+        """
+        with self.lock:
+            return list(self.samples)
+
+    def section(self, name):
+        """
+        Times a block of code
+        :param name: section name
+        :return: context manager
+        """
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def wrap(self, target, attribute, name=None):
+        """
+        Replaces a method of one object with one that times each call as a section. Does nothing while profiling is off
+        :param target: object whose method is replaced; other objects of its class are not affected
+        :param attribute: method name
+        :param name: section name, defaults to the method name
+        :return:
+        """
+        if not self.enabled:
+            return
+        method = getattr(target, attribute)
+        name = name or attribute
+        record = self.record
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(name, start, clock())
+        setattr(target, attribute, timed)
+
+    def frame(self):
+        """
+        Marks the start of a frame, recording the time since the previous one as the 'frame' section
+        :return:
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.record('frame', self.last_frame, now)
+        self.last_frame = now
+        self.frames += 1
+
+    def percentile(self, name, fraction):
+        """
+        Gets a percentile of a section's recent durations
+        :param name: section name
+        :param fraction: 0.5 for the median, 0.99 for p99
+        :return: seconds
+        """
+        return percentile(self.section_samples(name), fraction)
+
+    def histogram(self, name):
+        """
+        Counts a section's recent durations in the BUCKETS ranges
+        :param name: section name
+        :return: list of counts, one per bucket
+        """
+        counts = [0] * len(BUCKETS)
+        for seconds in self.section_samples(name):
+            counts[bisect.bisect_left(BUCKETS, seconds * 1000)] += 1
+        return counts
+
+    def fps(self):
+        """
+        Gets the frame rate over the recent frames
+        :return: frames per second, or 0 before two frames
+        """
+        frames = self.section_samples('frame')
+        if not frames:
+            return 0
+        return len(frames) / sum(frames)
+
+    def overlay_lines(self, sections=4):
+        """
+        Gets the overlay text: FPS and frame times, then the sections with the slowest p99
+        :param sections: number of sections to list
+        :return: list of strings
+        """
+        lines = ['%.1f FPS  frame p50 %.1f ms  p99 %.1f ms'
+                 % (self.fps(), self.percentile('frame', 0.5) * 1000, self.percentile('frame', 0.99) * 1000)]
+        slowest = sorted((name for name in self.section_names() if name != 'frame'),
+                         key=lambda name: -self.percentile(name, 0.99))
+        for name in slowest[:sections]:
+            lines.append('%s p50 %.2f ms  p99 %.2f ms'
+                         % (name, self.percentile(name, 0.5) * 1000, self.percentile(name, 0.99) * 1000))
+        return lines
+
+    def draw_overlay(self, surface):
+        """
+        Draws the overlay in the top left corner, keeping a copy of what it covers for clear_overlay
+        :param surface: pygame.Surface
+        :return: pygame.Rect drawn on, or None while profiling is off
+        """
+        if not self.enabled:
+            return None
+        if self.font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self.font = pygame.font.Font(None, 18)
+        images = [self.font.render(line, True, OVERLAY_TEXT, OVERLAY_BACKGROUND) for line in self.overlay_lines()]
+        rect = pygame.Rect(0, 0, max(image.get_width() for image in images) + 4,
+                           sum(image.get_height() for image in images) + 4).clip(surface.get_rect())
+        self.saved = (rect, surface.subsurface(rect).copy())
+        surface.fill(OVERLAY_BACKGROUND, rect)
+        y = 2
+        for image in images:
+            surface.blit(image, (2, y))
+            y += image.get_height()
+        return rect
+
+    def clear_overlay(self, surface):
+        """
+        Puts back what the overlay covered, so the game draws on a clean surface
+        :param surface: pygame.Surface
+        :return:
+        """
+        if self.saved is not None:
+            rect, image = self.saved
+            surface.blit(image, rect)
+            self.saved = None
+
+    def summary(self):
+        """
+        Formats every section's recent timings as a table
+        :return: str
+        """
+        lines = ['%-18s %6s %9s %9s %9s' % ('section', 'runs', 'p50 ms', 'p99 ms', 'max ms')]
+        for name in sorted(self.section_names()):
+            samples = self.section_samples(name)
+            lines.append('%-18s %6d %9.3f %9.3f %9.3f' % (name, len(samples), percentile(samples, 0.5) * 1000,
+                                                          percentile(samples, 0.99) * 1000, max(samples) * 1000))
+        return '\n'.join(lines)
+
+    def close(self):
+        """
+        Stops cProfile and writes the trace and cProfile files that were asked for
+        :return:
+        """
+        if not self.enabled or self.closed:
+            return
+        self.closed = True
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.cprofile_path)
+        if self.trace_path:
+            import json
+            with self.lock:
+                events = list(self.trace_events)
+            with open(self.trace_path, 'w') as trace:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace)
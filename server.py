@@ -0,0 +1,264 @@
+"""
+Asyncio match server.
+
+Clients speak a line protocol over TCP. Each match holds only a headless GameState, which checks every move, so the
+server never creates a pygame surface.
+
+Client to server:
+    JOIN [grid_size [win_length]]   wait for an opponent with the same rules, 3 in a row on 3x3 by default
+    MOVE <index>                    mark a box
+    QUIT                            leave the match and close the connection
+
+Server to client:
+    WAIT                            no opponent yet
+    START <player> <grid_size> <win_length>
+    MOVED <player> <index>          sent to both players after every accepted move
+    OVER <winner>                   0 for a draw
+    LEFT                            the opponent disconnected
+    ERROR <message>                 the line was refused; the connection stays open
+
+    python server.py --port 8765 [--record games.log]
+"""
+import argparse
+import asyncio
+
+from engine import GameState
+import movelog
+
+
+# Longest line a client may send, in bytes, unless the largest grid allowed needs a longer JOIN line
+LINE_LIMIT = 2 ** 16
+
+
+class Match(object):
+    """
+    One game between two connections
+    """
+    __slots__ = ('game', 'players')
+
+    def __init__(self, first, second, grid_size, win_length):
+        """
+        :param first: Connection playing x
+        :param second: Connection playing o
+        :param grid_size: number of boxes along one side of the grid
+        :param win_length: marks in a row needed to win
+        """
+        self.game = GameState(grid_size, win_length)
+        self.players = (None, first, second)
+
+
+class Connection(object):
+    """
+    A connected client and the match it is in
+    """
+    __slots__ = ('writer', 'match', 'player', 'rules')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.match = None
+        self.player = 0
+        self.rules = None
+
+    def send(self, line):
+        """
+        Queues a line for the client
+        :param line: message without the newline
+        :return:
+        """
+        self.writer.write(line.encode('ascii') + b'\n')
+
+
+class GameServer(object):
+    """
+    Pairs clients that ask for the same rules and relays their moves
+    """
+
+    def __init__(self, max_grid_size=100, log=None):
+        """
+        :param max_grid_size: largest grid a client may ask for
+        :param log: movelog.MoveLogWriter to append every game to, or None
+        """
+        self.max_grid_size = max_grid_size
+        self.line_limit = max(LINE_LIMIT, len('JOIN %d %d\n' % (max_grid_size, max_grid_size)))
+        self.log = log
+        # One waiting connection per (grid_size, win_length)
+        self.waiting = {}
+        self.matches = 0
+        self.moves = 0
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """
+        Starts listening
+        :param host: address to bind
+        :param port: port to bind, 0 for any free port
+        :return: the port listened on
+        """
+        self.server = await asyncio.start_server(self.handle_client, host, port, limit=self.line_limit)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Stops listening
+        :return:
+        """
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle_client(self, reader, writer):
+        """
+        Reads one client's lines until it disconnects, or sends a line longer than the limit
+        :param reader: asyncio.StreamReader
+        :param writer: asyncio.StreamWriter
+        :return:
+        """
+        connection = Connection(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The part of the line read so far is dropped, so what follows cannot be told from a new line
+                    connection.send('ERROR line too long')
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                words = line.decode('ascii', 'replace').split()
+                if not words:
+                    continue
+                command = words[0].upper()
+                if command == 'QUIT':
+                    break
+                try:
+                    if command == 'JOIN':
+                        self.join(connection, words[1:])
+                    elif command == 'MOVE':
+                        self.move(connection, words[1:])
+                    else:
+                        raise ValueError('unknown command %s' % command)
+                except ValueError as error:
+                    connection.send('ERROR %s' % error)
+                await self.drain(connection)
+        except ConnectionError:
+            pass
+        finally:
+            self.leave(connection)
+            writer.close()
+
+    async def drain(self, connection):
+        """
+        Waits until the lines queued for a client, and for its opponent, are down to the transport's limit, so a
+        client reading slowly holds up the moves sent towards it rather than growing the server's buffers
+        :param connection: Connection
+        :return:
+        """
+        await connection.writer.drain()
+        match = connection.match
+        if match is not None:
+            opponent = match.players[3 - connection.player]
+            try:
+                await opponent.writer.drain()
+            except ConnectionError:
+                # The opponent's own handler sees the connection go and takes it out of the match
+                pass
+
+    def join(self, connection, words):
+        """
+        Puts a client in a match, or in the queue for one
+        :param connection: Connection
+        :param words: optional grid size and win length
+        :return:
+        """
+        if connection.match is not None and not connection.match.game.game_over:
+            raise ValueError('already in a match')
+        try:
+            grid_size = int(words[0]) if words else 3
+            win_length = int(words[1]) if len(words) > 1 else grid_size
+        except ValueError:
+            raise ValueError('grid size and win length must be numbers')
+        if not 1 <= win_length <= grid_size <= self.max_grid_size:
+            raise ValueError('grid size must be at most %d and win length at most the grid size'
+                             % self.max_grid_size)
+        self.leave(connection)
+        rules = (grid_size, win_length)
+        opponent = self.waiting.pop(rules, None)
+        if opponent is None:
+            connection.rules = rules
+            self.waiting[rules] = connection
+            connection.send('WAIT')
+            return
+        opponent.rules = None
+        match = Match(opponent, connection, grid_size, win_length)
+        self.matches += 1
+        for player in (1, 2):
+            match.players[player].match = match
+            match.players[player].player = player
+            match.players[player].send('START %d %d %d' % (player, grid_size, win_length))
+
+    def move(self, connection, words):
+        """
+        Checks and plays a move, then tells both players
+        :param connection: Connection
+        :param words: box index
+        :return:
+        """
+        match = connection.match
+        if match is None:
+            raise ValueError('not in a match')
+        game = match.game
+        if game.game_over:
+            raise ValueError('the game is over')
+        if game.turn != connection.player:
+            raise ValueError('not your turn')
+        try:
+            index = int(words[0])
+        except (IndexError, ValueError):
+            raise ValueError('MOVE needs a box index')
+        if not game.is_legal(index):
+            raise ValueError('box %d cannot be marked' % index)
+        game.place(index)
+        self.moves += 1
+        if game.game_over and self.log is not None:
+            self.log.write_game(game.grid_size, game.win_length, game.winner, game.history)
+        for player in (1, 2):
+            match.players[player].send('MOVED %d %d' % (connection.player, index))
+            if game.game_over:
+                match.players[player].send('OVER %d' % game.winner)
+
+    def leave(self, connection):
+        """
+        Takes a client out of the queue or its match, telling the opponent if the game was still going
+        :param connection: Connection
+        :return:
+        """
+        if connection.rules is not None and self.waiting.get(connection.rules) is connection:
+            del self.waiting[connection.rules]
+        connection.rules = None
+        match = connection.match
+        connection.match = None
+        if match is not None:
+            opponent = match.players[3 - connection.player]
+            if opponent.match is match:
+                opponent.match = None
+                if not match.game.game_over:
+                    opponent.send('LEFT')
+                    if self.log is not None and match.game.history:
+                        game = match.game
+                        self.log.write_game(game.grid_size, game.win_length, movelog.UNFINISHED, game.history)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Host Tic Tac Toe matches over TCP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--record', metavar='PATH', help='append every game to a move log, see movelog.py')
+    args = parser.parse_args()
+
+    async def main():
+        server = GameServer(log=movelog.MoveLogWriter(args.record) if args.record else None)
+        port = await server.start(args.host, args.port)
+        print('Listening on %s:%d' % (args.host, port))
+        await server.server.serve_forever()
+
+    asyncio.run(main())
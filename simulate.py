@@ -0,0 +1,218 @@
+"""
+Batch self-play with NumPy.
+
+A batch plays random moves in all of its games in lockstep: each step marks one box in every game at once and checks
+every game for a win in the same few array operations. Games keep being played after they are won; the step of each
+game's first win is recorded and the later moves are dropped at the end, which is cheaper than tracking which games
+are still running. The final boards come back as one int8 array of shape (games, grid_size, grid_size).
+
+Grids of up to MASK_TABLE_BOXES boxes keep each player's marks as a bitmask per game and look wins up in a table of
+every mask, built once from engine.line_table. Larger grids keep a counter per game, player and line, and only update
+and check the lines through the box just marked. simulate_many splits any number of games into batches of about
+BATCH_BYTES of memory each, so a batch holds fewer games the larger the grid.
+
+    python simulate.py 1000000 --grid-size 3
+"""
+import argparse
+import time
+
+import numpy
+
+from engine import line_table
+
+
+# Largest grid whose win table (one byte per possible set of marks) is built, 64 KB for 4x4
+MASK_TABLE_BOXES = 16
+
+# Win tables keyed by (grid_size, win_length)
+_win_tables = {}
+
+# Memory a batch may use by default, in bytes
+BATCH_BYTES = 256 * 1024 * 1024
+
+# Bytes each game of a batch holds at most per box, while the final boards are built: the order and its ranks (intp), the
+# mask of boxes marked, the marks before the cast (two int64 temporaries) and after it (int8)
+BYTES_PER_BOX = 8 + 8 + 1 + 8 + 8 + 1
+
+
+def win_table(grid_size, win_length):
+    """
+    Gets a table saying, for every possible set of one player's marks on a small grid, whether it holds a line
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win
+    :return: bool array of length 2 ** boxes, indexed by the marks as a bitmask
+    """
+    key = (grid_size, win_length)
+    table = _win_tables.get(key)
+    if table is None:
+        masks = numpy.arange(1 << (grid_size * grid_size), dtype=numpy.uint32)
+        table = numpy.zeros(len(masks), bool)
+        for line_mask in line_table(grid_size, win_length)[1]:
+            table |= masks & line_mask == line_mask
+        _win_tables[key] = table
+    return table
+
+
+def line_counter_table(grid_size, win_length):
+    """
+    Turns the lines through each box into an array padded with an extra line that no box belongs to
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win
+    :return: tuple of (line count, array of shape (boxes, most lines through one box))
+    """
+    lines, masks, cell_lines = line_table(grid_size, win_length)
+    padded = numpy.full((len(cell_lines), max(len(numbers) for numbers in cell_lines)), len(lines), numpy.intp)
+    for index, numbers in enumerate(cell_lines):
+        padded[index, :len(numbers)] = numbers
+    return len(lines), padded
+
+
+def batch_size_for(grid_size, win_length=None, budget=BATCH_BYTES):
+    """
+    Works out how many games fit in a batch using about a given amount of memory. Every game holds a few arrays the
+    size of the grid, and on grids too large for the win table also an int8 counter per player and line and an index
+    per line through the box just marked
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win, defaults to grid_size
+    :param budget: bytes
+    :return: number of games, at least 1
+    """
+    if win_length is None:
+        win_length = grid_size
+    size = grid_size * grid_size
+    per_game = BYTES_PER_BOX * size
+    if size > MASK_TABLE_BOXES:
+        line_count, cell_lines = line_counter_table(grid_size, win_length)
+        per_game += 2 * (line_count + 1) + 2 * numpy.dtype(numpy.intp).itemsize * cell_lines.shape[1]
+    return max(1, budget // per_game)
+
+
+def simulate(games, grid_size=3, win_length=None, seed=None):
+    """
+    Plays a batch of games of random moves
+    :param games: number of games
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win, defaults to grid_size
+    :param seed: seed for numpy.random.default_rng
+    :return: tuple of (boards, winners, lengths): final boards of shape (games, grid_size, grid_size) holding 0, 1 or 2
+        per box, the winner of each game (0 for a draw) and the number of moves each game lasted
+    """
+    if win_length is None:
+        win_length = grid_size
+    size = grid_size * grid_size
+    generator = numpy.random.default_rng(seed)
+
+    # order[g, step] is the box game g marks at that step
+    order = numpy.argsort(generator.random((games, size), numpy.float32), axis=1).astype(numpy.intp, copy=False)
+    winners = numpy.zeros(games, numpy.int8)
+    lengths = numpy.full(games, size, numpy.int16)
+    undecided = numpy.ones(games, bool)
+
+    if size <= MASK_TABLE_BOXES:
+        table = win_table(grid_size, win_length)
+        bits = (1 << numpy.arange(size)).astype(numpy.uint16)
+        marks = numpy.zeros((2, games), numpy.uint16)
+    else:
+        line_count, cell_lines = line_counter_table(grid_size, win_length)
+        # One row of counters per game for each player, plus the padding line; indexed through a flat view
+        counts = numpy.zeros((2, games * (line_count + 1)), numpy.int8)
+        offsets = (numpy.arange(games) * (line_count + 1))[:, None]
+        padding = offsets[:, 0] + line_count
+
+    for step in range(size):
+        player = step % 2
+        moves = order[:, step]
+        if size <= MASK_TABLE_BOXES:
+            numpy.bitwise_or(marks[player], bits[moves], out=marks[player])
+            if step < 2 * win_length - 2:
+                continue
+            won = table[marks[player]]
+        else:
+            through = offsets + cell_lines[moves]
+            counts[player][through] += 1
+            # Boxes near the edge are on fewer lines, so the padding line picks up their moves; keep it empty
+            counts[player][padding] = 0
+            if step < 2 * win_length - 2:
+                # Neither player can have a full line yet
+                continue
+            won = (counts[player][through] == win_length).any(axis=1)
+        won &= undecided
+        winners[won] = player + 1
+        lengths[won] = step + 1
+        undecided &= ~won
+
+    # Box b of game g holds the mark of the step it was played at, if that step came before the game ended
+    ranks = numpy.empty_like(order)
+    ranks[numpy.arange(games)[:, None], order] = numpy.arange(size)
+    boards = numpy.where(ranks < lengths[:, None], 1 + ranks % 2, 0).astype(numpy.int8)
+    return boards.reshape(games, grid_size, grid_size), winners, lengths
+
+
+def report(counts, total_length):
+    """
+    Turns result totals into win rates and an average game length
+    :param counts: games drawn, won by player 1 and won by player 2
+    :param total_length: moves played over all games
+    :return: dict with the number of games, the share won by each player and drawn, and the average game length
+    """
+    games = int(sum(counts))
+    return {
+        'games': games,
+        'player_1': counts[1] / float(games),
+        'player_2': counts[2] / float(games),
+        'draws': counts[0] / float(games),
+        'average_length': total_length / float(games),
+    }
+
+
+def summarize(winners, lengths):
+    """
+    Aggregates the results of a batch
+    :param winners: winner of each game, 0 for a draw
+    :param lengths: number of moves of each game
+    :return: dict as returned by report
+    """
+    return report(numpy.bincount(winners, minlength=3), int(lengths.sum(dtype=numpy.int64)))
+
+
+def simulate_many(games, grid_size=3, win_length=None, seed=None, batch_size=None):
+    """
+    Plays any number of games in batches, keeping only running totals between batches
+    :param games: number of games
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win, defaults to grid_size
+    :param seed: seed for the first batch; later batches use the following seeds
+    :param batch_size: games per batch, by default as many as fit in BATCH_BYTES on this grid
+    :return: dict as returned by report, for all games together
+    """
+    if batch_size is None:
+        batch_size = batch_size_for(grid_size, win_length)
+    counts = numpy.zeros(3, numpy.int64)
+    total_length = 0
+    played = 0
+    batch = 0
+    while played < games:
+        size = min(batch_size, games - played)
+        boards, winners, lengths = simulate(size, grid_size, win_length, None if seed is None else seed + batch)
+        counts += numpy.bincount(winners, minlength=3)
+        total_length += int(lengths.sum(dtype=numpy.int64))
+        played += size
+        batch += 1
+    return report(counts, total_length)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Play random games in batches and report the results')
+    parser.add_argument('games', type=int)
+    parser.add_argument('--grid-size', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='games per batch, by default as many as fit in about %d MB' % (BATCH_BYTES >> 20))
+    args = parser.parse_args()
+    start = time.perf_counter()
+    summary = simulate_many(args.games, args.grid_size, args.win_length, args.seed, args.batch_size)
+    elapsed = time.perf_counter() - start
+    for name in ('games', 'player_1', 'player_2', 'draws', 'average_length'):
+        print('%-15s %s' % (name, summary[name]))
+    print('%-15s %.0f' % ('games/second', summary['games'] / elapsed))
@@ -0,0 +1,156 @@
+"""
+Solved-position files for small grids.
+
+solve() plays out every reachable position once and write() stores each position's value and best move in an open
+addressing hash table keyed by the position's Zobrist hash. SolvedPositions opens the file with mmap, so processes
+on one host share a single copy of its pages, and a lookup is one probe from GameState.hash.
+
+File layout, all little-endian:
+    header: magic b'TTTS', version, grid_size, win_length (4 x uint16 after the magic) and the slot count (uint64)
+    slots:  hash (uint64), value (int8, for the player to move: 1 win, 0 draw, -1 loss), padding, move (uint16)
+An empty slot has hash 0. GameState hashes start from a non-zero base, so no position hashes to 0 in practice.
+
+    python solvedb.py 3 solved3.db
+"""
+import argparse
+import mmap
+import struct
+
+from engine import GameState
+
+
+MAGIC = b'TTTS'
+VERSION = 1
+HEADER = struct.Struct('<4sHHHxxQ')
+SLOT = struct.Struct('<QbxH')
+
+# Move stored for positions where the game is already over
+NO_MOVE = 0xFFFF
+
+
+def solve(grid_size=3, win_length=None):
+    """
+    Finds the value and best move of every position reachable from the empty grid. Among moves of equal value it
+    prefers the quickest win or the slowest loss
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win, defaults to grid_size
+    :return: tuple of (game, positions), where positions maps each hash to (value, move)
+    """
+    game = GameState(grid_size, win_length)
+    positions = {}
+    scores = {}
+
+    def score(game):
+        # Positive scores are wins for the player to move, larger the sooner the game ends
+        known = scores.get(game.hash)
+        if known is not None:
+            return known
+        if game.winner:
+            result, move = game.moves - game.size - 1, NO_MOVE
+        elif game.full:
+            result, move = 0, NO_MOVE
+        else:
+            result, move = None, NO_MOVE
+            for index in game.legal_moves():
+                game.place(index)
+                value = -score(game)
+                game.undo()
+                if result is None or value > result:
+                    result, move = value, index
+        scores[game.hash] = result
+        positions[game.hash] = ((result > 0) - (result < 0), move)
+        return result
+
+    score(game)
+    return game, positions
+
+
+def write(path, game, positions):
+    """
+    Writes solved positions to a file
+    :param path: file to write
+    :param game: GameState with the rules the positions were solved for
+    :param positions: dict mapping hash to (value, move), as returned by solve
+    :return:
+    """
+    capacity = 1
+    while capacity < 2 * len(positions):
+        capacity *= 2
+    data = bytearray(HEADER.size + capacity * SLOT.size)
+    HEADER.pack_into(data, 0, MAGIC, VERSION, game.grid_size, game.win_length, capacity)
+    mask = capacity - 1
+    for key, (value, move) in positions.items():
+        slot = key & mask
+        while SLOT.unpack_from(data, HEADER.size + slot * SLOT.size)[0]:
+            slot = (slot + 1) & mask
+        SLOT.pack_into(data, HEADER.size + slot * SLOT.size, key, value, move)
+    with open(path, 'wb') as output:
+        output.write(data)
+
+
+class SolvedPositions(object):
+    """
+    A solved-position file opened read-only through mmap
+    """
+
+    def __init__(self, path):
+        """
+        :param path: file written by write()
+        """
+        with open(path, 'rb') as source:
+            self.map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            self.close()
+            raise ValueError('%s is not a solved-position file' % path)
+        magic, version, self.grid_size, self.win_length, self.capacity = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or len(self.map) != HEADER.size + self.capacity * SLOT.size:
+            self.close()
+            raise ValueError('%s is not a version %d solved-position file' % (path, VERSION))
+        self.mask = self.capacity - 1
+
+    def close(self):
+        """
+        Unmaps the file
+        :return:
+        """
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def matches(self, game):
+        """
+        Checks the file was solved for the same rules as a game
+        :param game: GameState
+        :return: bool
+        """
+        return game.grid_size == self.grid_size and game.win_length == self.win_length
+
+    def lookup(self, key):
+        """
+        Finds a position by its hash
+        :param key: GameState.hash
+        :return: tuple of (value, move), where move is None once the game is over, or None if the hash is not stored
+        """
+        slot = key & self.mask
+        while True:
+            stored, value, move = SLOT.unpack_from(self.map, HEADER.size + slot * SLOT.size)
+            if stored == key:
+                return value, (None if move == NO_MOVE else move)
+            if not stored:
+                return None
+            slot = (slot + 1) & self.mask
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Solve every position of a grid and write them to a file')
+    parser.add_argument('grid_size', type=int)
+    parser.add_argument('path')
+    parser.add_argument('--win-length', type=int, default=None)
+    args = parser.parse_args()
+    solved_game, solved_positions = solve(args.grid_size, args.win_length)
+    write(args.path, solved_game, solved_positions)
+    print('%d positions written to %s' % (len(solved_positions), args.path))
@@ -0,0 +1,244 @@
+"""
+Headless game state for very large grids.
+
+GameState keeps a counter for every line of the grid, which a 1000x1000 grid with 5 in a row turns into millions of
+counters before the first move. SparseGameState keeps only the boxes that have been marked, in 16x16 chunks held in a
+dict keyed by chunk position, and checks for a win by counting the marks in a row through the box just marked. Memory
+and the cost of a move grow with the moves played, not with the size of the grid.
+
+It has the same methods as GameState where they make sense on a huge grid, with the same box numbering
+(index = x * grid_size + y), and tells the same engine.Observer objects about every move.
+
+    python hugeboard.py --grid-size 1000 --win-length 5
+"""
+
+
+CHUNK_BITS = 4
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIZE - 1
+
+# Steps along a column, a row and both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class SparseGameState(object):
+    """
+    Marks, turn and winner of one game on a large grid, storing only the marked boxes
+    """
+
+    def __init__(self, grid_size=1000, win_length=5):
+        """
+        :param grid_size: number of boxes along one side of the grid
+        :param win_length: marks in a row needed to win
+        """
+        if not 1 <= win_length <= grid_size:
+            raise ValueError('Win length must be between 1 and %d' % grid_size)
+        self.grid_size = grid_size
+        self.win_length = win_length
+        self.size = grid_size * grid_size
+        self.observers = []
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the marks and gives the first move to player 1
+        :return:
+        """
+        # chunks[(x >> CHUNK_BITS, y >> CHUNK_BITS)] holds the marks of one 16x16 block, row by row; blocks without
+        # marks are not stored
+        self.chunks = {}
+        self.moves = 0
+        self.history = []
+        self.turn = 1
+        self.winner = 0
+        for observer in self.observers:
+            observer.on_reset(self)
+
+    def add_observer(self, observer):
+        """
+        Attaches an observer that is told about every reset, move, undo and game end
+        :param observer: Observer
+        :return:
+        """
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        """
+        Detaches an observer
+        :param observer: Observer
+        :return:
+        """
+        self.observers.remove(observer)
+
+    @property
+    def full(self):
+        """
+        True when every box holds a mark
+        :return: bool
+        """
+        return self.moves == self.size
+
+    @property
+    def game_over(self):
+        """
+        True when a player has won or the board is full
+        :return: bool
+        """
+        return self.winner != 0 or self.full
+
+    def cell(self, x, y):
+        """
+        Gets the mark at a column and row
+        :param x: column
+        :param y: row
+        :return: 0 if the box is empty or off the grid, otherwise the player who marked it
+        """
+        if not (0 <= x < self.grid_size and 0 <= y < self.grid_size):
+            return 0
+        chunk = self.chunks.get((x >> CHUNK_BITS, y >> CHUNK_BITS))
+        if chunk is None:
+            return 0
+        return chunk[(y & CHUNK_MASK) << CHUNK_BITS | (x & CHUNK_MASK)]
+
+    def state_at(self, index):
+        """
+        Gets the mark in a box
+        :param index: box index
+        :return: 0 if the box is empty, otherwise the player (1 or 2) who marked it
+        """
+        return self.cell(*divmod(index, self.grid_size))
+
+    def is_legal(self, index):
+        """
+        Checks if the player whose turn it is may mark a box
+        :param index: box index
+        :return: bool
+        """
+        if self.game_over or not 0 <= index < self.size:
+            return False
+        return not self.state_at(index)
+
+    def legal_moves(self):
+        """
+        Lists the empty boxes, or nothing once the game is over. This walks the whole grid; candidate_moves is the cheap
+        alternative on a huge one
+        :return: list of box indices
+        """
+        if self.game_over:
+            return []
+        return [index for index in range(self.size) if not self.state_at(index)]
+
+    def candidate_moves(self, distance=1):
+        """
+        Lists the empty boxes within a distance of a mark, or the centre box on an empty grid
+        :param distance: largest number of columns or rows away from a mark
+        :return: sorted list of box indices
+        """
+        if self.game_over:
+            return []
+        grid_size = self.grid_size
+        if not self.history:
+            return [(grid_size // 2) * grid_size + grid_size // 2]
+        moves = set()
+        for index in self.history:
+            x, y = divmod(index, grid_size)
+            for nx in range(max(0, x - distance), min(grid_size, x + distance + 1)):
+                for ny in range(max(0, y - distance), min(grid_size, y + distance + 1)):
+                    if not self.cell(nx, ny):
+                        moves.add(nx * grid_size + ny)
+        return sorted(moves)
+
+    def marks_in(self, left, top, right, bottom):
+        """
+        Finds the marks in a rectangle of boxes, visiting only the chunks that overlap it
+        :param left: first column
+        :param top: first row
+        :param right: last column, included
+        :param bottom: last row, included
+        :return: generator of (x, y, player)
+        """
+        chunks = self.chunks
+        for chunk_x in range(left >> CHUNK_BITS, (right >> CHUNK_BITS) + 1):
+            for chunk_y in range(top >> CHUNK_BITS, (bottom >> CHUNK_BITS) + 1):
+                chunk = chunks.get((chunk_x, chunk_y))
+                if chunk is None:
+                    continue
+                for offset, player in enumerate(chunk):
+                    if player:
+                        x = chunk_x << CHUNK_BITS | offset & CHUNK_MASK
+                        y = chunk_y << CHUNK_BITS | offset >> CHUNK_BITS
+                        if left <= x <= right and top <= y <= bottom:
+                            yield x, y, player
+
+    def run_length(self, x, y, dx, dy, player):
+        """
+        Counts a player's marks in a row from a box, not counting the box itself, up to win_length - 1
+        :param x: column of the box
+        :param y: row of the box
+        :param dx: column step
+        :param dy: row step
+        :param player: 1 or 2
+        :return: int
+        """
+        count = 0
+        cell = self.cell
+        for _ in range(self.win_length - 1):
+            x += dx
+            y += dy
+            if cell(x, y) != player:
+                break
+            count += 1
+        return count
+
+    def place(self, index):
+        """
+        Marks a box for the player whose turn it is, checks the lines through it for a win, then passes the turn
+        :param index: box index
+        :return: the player who made the move
+        """
+        if not self.is_legal(index):
+            raise ValueError('Box %d cannot be marked' % index)
+        player = self.turn
+        x, y = divmod(index, self.grid_size)
+        key = (x >> CHUNK_BITS, y >> CHUNK_BITS)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+        chunk[(y & CHUNK_MASK) << CHUNK_BITS | (x & CHUNK_MASK)] = player
+        self.moves += 1
+        for dx, dy in DIRECTIONS:
+            if 1 + self.run_length(x, y, dx, dy, player) + self.run_length(x, y, -dx, -dy, player) >= \
+                    self.win_length:
+                self.winner = player
+                break
+        self.history.append(index)
+        self.turn = 3 - player
+        for observer in self.observers:
+            observer.on_move(self, index, player)
+        if self.game_over:
+            for observer in self.observers:
+                observer.on_game_over(self, self.winner)
+        return player
+
+    def undo(self):
+        """
+        Takes back the last move and gives the turn back to the player who made it. A chunk left without marks is
+        dropped
+        :return: index of the box that was cleared
+        """
+        if not self.history:
+            raise ValueError('There is no move to undo')
+        index = self.history.pop()
+        player = 3 - self.turn
+        x, y = divmod(index, self.grid_size)
+        key = (x >> CHUNK_BITS, y >> CHUNK_BITS)
+        chunk = self.chunks[key]
+        chunk[(y & CHUNK_MASK) << CHUNK_BITS | (x & CHUNK_MASK)] = 0
+        if not any(chunk):
+            del self.chunks[key]
+        self.moves -= 1
+        self.winner = 0
+        self.turn = player
+        for observer in self.observers:
+            observer.on_undo(self, index, player)
+        return index
@@ -0,0 +1,115 @@
+"""
+Rotations and reflections of the grid.
+
+A square grid has 8 symmetries. symmetry_tables builds them once per grid size as permutations of box indices, and
+canonical_key maps a position to the smallest of its 8 transformed boards, so positions that are rotations or
+reflections of each other share one key. The search's transposition table and the opening book are both keyed by it.
+"""
+
+
+# Permutation tables keyed by grid size
+_symmetry_tables = {}
+
+
+def symmetry_tables(grid_size):
+    """
+    Gets the 8 rotations and reflections of a square grid as permutations of box indices
+    :param grid_size: number of boxes along one side of the grid
+    :return: tuple of (permutations, inverses), where permutations[s][i] is where symmetry s moves box i
+    """
+    tables = _symmetry_tables.get(grid_size)
+    if tables is None:
+        last = grid_size - 1
+        transforms = (
+            lambda x, y: (x, y),
+            lambda x, y: (last - y, x),
+            lambda x, y: (last - x, last - y),
+            lambda x, y: (y, last - x),
+            lambda x, y: (last - x, y),
+            lambda x, y: (x, last - y),
+            lambda x, y: (y, x),
+            lambda x, y: (last - y, last - x),
+        )
+        permutations = []
+        for transform in transforms:
+            permutation = []
+            for index in range(grid_size * grid_size):
+                x, y = transform(*divmod(index, grid_size))
+                permutation.append(x * grid_size + y)
+            permutations.append(tuple(permutation))
+        inverses = []
+        for permutation in permutations:
+            inverse = [0] * len(permutation)
+            for index, image in enumerate(permutation):
+                inverse[image] = index
+            inverses.append(tuple(inverse))
+        tables = (tuple(permutations), tuple(inverses))
+        _symmetry_tables[grid_size] = tables
+    return tables
+
+
+def marked_boxes(game):
+    """
+    Lists the boxes each player has marked, read off the bitboards
+    :param game: GameState
+    :return: tuple of (player 1's box indices, player 2's box indices)
+    """
+    boxes = ([], [])
+    for player in (1, 2):
+        found = boxes[player - 1]
+        marks = game.marks[player]
+        while marks:
+            low = marks & -marks
+            found.append(low.bit_length() - 1)
+            marks ^= low
+    return boxes
+
+
+def canonical_symmetries(game):
+    """
+    Gets a key shared by a position and all its rotations and reflections: the smallest of the 8 transformed boards,
+    with player 1's marks in the low bits and player 2's above them. The marked boxes are read off the bitboards once
+    and only looked up in each permutation, so the cost grows with the number of marks, not the grid size
+    :param game: GameState
+    :return: tuple of (key, symmetries), where symmetries lists every permutation giving the key, more than one when
+             the position is itself symmetric
+    """
+    size = game.size
+    first, second = marked_boxes(game)
+    best_key = None
+    best_symmetries = []
+    for symmetry, permutation in enumerate(symmetry_tables(game.grid_size)[0]):
+        key = 0
+        for index in first:
+            key |= 1 << permutation[index]
+        for index in second:
+            key |= 1 << (permutation[index] + size)
+        if best_key is None or key < best_key:
+            best_key = key
+            best_symmetries = [symmetry]
+        elif key == best_key:
+            best_symmetries.append(symmetry)
+    return best_key, best_symmetries
+
+
+def canonical_key(game):
+    """
+    Gets the key shared by a position and all its rotations and reflections, see canonical_symmetries
+    :param game: GameState
+    :return: tuple of (key, symmetry), where symmetry is the index of a permutation giving the key
+    """
+    key, symmetries = canonical_symmetries(game)
+    return key, symmetries[0]
+
+
+def canonical_move(game, move):
+    """
+    Maps a move into the frame of its position's canonical key. Moves that are equivalent because the position is
+    symmetric, like the four corners of an empty grid, map to the same box
+    :param game: GameState before the move
+    :param move: box index
+    :return: tuple of (key, box index in the canonical frame)
+    """
+    key, symmetries = canonical_symmetries(game)
+    permutations = symmetry_tables(game.grid_size)[0]
+    return key, min(permutations[symmetry][move] for symmetry in symmetries)
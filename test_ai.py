@@ -0,0 +1,107 @@
+import unittest
+from unittest import mock
+
+from ai import NegamaxPlayer
+from engine import GameState
+from symmetry import canonical_key, symmetry_tables
+from threats import ThreatTracker
+
+
+class Clock(object):
+    """
+    Stands in for the time module in a search: each reading is a millisecond after the last, so when the search stops
+    depends only on how often it reads the clock
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        self.now += 0.001
+        return self.now
+
+
+class NegamaxPlayerTest(unittest.TestCase):
+    def play(self, moves, grid_size=3):
+        """
+        Plays a list of moves on a new game
+        :param moves: box indices
+        :param grid_size: number of boxes along one side of the grid
+        :return: GameState
+        """
+        game = GameState(grid_size)
+        for index in moves:
+            game.place(index)
+        return game
+
+    def test_canonical_key(self):
+        """
+        Checks that all 8 rotations and reflections of a position share a key and a different position does not
+        :return:
+        """
+        keys = set()
+        for permutation in symmetry_tables(3)[0]:
+            keys.add(canonical_key(self.play([permutation[0], permutation[1], permutation[5]]))[0])
+        self.assertEqual(len(keys), 1)
+        self.assertNotIn(canonical_key(self.play([0, 1, 4]))[0], keys)
+
+    def test_takes_win(self):
+        """
+        Checks the player completes its own line rather than blocking
+        :return:
+        """
+        game = self.play([0, 3, 1, 4])
+        self.assertEqual(NegamaxPlayer(time_budget=1).choose_move(game), 2)
+
+    def test_blocks(self):
+        """
+        Checks the player blocks a line the opponent is about to complete
+        :return:
+        """
+        game = self.play([0, 4, 1])
+        self.assertEqual(NegamaxPlayer(time_budget=1).choose_move(game), 2)
+
+    def test_perfect_play_draws(self):
+        """
+        Plays the player against itself on 3x3, checks the game is a draw
+        :return:
+        """
+        player = NegamaxPlayer(time_budget=5)
+        game = GameState()
+        while not game.game_over:
+            game.place(player.choose_move(game))
+        self.assertEqual(game.winner, 0)
+
+    def test_large_grid(self):
+        """
+        Checks that on a 15x15 grid needing 5 in a row the player answers next to the opening mark and blocks an open
+        four after searching only a handful of positions, since the threat moves leave nothing else to try
+        :return:
+        """
+        player = NegamaxPlayer(time_budget=0.2)
+        game = GameState(15, 5)
+        game.place(112)
+        self.assertIn(player.choose_move(game), ThreatTracker(game.copy()).ranked(2, 16))
+        for index in (0, 97, 14, 82, 210, 127):
+            game.place(index)
+        nodes = player.nodes
+        self.assertIn(player.choose_move(game), (67, 142))
+        self.assertLess(player.nodes - nodes, 100)
+
+    def test_time_budget(self):
+        """
+        Checks a search on an empty 4x4 grid stops within one clock reading of its budget, on a clock that only moves
+        when it is read
+        :return:
+        """
+        player = NegamaxPlayer()
+        clock = Clock()
+        with mock.patch('ai.time', clock):
+            move = player.choose_move(GameState(4))
+        self.assertLessEqual(clock.now, player.time_budget + 0.002)
+        self.assertGreater(player.nodes, 256)
+        self.assertIn(move, range(16))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from bench import compare, run_benchmarks
+
+
+class BenchTest(unittest.TestCase):
+    def test_run_benchmarks(self):
+        """
+        Runs the cheap benchmarks on the two smallest grids, checks every one gives a time and the 5x5 grid has no
+        exhaustive search
+        :return:
+        """
+        report = run_benchmarks((3, 5), names=('setup', 'check_for_winner', 'get_box_at_pixel', 'render_move',
+                                               'negamax_move'), min_time=0.01, repeat=1)
+        self.assertEqual(sorted(report['results']), ['check_for_winner/3', 'check_for_winner/5', 'get_box_at_pixel/3',
+                                                     'get_box_at_pixel/5', 'negamax_move/3', 'render_move/3',
+                                                     'render_move/5', 'setup/3', 'setup/5'])
+        self.assertTrue(all(seconds > 0 for seconds in report['results'].values()))
+
+    def test_compare(self):
+        """
+        Checks only benchmarks in both results are compared, and only those past the threshold are reported slower
+        :return:
+        """
+        before = {'results': {'setup/3': 1.0, 'render_move/3': 2.0, 'mcts_move/3': 1.0}}
+        after = {'results': {'setup/3': 1.1, 'render_move/3': 3.0, 'setup/5': 1.0}}
+        rows, slower = compare(before, after)
+        self.assertEqual([row[0] for row in rows], ['render_move/3', 'setup/3'])
+        self.assertEqual(slower, ['render_move/3'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import asyncio
+import queue
+import threading
+import unittest
+
+from client import RemoteGame
+from server import GameServer
+
+
+class RemoteGameTest(unittest.TestCase):
+    def test_remote_game(self):
+        """
+        Runs a server on its own thread, plays a short game between two clients and checks both see every move
+        :return:
+        """
+        loop = asyncio.new_event_loop()
+        server = GameServer()
+        port = loop.run_until_complete(server.start(port=0))
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        first_lines, second_lines = queue.Queue(), queue.Queue()
+        first = RemoteGame('127.0.0.1', port, first_lines.put)
+        second = RemoteGame('127.0.0.1', port, second_lines.put)
+        try:
+            first.join()
+            self.assertEqual(first_lines.get(timeout=5), 'WAIT')
+            second.join(3, 3)
+            self.assertEqual(first_lines.get(timeout=5), 'START 1 3 3')
+            self.assertEqual(second_lines.get(timeout=5), 'START 2 3 3')
+            for client, player, index in ((first, 1, 4), (second, 2, 0)):
+                client.send_move(index)
+                for lines in (first_lines, second_lines):
+                    self.assertEqual(lines.get(timeout=5), 'MOVED %d %d' % (player, index))
+            second.close()
+            self.assertEqual(first_lines.get(timeout=5), 'LEFT')
+        finally:
+            first.close()
+            second.close()
+            self.assertIsNone(first_lines.get(timeout=5))
+            asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(5)
+            loop.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+import unittest
+
+from engine import GameState, Observer, winning_lines
+
+
+class GameStateTest(unittest.TestCase):
+    def test_winning_lines(self):
+        """
+        Checks the 3x3 grid has 8 lines of 3 boxes, including both full diagonals
+        :return:
+        """
+        lines = winning_lines(3)
+        self.assertEqual(len(lines), 8)
+        self.assertIn((0, 4, 8), lines)
+        self.assertIn((2, 4, 6), lines)
+        self.assertNotIn((2, 4, 6, 8), lines)
+
+    def test_k_in_a_row(self):
+        """
+        Checks a 15x15 grid with 5 in a row has every segment in all four directions, shared between games
+        :return:
+        """
+        lines = winning_lines(15, 5)
+        self.assertEqual(len(lines), 4 * 11 * 11 + 2 * 15 * 11 - 2 * 11 * 11)
+        self.assertTrue(all(len(line) == 5 for line in lines))
+        self.assertIn((14, 28, 42, 56, 70), lines)
+        self.assertIn((220, 221, 222, 223, 224), lines)
+        self.assertIs(GameState(15, 5).lines, GameState(15, 5).lines)
+        self.assertRaises(ValueError, winning_lines, 3, 4)
+
+    def test_k_in_a_row_winner(self):
+        """
+        Plays five in a row along a diagonal in the middle of a 15x15 grid, checks player 1 wins on the fifth
+        :return:
+        """
+        game = GameState(15, 5)
+        for step in range(4):
+            game.place(16 * (step + 3))
+            game.place(step)
+        self.assertEqual(game.winner, 0)
+        game.place(16 * 7)
+        self.assertEqual(game.winner, 1)
+
+    def test_place(self):
+        """
+        Places a mark, checks the box state and that the turn passed to player 2
+        :return:
+        """
+        game = GameState()
+        self.assertEqual(game.place(4), 1)
+        self.assertEqual(game.state_at(4), 1)
+        self.assertEqual(game.turn, 2)
+        self.assertFalse(game.is_legal(4))
+        self.assertRaises(ValueError, game.place, 4)
+
+    def test_line_counters(self):
+        """
+        Places two marks, checks only the counters of the lines through them moved
+        :return:
+        """
+        game = GameState()
+        game.place(4)
+        game.place(0)
+        self.assertEqual(len(game.cell_lines[4]), 4)
+        self.assertEqual(sum(game.counts[1]), 4)
+        self.assertEqual(sum(game.counts[2]), 3)
+        self.assertEqual(game.counts[1][game.lines.index((0, 4, 8))], 1)
+        self.assertEqual(game.counts[2][game.lines.index((0, 4, 8))], 1)
+        self.assertEqual(game.moves, 2)
+
+    def test_winner(self):
+        """
+        Plays a game where player 1 takes the anti-diagonal, checks the winner and that no moves remain
+        :return:
+        """
+        game = GameState()
+        for index in (2, 0, 4, 1, 6):
+            game.place(index)
+        self.assertEqual(game.winner, 1)
+        self.assertTrue(game.game_over)
+        self.assertEqual(game.legal_moves(), [])
+
+    def test_draw(self):
+        """
+        Fills the board without a line, checks the game is over with no winner
+        :return:
+        """
+        game = GameState()
+        for index in (0, 4, 8, 1, 7, 6, 2, 5, 3):
+            game.place(index)
+        self.assertEqual(game.winner, 0)
+        self.assertTrue(game.full)
+        self.assertTrue(game.game_over)
+
+    def test_undo(self):
+        """
+        Takes back a winning move, checks the game is back where it was before it
+        :return:
+        """
+        game = GameState()
+        for index in (2, 0, 4, 1):
+            game.place(index)
+        counts = [list(game.counts[1]), list(game.counts[2])]
+        game.place(6)
+        self.assertEqual(game.undo(), 6)
+        self.assertEqual(game.winner, 0)
+        self.assertEqual(game.turn, 1)
+        self.assertEqual(game.state_at(6), 0)
+        self.assertEqual([list(game.counts[1]), list(game.counts[2])], counts)
+        self.assertEqual(game.history, [2, 0, 4, 1])
+
+    def test_hash(self):
+        """
+        Reaches one position by two move orders, checks the hashes match, and that undo restores the previous hash
+        :return:
+        """
+        first = GameState()
+        second = GameState()
+        for index in (0, 4, 8):
+            first.place(index)
+        for index in (8, 4, 0):
+            second.place(index)
+        self.assertEqual(first.hash, second.hash)
+        first.place(1)
+        self.assertNotEqual(first.hash, second.hash)
+        first.undo()
+        self.assertEqual(first.hash, second.hash)
+        first.reset()
+        self.assertEqual(first.hash, GameState().hash)
+
+    def test_copy(self):
+        """
+        Copies a game with an observer, checks moves on the copy leave the original and the observer alone
+        :return:
+        """
+        game = GameState()
+        game.add_observer(Observer())
+        game.place(4)
+        search = game.copy()
+        search.place(0)
+        self.assertEqual(search.observers, [])
+        self.assertEqual(game.state_at(0), 0)
+        self.assertEqual(list(game.counts[2]), [0] * len(game.lines))
+        self.assertEqual(search.history, [4, 0])
+
+    def test_bytes(self):
+        """
+        Packs a 15x15 position, checks it is 62 bytes and unpacks to the same marks, counters, hash and turn, with
+        none of the moves before it open to undo
+        :return:
+        """
+        game = GameState(15, 5)
+        for index in (112, 0, 113, 224, 114):
+            game.place(index)
+        data = game.to_bytes()
+        self.assertEqual(len(data), 4 + 2 * 29)
+        copy = GameState.from_bytes(data)
+        self.assertEqual(copy.marks, game.marks)
+        self.assertEqual(copy.counts, game.counts)
+        self.assertEqual(copy.cells, game.cells)
+        self.assertEqual(copy.hash, game.hash)
+        self.assertEqual(copy.turn, 2)
+        self.assertEqual(copy.moves, 5)
+        self.assertRaises(ValueError, copy.undo)
+        copy.place(1)
+        self.assertEqual(copy.undo(), 1)
+        self.assertEqual((copy.turn, copy.hash), (2, game.hash))
+        self.assertRaises(ValueError, GameState.from_bytes, data[:-1])
+
+    def test_observers(self):
+        """
+        Attaches an observer, checks it hears about moves, undos and the end of the game in order
+        :return:
+        """
+        events = []
+
+        class Recorder(Observer):
+            def on_move(self, game, index, player):
+                events.append(('move', index, player))
+
+            def on_undo(self, game, index, player):
+                events.append(('undo', index, player))
+
+            def on_game_over(self, game, winner):
+                events.append(('over', winner))
+
+        game = GameState()
+        game.add_observer(Recorder())
+        for index in (0, 3, 1, 4):
+            game.place(index)
+        game.undo()
+        game.place(4)
+        game.place(2)
+        self.assertEqual(events, [('move', 0, 1), ('move', 3, 2), ('move', 1, 1), ('move', 4, 2), ('undo', 4, 2),
+                                  ('move', 4, 2), ('move', 2, 1), ('over', 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+import pygame
+
+from hugeboard import Viewport
+from sparse import SparseGameState
+
+
+class ViewportTest(unittest.TestCase):
+    def test_click_scroll_zoom(self):
+        """
+        Marks a box through the viewport of a 1000x1000 grid, checks only that box is repainted, then that it keeps its
+        place on screen through a zoom around it and moves with a scroll
+        :return:
+        """
+        pygame.display.init()
+        game = SparseGameState(1000, 5)
+        viewport = Viewport(game, pygame.Surface((400, 400)), box_size=19)
+        viewport.draw()
+        viewport.pop_dirty_rects()
+        index = viewport.box_at_pixel(200, 200)
+        self.assertEqual(index, 500 * 1000 + 500)
+        self.assertEqual(viewport.process_click(200, 200), index)
+        self.assertEqual(viewport.pop_dirty_rects(), [viewport.box_rect(500, 500)])
+        self.assertEqual(viewport.surface.get_at((200, 200))[:3], (0, 255, 0))
+        self.assertIsNone(viewport.process_click(200, 200))
+        viewport.zoom(2, 200, 200)
+        self.assertEqual(viewport.box_size, 30)
+        self.assertEqual(viewport.box_at_pixel(200, 200), index)
+        viewport.scroll(-31, 0)
+        self.assertEqual(viewport.box_at_pixel(231, 200), index)
+        self.assertEqual(viewport.box_at_pixel(200, 200), index - 1000)
+        viewport.scroll(-10 ** 6, -10 ** 6)
+        self.assertEqual((viewport.left, viewport.top, viewport.box_at_pixel(0, 0)), (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
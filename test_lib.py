@@ -0,0 +1,371 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pygame
+
+import movelog
+import openingbook
+import solvedb
+from lib import BLACK, GREEN, Board, Box, SoundBank, mark_sprite, text_surface
+from symmetry import canonical_key, symmetry_tables
+
+
+class TicTacTest(unittest.TestCase):
+    def test_init(self):
+        """
+        Initializes board object with not default sizes, checks to see that the sizes are correct
+        :return:
+        """
+        board = Board(5, 100, 10, 3)
+        self.assertTrue(board.grid_size == 5)
+        self.assertFalse(board.box_size == 200)
+        self.assertTrue(board.border == 10)
+        self.assertTrue(board.line_width == 3)
+
+    def test_setup(self):
+        """
+        Initializes board object, checks to see if game_over initalized to 0
+        :return:
+        """
+        board = Board()
+        self.assertTrue(board.game_over == False)
+
+    def test_initialize_boxes(self):
+        """
+        Initializes board object, checks to see if there are 9 box objects, iteratures through self.boxes to make sure
+        all the items are box objects
+        :return:
+        """
+        board = Board()
+        self.assertTrue(len(board.boxes) == 9)
+        for i in board.boxes:
+            self.assertIsInstance(i, Box)
+
+    def test_box_views(self):
+        """
+        Checks a 100x100 board's boxes are slot-only views with the geometry of the grid and marks from the game state
+        :return:
+        """
+        board = Board(100, 10, 5, 1, headless=True)
+        self.assertEqual(len(board.boxes), 10000)
+        box = board.boxes[-1]
+        self.assertEqual(box.index, 9999)
+        self.assertFalse(hasattr(box, '__dict__'))
+        self.assertEqual(box.rect, pygame.Rect(5 + 99 * 11, 5 + 99 * 11, 10, 10))
+        self.assertEqual(board.boxes[101].rect.topleft, (16, 16))
+        board.play_turn(board.boxes[101])
+        self.assertEqual(board.boxes[101].state, 1)
+        self.assertEqual(board.boxes[101], board.get_box_at_pixel(20, 20))
+        self.assertRaises(IndexError, board.boxes.__getitem__, 10000)
+
+    def test_get_box_at_pixel(self):
+        """
+        Initializes a board object, checks to see if pos 0,0 is a not a box and 30, 30 is a box
+        :return:
+        """
+        board = Board()
+        self.assertNotIsInstance(board.get_box_at_pixel(0, 0), Box)
+        self.assertIsInstance(board.get_box_at_pixel(30, 30), Box)
+
+    def test_play_sound(self):
+        """
+        Initializes a board object, calls the play sound method and checks if sound is playing, stops the mixer
+        to check if the sound isn't playing
+        :return:
+        """
+        board = Board()
+        pygame.init()
+        board.play_sound()
+        self.assertTrue(pygame.mixer.get_busy() == True)
+        pygame.mixer.stop()
+        self.assertFalse(pygame.mixer.get_busy())
+
+    def test_sound_bank(self):
+        """
+        Plays a move sound and the victory sound together, checks both are playing, and that a second board and a
+        new game reuse the sounds already loaded
+        :return:
+        """
+        pygame.init()
+        board = Board()
+        loaded = dict(board.sounds.bank.sounds)
+        pygame.mixer.stop()
+        board.play_sound()
+        board.sounds.on_game_over(board.game, 1)
+        self.assertEqual(len(set(pygame.mixer.Channel(i).get_sound() for i in range(pygame.mixer.get_num_channels()))
+                             - {None}), 2)
+        pygame.mixer.stop()
+        board.setup()
+        self.assertIs(Board().sounds.bank, board.sounds.bank)
+        for name, sound in loaded.items():
+            self.assertIs(board.sounds.bank.sounds[name], sound)
+
+    def test_load_in_background(self):
+        """
+        Loads sounds on another thread, checks a sound asked for meanwhile is skipped and every sound is there after
+        :return:
+        """
+        pygame.init()
+        bank = SoundBank()
+        with bank.lock:
+            loader = bank.load_in_background()
+            bank.play('x')
+            self.assertEqual(bank.sounds, {})
+        loader.join()
+        self.assertEqual(sorted(bank.sounds), ['draw', 'o', 'victory', 'x'])
+
+    def test_process_click(self):
+        """
+        Initializes board object, plays a turn, checks to see if it is player two's turn
+        :return:
+        """
+        board = Board()
+        pygame.init()
+        board.process_click(30, 30)
+        self.assertTrue(board.turn == 2)
+
+    def test_headless(self):
+        """
+        Plays a whole game on a board with no window, checks the winner and that clicks after the end do nothing
+        :return:
+        """
+        board = Board(headless=True)
+        self.assertIsNone(board.surface)
+        for index in (0, 3, 1, 4, 2):
+            board.play_turn(board.boxes[index])
+            board.check_game_over()
+        self.assertTrue(board.game_over)
+        self.assertEqual(board.check_for_winner(), 1)
+        board.process_click(30, 30)
+        self.assertEqual(board.game.moves, 5)
+
+    def test_get_box_at_pixel_grid(self):
+        """
+        Checks the arithmetic lookup agrees with the box rectangles on a 50x50 board, including grid lines and border
+        :return:
+        """
+        board = Board(50, 10, 7, 3, headless=True)
+        end = 2 * board.border + 50 * board.box_size + 49 * board.line_width
+        for x in list(range(0, 40)) + list(range(end - 20, end + 3)) + [200, 333]:
+            for y in (0, 6, 7, 16, 17, 19, 20, 333, end - 8, end - 7, end):
+                expected = [box for box in board.boxes if box.rect.collidepoint(x, y)]
+                self.assertEqual(board.get_box_at_pixel(x, y), expected[0] if expected else None)
+
+    def test_highlight(self):
+        """
+        Moves the cursor over two boxes, checks only the box under it is highlighted and both get repainted, and that
+        marking the highlighted box removes the highlight
+        :return:
+        """
+        board = Board()
+        pygame.init()
+        board.pop_dirty_rects()
+        board.highlight_at(30, 30)
+        self.assertEqual(board.highlighted, board.boxes[0])
+        board.highlight_at(250, 30)
+        self.assertEqual(board.highlighted, board.boxes[3])
+        self.assertEqual(board.pop_dirty_rects(), [board.boxes[0].rect, board.boxes[0].rect, board.boxes[3].rect])
+        board.process_click(250, 30)
+        self.assertIsNone(board.highlighted)
+        board.highlight_at(250, 30)
+        self.assertIsNone(board.highlighted)
+
+    def test_highlight_game_over(self):
+        """
+        Ends a game from outside the mouse handling while a box under the banner is highlighted, checks the outline is
+        gone and that the next mouse move does not paint over the banner
+        :return:
+        """
+        board = Board()
+        pygame.init()
+        box = board.boxes[7]
+        board.highlight_at(*box.rect.center)
+        self.assertEqual(board.highlighted, box)
+        for index in (0, 3, 1, 4, 2):
+            board.play_turn(board.boxes[index])
+        board.check_game_over()
+        self.assertIsNone(board.highlighted)
+        covered = pygame.image.tostring(board.surface.subsurface(box.rect), 'RGB')
+        board.highlight_at(*board.boxes[8].rect.center)
+        self.assertEqual(pygame.image.tostring(board.surface.subsurface(box.rect), 'RGB'), covered)
+        self.assertNotEqual(board.surface.get_at(box.rect.center)[:3], BLACK)
+
+    def test_dirty_rects(self):
+        """
+        Plays a game, checks only the whole surface is dirty after setup, then only the marked box, then the banner
+        and menu buttons at the end
+        :return:
+        """
+        board = Board()
+        pygame.init()
+        self.assertEqual(board.pop_dirty_rects(), [board.surface.get_rect()])
+        self.assertEqual(board.pop_dirty_rects(), [])
+        board.process_click(30, 30)
+        self.assertEqual(board.pop_dirty_rects(), [board.boxes[0].rect])
+        for index in (3, 1, 4, 2):
+            board.play_turn(board.boxes[index])
+        dirty_rects = board.pop_dirty_rects()
+        self.assertEqual(dirty_rects[:4], [board.boxes[index].rect for index in (3, 1, 4, 2)])
+        self.assertEqual(dirty_rects[-2:], [board.rect1, board.rect2])
+        self.assertEqual(len(dirty_rects), 7)
+
+    def test_render_cache(self):
+        """
+        Marks boxes on two boards of the same size, checks they share one sprite per mark and that the banner and
+        menu text are rendered once
+        :return:
+        """
+        pygame.init()
+        board = Board()
+        for index in (0, 3, 1, 4, 2):
+            board.play_turn(board.boxes[index])
+        box = board.boxes[0]
+        self.assertEqual(board.surface.get_at(box.rect.center)[:3], GREEN)
+        self.assertEqual(board.surface.get_at((box.rect.centerx, box.rect.top + 1))[:3], BLACK)
+        sprite = mark_sprite('x', box.size, box.line_width, GREEN)
+        banner = text_surface('Player 1 won!', int(board.surface.get_height() / 8))
+        board.setup()
+        board.play_turn(board.boxes[8])
+        self.assertIs(mark_sprite('x', box.size, box.line_width, GREEN), sprite)
+        other = Board()
+        for index in (0, 3, 1, 4, 2):
+            other.play_turn(other.boxes[index])
+        self.assertIs(text_surface('Player 1 won!', int(board.surface.get_height() / 8)), banner)
+
+    def test_best_move(self):
+        """
+        Loads a solved 3x3 file, checks the board finds the winning box, and that a file for other rules is refused
+        :return:
+        """
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'solved3.db')
+        game, positions = solvedb.solve(3)
+        solvedb.write(path, game, positions)
+        board = Board(headless=True)
+        self.assertIsNone(board.best_move())
+        board.load_solved(path)
+        for index in (0, 3, 1, 4):
+            board.play_turn(board.boxes[index])
+        self.assertEqual(board.best_move(), 2)
+        self.assertRaises(ValueError, Board(4, headless=True).load_solved, path)
+        board.solved.close()
+        shutil.rmtree(directory)
+
+    def test_opening_book(self):
+        """
+        Loads a book holding one reply, checks the board answers a rotation of that position from it, and that a book
+        for other rules is refused
+        :return:
+        """
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'book.bin')
+        board = Board(5, headless=True, win_length=4)
+        board.play_turn(board.boxes[0])
+        key, symmetry = canonical_key(board.game)
+        openingbook.OpeningBook(5, 4, 2, {key: (symmetry_tables(5)[0][symmetry][12], 1)}).write(path)
+        board.load_book(path)
+        board.setup()
+        self.assertIsNone(board.best_move())
+        board.play_turn(board.boxes[24])
+        self.assertEqual(board.best_move(), 12)
+        self.assertRaises(ValueError, Board(5, headless=True).load_book, path)
+        shutil.rmtree(directory)
+
+    def test_undo_redo(self):
+        """
+        Wins a game, takes back moves, checks only the last box is repainted once the banner is cleared, and that a new
+        move drops the moves that could be redone
+        :return:
+        """
+        board = Board(3, 100, 10, 3)
+        boxes = board.boxes
+        for index in (0, 3, 1, 4, 2):
+            board.process_click(*boxes[index].rect.center)
+        self.assertTrue(board.game_over)
+        board.pop_dirty_rects()
+        self.assertEqual(board.undo(), 2)
+        self.assertFalse(board.game_over)
+        self.assertEqual(board.pop_dirty_rects(), [board.surface.get_rect()])
+        self.assertEqual(board.undo(), 4)
+        self.assertEqual(board.pop_dirty_rects(), [boxes[4].rect])
+        self.assertEqual((board.turn, boxes[4].state, board.check_for_winner()), (2, 0, 0))
+        self.assertIs(board.boxes, boxes)
+        self.assertEqual(board.redo(), 4)
+        self.assertEqual(board.redo(), 2)
+        self.assertTrue(board.game_over)
+        self.assertEqual(board.check_for_winner(), 1)
+        self.assertIsNone(board.redo())
+        board.undo()
+        board.undo()
+        board.play_turn(boxes[8])
+        self.assertIsNone(board.redo())
+        board.setup()
+        self.assertIsNone(board.undo())
+
+    def test_record(self):
+        """
+        Records a won game and one cleared by setup before its end, checks both are in the log
+        :return:
+        """
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'games.log')
+        board = Board(headless=True)
+        board.record(path)
+        for moves in ((0, 3, 1, 4, 2), (4,)):
+            board.setup()
+            for index in moves:
+                board.play_turn(board.boxes[index])
+        board.setup()
+        board.recorder.writer.close()
+        self.assertEqual([(game.history, game.winner) for game in movelog.replay(path)],
+                         [([0, 3, 1, 4, 2], 1), ([4], 0)])
+        shutil.rmtree(directory)
+
+    def test_record_undo_redo(self):
+        """
+        Wins a game, takes the last move back and plays it again, takes it back once more and starts a new game, checks
+        the game is logged once. Then wins a game, takes moves back and plays on to a different end, checks both games
+        are logged
+        :return:
+        """
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'games.log')
+        board = Board(headless=True)
+        board.record(path)
+        for index in (0, 3, 1, 4, 2):
+            board.play_turn(board.boxes[index])
+            board.check_game_over()
+        board.undo()
+        board.redo()
+        board.undo()
+        board.setup()
+        for index in (0, 3, 1, 4, 2):
+            board.play_turn(board.boxes[index])
+            board.check_game_over()
+        board.undo()
+        board.undo()
+        for index in (4, 8, 5):
+            board.play_turn(board.boxes[index])
+            board.check_game_over()
+        board.recorder.writer.close()
+        self.assertEqual([(game.history, game.winner) for game in movelog.replay(path)],
+                         [([0, 3, 1, 4, 2], 1), ([0, 3, 1, 4, 2], 1), ([0, 3, 1, 4, 8, 5], 2)])
+        shutil.rmtree(directory)
+
+    def test_win_length(self):
+        """
+        Initializes a 5x5 board needing 3 in a row, checks three marks down a column win and the table is shared
+        :return:
+        """
+        board = Board(5, 100, 10, 3, headless=True, win_length=3)
+        for index in (6, 0, 7, 20, 8):
+            board.play_turn(board.boxes[index])
+        self.assertEqual(board.check_for_winner(), 1)
+        board.setup()
+        self.assertIs(board.winning_combinations, Board(5, headless=True, win_length=3).winning_combinations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+from loadgen import percentile, run_client, run_load
+from server import GameServer
+
+
+class LoadTest(unittest.TestCase):
+    def test_percentile(self):
+        """
+        Checks the median and p99 of 1 to 100
+        :return:
+        """
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 51)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([], 0.99), 0)
+
+    def test_run_load(self):
+        """
+        Runs 20 clients for 3 games each against a server in the same process, checks every game finishes and every
+        move was timed
+        :return:
+        """
+        async def run():
+            server = GameServer()
+            port = await server.start(port=0)
+            try:
+                report = await run_load('127.0.0.1', port, clients=20, games=3)
+            finally:
+                await server.stop()
+            return server, report
+
+        server, report = asyncio.run(run())
+        self.assertEqual(report['games'], 30)
+        self.assertEqual(report['moves'], server.moves)
+        self.assertGreater(report['moves_per_second'], 0)
+        self.assertGreaterEqual(report['p99_ms'], report['p50_ms'])
+
+    def test_unpaired_client(self):
+        """
+        Checks an odd number of clients is refused, and that a client left without an opponent gives up
+        :return:
+        """
+        async def run():
+            server = GameServer()
+            port = await server.start(port=0)
+            try:
+                with self.assertRaises(ValueError):
+                    await run_load('127.0.0.1', port, clients=3)
+                return await run_client('127.0.0.1', port, 1, 3, 3, 0, [], timeout=0.1)
+            finally:
+                await server.stop()
+
+        self.assertEqual(asyncio.run(run()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+
+from engine import GameState
+from mcts import MCTSPlayer
+
+
+class Clock(object):
+    """
+    Stands in for the time module in a search: each reading is a millisecond after the last, so when the search stops
+    depends only on how often it reads the clock
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        self.now += 0.001
+        return self.now
+
+
+class MCTSPlayerTest(unittest.TestCase):
+    def play(self, moves, grid_size=3, win_length=None):
+        """
+        Plays a list of moves on a new game
+        :param moves: box indices
+        :param grid_size: number of boxes along one side of the grid
+        :param win_length: marks in a row needed to win
+        :return: GameState
+        """
+        game = GameState(grid_size, win_length)
+        for index in moves:
+            game.place(index)
+        return game
+
+    def test_takes_win(self):
+        """
+        Checks the player completes its own line on 3x3
+        :return:
+        """
+        player = MCTSPlayer(iterations=2000, time_budget=None, seed=1)
+        self.assertEqual(player.choose_move(self.play([0, 3, 1, 4])), 2)
+
+    def test_takes_win_large(self):
+        """
+        Checks the player completes five in a row on a 7x7 grid
+        :return:
+        """
+        game = self.play([8, 0, 15, 48, 22, 6, 29, 42], 7, 5)
+        player = MCTSPlayer(iterations=2000, time_budget=None, seed=1)
+        self.assertIn(player.choose_move(game), (1, 36))
+
+    def test_repeatable(self):
+        """
+        Checks two players with the same seed and iteration count pick the same move
+        :return:
+        """
+        game = self.play([24], 7, 4)
+        first = MCTSPlayer(iterations=300, time_budget=None, seed=7).choose_move(game)
+        second = MCTSPlayer(iterations=300, time_budget=None, seed=7).choose_move(game)
+        self.assertEqual(first, second)
+
+    def test_reuses_subtree(self):
+        """
+        Searches, plays the chosen move and a reply, checks the next search starts from the visits already made
+        :return:
+        """
+        game = GameState(7, 4)
+        player = MCTSPlayer(iterations=500, time_budget=None, seed=3)
+        root = player.search(game)
+        move = player.choose_move(game)
+        game.place(move)
+        reply = max(next(child for child in root.children if child.move == move).children,
+                    key=lambda child: child.visits)
+        game.place(reply.move)
+        visits = reply.visits
+        self.assertGreater(visits, 0)
+        self.assertIs(player.advance(game), reply)
+        self.assertIsNone(reply.parent)
+        self.assertFalse(hasattr(reply, '__dict__'))
+
+    def test_time_budget(self):
+        """
+        Checks a search on an empty 15x15 grid with 5 to win stops at its budget, on a clock that only moves when it is
+        read once per playout
+        :return:
+        """
+        player = MCTSPlayer(time_budget=0.2, seed=0)
+        clock = Clock()
+        with mock.patch('mcts.time', clock):
+            root = player.search(GameState(15, 5))
+        self.assertEqual(root.visits, 200)
+        self.assertLessEqual(clock.now, 0.2 + 0.002)
+
+
+if __name__ == "__main__":
+    unittest.main()
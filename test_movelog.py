@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from engine import GameState
+from movelog import (HEADER, RECORD, UNFINISHED, MoveLogWriter, MoveRecorder, build_index, count_games, game_offset,
+                     index_path, read_games, replay)
+
+
+class MoveLogTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'games.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_record_and_replay(self):
+        """
+        Records games played on a GameState, including one cleared before its end, and replays them
+        :return:
+        """
+        game = GameState()
+        with MoveLogWriter(self.path) as writer:
+            recorder = MoveRecorder(writer)
+            game.add_observer(recorder)
+            for moves in ([0, 3, 1, 4, 2], [4, 0, 8, 2, 1, 7, 6, 3, 5], [4, 0]):
+                recorder.abandon(game)
+                game.reset()
+                for index in moves:
+                    game.place(index)
+            recorder.abandon(game)
+            recorder.abandon(game)
+        self.assertEqual(os.path.getsize(self.path), HEADER.size + 3 * RECORD.size + 16)
+        self.assertEqual(count_games(self.path), 3)
+        self.assertEqual([record[2] for record in read_games(self.path)], [1, 0, UNFINISHED])
+        self.assertEqual([game.history for game in replay(self.path)],
+                         [[0, 3, 1, 4, 2], [4, 0, 8, 2, 1, 7, 6, 3, 5], [4, 0]])
+
+    def test_seek(self):
+        """
+        Appends games over two writers, on a grid large enough for varint moves, and reads from the middle through
+        the index and through a rebuilt index
+        :return:
+        """
+        for _ in range(2):
+            with MoveLogWriter(self.path) as writer:
+                for number in range(50):
+                    writer.write_game(20, 5, UNFINISHED, [number, 399 - number, 128 + number])
+        self.assertEqual(count_games(self.path), 100)
+        expected = (20, 5, UNFINISHED, [27, 372, 155])
+        self.assertEqual(next(read_games(self.path, 77)), expected)
+        os.remove(index_path(self.path))
+        self.assertEqual(build_index(self.path), 100)
+        self.assertEqual(next(read_games(self.path, 77)), expected)
+        self.assertEqual(len(list(replay(self.path, 90))), 10)
+        with self.assertRaises(IndexError):
+            game_offset(self.path, 100)
+
+    def test_bad_log(self):
+        """
+        Checks a file without the header and a game that does not end as recorded are refused
+        :return:
+        """
+        with open(self.path, 'wb') as log:
+            log.write(b'not a log')
+        with self.assertRaises(ValueError):
+            list(read_games(self.path))
+        os.remove(self.path)
+        with MoveLogWriter(self.path) as writer:
+            writer.write_game(3, 3, 2, [0, 3, 1, 4, 2])
+        with self.assertRaises(ValueError):
+            list(replay(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
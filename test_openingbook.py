@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from engine import GameState
+from openingbook import HEADER, BookPlayer, OpeningBook, build, load
+from symmetry import canonical_move, symmetry_tables
+
+
+class OpeningBookTest(unittest.TestCase):
+    def test_symmetric_moves_share_entry(self):
+        """
+        Checks the four corners of an empty grid map to one canonical move, and that a book entry for a position is
+        found, turned the right way, in each of its rotations and reflections
+        :return:
+        """
+        game = GameState(5, 4)
+        self.assertEqual(len({canonical_move(game, corner) for corner in (0, 4, 20, 24)}), 1)
+        game.place(6)
+        game.place(12)
+        key, canonical = canonical_move(game, 8)
+        book = OpeningBook(5, 4, 3, {key: (canonical, 1)})
+        permutations = symmetry_tables(5)[0]
+        for permutation in permutations:
+            turned = GameState(5, 4)
+            turned.place(permutation[6])
+            turned.place(permutation[12])
+            # The position is its own mirror image along the diagonal, so 8 and 16 are the same move
+            self.assertIn(book.lookup(turned), (permutation[8], permutation[16]))
+        turned.place(0)
+        self.assertIsNone(book.lookup(turned))
+        self.assertIsNone(book.lookup(GameState(5, 3)))
+
+    def test_build_write_read(self):
+        """
+        Builds a 3x3 book from random self-play, checks it answers the empty grid with the centre, survives a round
+        trip through a file, is read once per path and refuses other files
+        :return:
+        """
+        book = build(3, 3, 400, 2, bot='random', explore=0, workers=1)
+        self.assertEqual(book.lookup(GameState(3)), 4)
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'book3.bin')
+        book.write(path)
+        loaded = load(path)
+        self.assertEqual((loaded.grid_size, loaded.win_length, loaded.depth, loaded.moves),
+                         (3, 3, 2, book.moves))
+        self.assertIs(load(path), loaded)
+        with open(path, 'r+b') as broken:
+            broken.truncate(HEADER.size + 1)
+        self.assertRaises(ValueError, OpeningBook.read, path)
+        shutil.rmtree(directory)
+
+    def test_book_player(self):
+        """
+        Checks a book player answers from the book without asking its fallback, and asks it once out of the book
+        :return:
+        """
+        class Fallback(object):
+            calls = 0
+
+            def choose_move(self, game):
+                Fallback.calls += 1
+                return game.legal_moves()[0]
+
+        game = GameState(15, 5)
+        key, canonical = canonical_move(game, 7 * 15 + 7)
+        player = BookPlayer(OpeningBook(15, 5, 1, {key: (canonical, 10)}), Fallback())
+        self.assertEqual(player.choose_move(game), 7 * 15 + 7)
+        self.assertEqual(Fallback.calls, 0)
+        game.place(7 * 15 + 7)
+        self.assertEqual(player.choose_move(game), 0)
+        self.assertEqual(Fallback.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from engine import GameState
+from parallel import ParallelMCTSPlayer, merge_results
+
+
+class ParallelMCTSPlayerTest(unittest.TestCase):
+    def test_merge_results(self):
+        """
+        Checks totals from two workers are summed per move
+        :return:
+        """
+        totals = merge_results([[(4, 10, 6.0), (0, 2, 0.5)], [(4, 3, 1.0), (8, 5, 2.5)]])
+        self.assertEqual(totals, {4: [13, 7.0], 0: [2, 0.5], 8: [5, 2.5]})
+
+    def test_takes_win(self):
+        """
+        Searches with two workers, checks the player completes its own line
+        :return:
+        """
+        game = GameState()
+        for index in (0, 3, 1, 4):
+            game.place(index)
+        with ParallelMCTSPlayer(workers=2, iterations=500, time_budget=None, seed=1) as player:
+            self.assertEqual(player.choose_move(game), 2)
+
+    def test_repeatable(self):
+        """
+        Checks two players with the same seed pick the same moves, with searches spread over the workers
+        :return:
+        """
+        game = GameState(7, 4)
+        game.place(24)
+        with ParallelMCTSPlayer(workers=3, iterations=200, time_budget=None, seed=5) as first, \
+                ParallelMCTSPlayer(workers=3, iterations=200, time_budget=None, seed=5) as second:
+            self.assertEqual(first.search(game), second.search(game))
+            self.assertEqual(first.choose_move(game), second.choose_move(game))
+            self.assertEqual(sum(visits for visits, wins in first.search(game).values()), 3 * 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
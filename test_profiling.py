@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import pygame
+
+from profiling import OVERLAY_BACKGROUND, Profiler
+
+
+class ProfilerTest(unittest.TestCase):
+    def test_record_on_other_threads(self):
+        """
+        Records new sections on worker threads while the overlay text and summary are built, as the computer's search
+        and the sound loader do during the game, checks nothing fails and every sample is kept
+        :return:
+        """
+        profiler = Profiler(window=100000)
+        stop = threading.Event()
+
+        def record(prefix):
+            for number in range(20000):
+                profiler.record('%s%d' % (prefix, number % 200), 0, 0.001)
+            stop.set()
+        workers = [threading.Thread(target=record, args=(prefix,)) for prefix in 'ab']
+        for worker in workers:
+            worker.start()
+        while not stop.is_set():
+            profiler.overlay_lines()
+            profiler.summary()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(sum(len(profiler.section_samples(name)) for name in profiler.section_names()), 40000)
+
+    def test_sections(self):
+        """
+        Times sections through the context manager and a wrapped method, checks the rolling window and histogram
+        :return:
+        """
+        profiler = Profiler(window=3)
+        for _ in range(5):
+            with profiler.section('draw'):
+                pass
+        self.assertEqual(len(profiler.samples['draw']), 3)
+        self.assertEqual(sum(profiler.histogram('draw')), 3)
+
+        class Target(object):
+            def work(self, value):
+                return value * 2
+        target = Target()
+        profiler.wrap(target, 'work', 'logic')
+        self.assertEqual(target.work(4), 8)
+        self.assertEqual(Target().work.__name__, 'work')
+        self.assertEqual(len(profiler.samples['logic']), 1)
+        profiler.record('frame', 0, 0.010)
+        profiler.record('frame', 0, 0.030)
+        self.assertAlmostEqual(profiler.fps(), 50)
+        self.assertEqual(profiler.percentile('frame', 0.99), 0.030)
+        self.assertIn('50.0 FPS', profiler.overlay_lines()[0])
+
+    def test_disabled(self):
+        """
+        Checks a disabled profiler records nothing and leaves methods alone
+        :return:
+        """
+        profiler = Profiler(enabled=False)
+        with profiler.section('draw'):
+            pass
+        profiler.frame()
+        target = Profiler(enabled=False)
+        method = target.frame
+        profiler.wrap(target, 'frame')
+        self.assertEqual(target.frame, method)
+        self.assertEqual(profiler.samples, {})
+        self.assertIsNone(profiler.draw_overlay(None))
+
+    def test_overlay_and_trace(self):
+        """
+        Draws the overlay on a surface and clears it, then writes a Chrome trace and a cProfile dump
+        :return:
+        """
+        pygame.font.init()
+        directory = tempfile.mkdtemp()
+        trace_path = os.path.join(directory, 'trace.json')
+        cprofile_path = os.path.join(directory, 'game.prof')
+        profiler = Profiler(trace_path=trace_path, cprofile_path=cprofile_path)
+        surface = pygame.Surface((300, 300))
+        surface.fill((0, 0, 255))
+        for _ in range(3):
+            profiler.frame()
+            with profiler.section('events'):
+                pass
+        rect = profiler.draw_overlay(surface)
+        self.assertEqual(surface.get_at((1, 1))[:3], OVERLAY_BACKGROUND)
+        profiler.clear_overlay(surface)
+        self.assertEqual(surface.get_at((1, 1))[:3], (0, 0, 255))
+        self.assertEqual(rect.topleft, (0, 0))
+        profiler.close()
+        with open(trace_path) as trace:
+            events = json.load(trace)['traceEvents']
+        self.assertEqual([event['name'] for event in events], ['events', 'frame', 'events', 'frame', 'events'])
+        self.assertGreater(os.path.getsize(cprofile_path), 0)
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+
+from server import GameServer
+
+
+class GameServerTest(unittest.TestCase):
+    def run_with_server(self, test):
+        """
+        Runs a coroutine function with a server listening on a free port
+        :param test: coroutine function taking the server and its port
+        :return:
+        """
+        async def run():
+            server = GameServer()
+            port = await server.start(port=0)
+            try:
+                await test(server, port)
+            finally:
+                await server.stop()
+        asyncio.run(run())
+
+    async def connect(self, port, join='JOIN'):
+        """
+        Connects a client and sends a JOIN line
+        :param port: server port
+        :param join: JOIN line to send
+        :return: tuple of (reader, writer)
+        """
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(join.encode('ascii') + b'\n')
+        return reader, writer
+
+    async def expect(self, reader, *lines):
+        """
+        Reads lines from the server and checks them
+        :param reader: asyncio.StreamReader
+        :param lines: expected lines
+        :return:
+        """
+        for line in lines:
+            self.assertEqual((await reader.readline()).decode('ascii').strip(), line)
+
+    def test_match(self):
+        """
+        Pairs two clients, plays a game to a win with an illegal and an out-of-turn move along the way
+        :return:
+        """
+        async def test(server, port):
+            first, first_writer = await self.connect(port)
+            await self.expect(first, 'WAIT')
+            second, second_writer = await self.connect(port)
+            await self.expect(first, 'START 1 3 3')
+            await self.expect(second, 'START 2 3 3')
+            second_writer.write(b'MOVE 4\n')
+            await self.expect(second, 'ERROR not your turn')
+            moves = [(first_writer, 1, 0), (second_writer, 2, 3), (first_writer, 1, 1), (second_writer, 2, 4),
+                     (first_writer, 1, 2)]
+            for writer, player, box in moves:
+                writer.write(b'MOVE %d\n' % box)
+                await self.expect(first, 'MOVED %d %d' % (player, box))
+                await self.expect(second, 'MOVED %d %d' % (player, box))
+                if box == 0:
+                    second_writer.write(b'MOVE 0\n')
+                    await self.expect(second, 'ERROR box 0 cannot be marked')
+            await self.expect(first, 'OVER 1')
+            await self.expect(second, 'OVER 1')
+            self.assertEqual(server.moves, 5)
+            first_writer.close()
+            second_writer.close()
+        self.run_with_server(test)
+
+    def test_rules_and_leaving(self):
+        """
+        Checks clients are only paired with the same rules, bad rules are refused, and a client whose opponent leaves
+        is told
+        :return:
+        """
+        async def test(server, port):
+            small, small_writer = await self.connect(port, 'JOIN 3')
+            large, large_writer = await self.connect(port, 'JOIN 15 5')
+            await self.expect(small, 'WAIT')
+            await self.expect(large, 'WAIT')
+            bad, bad_writer = await self.connect(port, 'JOIN 3 4')
+            await self.expect(bad, 'ERROR grid size must be at most 100 and win length at most the grid size')
+            other, other_writer = await self.connect(port, 'JOIN 15 5')
+            await self.expect(large, 'START 1 15 5')
+            await self.expect(other, 'START 2 15 5')
+            other_writer.write(b'QUIT\n')
+            await self.expect(large, 'LEFT')
+            self.assertEqual(list(server.waiting), [(3, 3)])
+            for writer in (small_writer, large_writer, bad_writer):
+                writer.close()
+        self.run_with_server(test)
+
+    def test_line_too_long(self):
+        """
+        Sends a line longer than the limit, checks the client is told and disconnected while the server goes on
+        :return:
+        """
+        async def test(server, port):
+            reader, writer = await self.connect(port, 'JOIN ' + '9' * server.line_limit)
+            await self.expect(reader, 'ERROR line too long')
+            self.assertEqual(await reader.readline(), b'')
+            writer.close()
+            other, other_writer = await self.connect(port)
+            await self.expect(other, 'WAIT')
+            other_writer.close()
+        self.run_with_server(test)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+import numpy
+
+from engine import GameState
+from simulate import BATCH_BYTES, BYTES_PER_BOX, batch_size_for, simulate, simulate_many, summarize
+
+
+class SimulateTest(unittest.TestCase):
+    def game_from_board(self, board, win_length):
+        """
+        Builds a GameState holding the marks of a simulated board
+        :param board: array of shape (grid_size, grid_size)
+        :param win_length: marks in a row needed to win
+        :return: GameState
+        """
+        grid_size = board.shape[0]
+        width = (grid_size * grid_size + 7) // 8
+        flat = board.reshape(-1)
+        data = GameState(grid_size, win_length).to_bytes()[:4]
+        for player in (1, 2):
+            data += sum(1 << int(index) for index in numpy.flatnonzero(flat == player)).to_bytes(width, 'little')
+        return GameState.from_bytes(data)
+
+    def test_matches_engine(self):
+        """
+        Rebuilds simulated games on GameState, with both the win table and the line counters, and checks the engine
+        agrees on every winner and length
+        :return:
+        """
+        for grid_size, win_length in ((3, 3), (4, 3), (6, 4)):
+            boards, winners, lengths = simulate(300, grid_size, win_length, seed=grid_size)
+            for board, winner, length in zip(boards, winners, lengths):
+                game = self.game_from_board(board, win_length)
+                self.assertEqual(game.moves, length)
+                self.assertEqual(game.winner, winner)
+                self.assertTrue(game.game_over)
+
+    def test_summarize(self):
+        """
+        Checks the 3x3 win rates for random play are close to the known 58.5% / 28.8% / 12.7%
+        :return:
+        """
+        summary = simulate_many(200000, seed=0, batch_size=50000)
+        self.assertEqual(summary['games'], 200000)
+        self.assertAlmostEqual(summary['player_1'], 0.585, delta=0.01)
+        self.assertAlmostEqual(summary['player_2'], 0.288, delta=0.01)
+        self.assertAlmostEqual(summary['draws'], 0.127, delta=0.01)
+        self.assertGreater(summary['average_length'], 5)
+        self.assertLess(summary['average_length'], 9)
+        boards, winners, lengths = simulate(1000, seed=0)
+        self.assertEqual(summarize(winners, lengths)['games'], 1000)
+
+    def test_batch_size(self):
+        """
+        Checks the default batch shrinks as the grid grows, keeping the memory of a 15x15 batch within the budget
+        :return:
+        """
+        self.assertGreater(batch_size_for(3), 500000)
+        self.assertLess(batch_size_for(15, 5), batch_size_for(7, 4))
+        self.assertLessEqual(batch_size_for(15, 5) * 225 * BYTES_PER_BOX, BATCH_BYTES)
+        self.assertEqual(batch_size_for(15, 5, budget=1), 1)
+        self.assertEqual(simulate_many(10, 15, 5, seed=0)['games'], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
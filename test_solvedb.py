@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from engine import GameState
+from solvedb import SolvedPositions, solve, write
+
+
+class SolvedPositionsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'solved3.db')
+        game, cls.positions = solve(3)
+        write(cls.path, game, cls.positions)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_solve(self):
+        """
+        Checks every reachable 3x3 position is solved and the empty grid is a draw
+        :return:
+        """
+        self.assertEqual(len(self.positions), 5478)
+        self.assertEqual(self.positions[GameState().hash][0], 0)
+
+    def test_lookup(self):
+        """
+        Opens the file, checks the player to move finds the winning box and a finished game has no move
+        :return:
+        """
+        with SolvedPositions(self.path) as solved:
+            game = GameState()
+            for index in (0, 3, 1, 4):
+                game.place(index)
+            self.assertTrue(solved.matches(game))
+            self.assertEqual(solved.lookup(game.hash), (1, 2))
+            game.place(2)
+            self.assertEqual(solved.lookup(game.hash), (-1, None))
+            self.assertFalse(solved.matches(GameState(4)))
+
+    def test_bad_file(self):
+        """
+        Checks a file without the header is refused
+        :return:
+        """
+        path = os.path.join(self.directory.name, 'bad.db')
+        with open(path, 'wb') as output:
+            output.write(b'\0' * 64)
+        self.assertRaises(ValueError, SolvedPositions, path)
+
+
+if __name__ == "__main__":
+    unittest.main()
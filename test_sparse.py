@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from engine import GameState
+from sparse import SparseGameState
+
+
+class SparseGameStateTest(unittest.TestCase):
+    def test_agrees_with_game_state(self):
+        """
+        Plays random games on a 9x9 grid needing 4 in a row, checks the winner, turn and marks after every move and undo
+        match GameState
+        :return:
+        """
+        generator = random.Random(5)
+        for _ in range(30):
+            dense, sparse = GameState(9, 4), SparseGameState(9, 4)
+            while not dense.game_over:
+                move = generator.choice(dense.legal_moves())
+                dense.place(move)
+                sparse.place(move)
+                self.assertEqual((sparse.winner, sparse.turn, sparse.moves), (dense.winner, dense.turn, dense.moves))
+            self.assertEqual([sparse.state_at(index) for index in range(81)], list(dense.cells))
+            while sparse.history:
+                self.assertEqual(sparse.undo(), dense.undo())
+                self.assertEqual((sparse.winner, sparse.turn), (dense.winner, dense.turn))
+            self.assertEqual(sparse.chunks, {})
+
+    def test_memory_scales_with_moves(self):
+        """
+        Plays a diagonal five at one corner of a 100000x100000 grid and a column at the other, checks only the touched
+        chunks are kept and the boxes next to the marks are offered
+        :return:
+        """
+        game = SparseGameState(100000, 5)
+        self.assertEqual(game.candidate_moves(), [50000 * 100000 + 50000])
+        for step in range(4):
+            game.place(step * 100000 + step)
+            game.place(99999 * 100000 + 99999 - step)
+        self.assertEqual(len(game.chunks), 2)
+        self.assertFalse(game.winner)
+        self.assertIn(4 * 100000 + 4, game.candidate_moves())
+        self.assertEqual(len(game.candidate_moves()), 15 + 6)
+        self.assertEqual(sorted(game.marks_in(0, 0, 15, 15)), [(step, step, 1) for step in range(4)])
+        game.place(4 * 100000 + 4)
+        self.assertEqual(game.winner, 1)
+        self.assertFalse(game.is_legal(5 * 100000 + 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from engine import GameState
+from threats import ThreatTracker
+
+
+class ThreatTrackerTest(unittest.TestCase):
+    def test_incremental_matches_rebuild(self):
+        """
+        Plays and takes back random moves on a 9x9 grid needing 4 in a row, checks the tracker always matches one built
+        from scratch, and that its totals give the search's evaluation
+        :return:
+        """
+        from ai import NegamaxPlayer
+        generator = random.Random(3)
+        game = GameState(9, 4)
+        tracker = ThreatTracker(game)
+        evaluator = NegamaxPlayer()
+        for _ in range(300):
+            if game.game_over or (game.history and generator.random() < 0.3):
+                game.undo()
+            else:
+                game.place(generator.choice(game.legal_moves()))
+            fresh = ThreatTracker(game.copy())
+            self.assertEqual((tracker.open, tracker.totals, tracker.scores, tracker.near),
+                             (fresh.open, fresh.totals, fresh.scores, fresh.near))
+            if not game.winner:
+                self.assertEqual(tracker.totals[game.turn] - tracker.totals[3 - game.turn], evaluator.evaluate(game))
+        game.reset()
+        self.assertEqual((tracker.near, tracker.totals), (set(), [None, 0, 0]))
+
+    def test_ranked(self):
+        """
+        Checks the centre opens the game, that replies stay next to the marks, and that a win comes before a block
+        and a block before anything else
+        :return:
+        """
+        game = GameState(15, 5)
+        tracker = ThreatTracker(game)
+        self.assertEqual(tracker.ranked(1), [112])
+        game.place(112)
+        self.assertEqual(len(tracker.ranked(2)), 4 * 8)
+        # Player 1 lines up four down column 7 from row 5 to 8, player 2 plays in the corners
+        for index in (0, 97, 14, 82, 210, 127):
+            game.place(index)
+        # Both five-box windows around the four are open, and the boxes above and below it block them
+        self.assertEqual(tracker.threats(1)[4], 2)
+        self.assertEqual(tracker.ranked(2), [67, 142])
+        game.place(67)
+        self.assertEqual(tracker.ranked(1), [142])
+        self.assertLess(len(tracker.ranked(2, 16)), len(game.legal_moves()) // 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import math
+import time
+import unittest
+
+from tournament import DRAW, FIRST_WON, SECOND_WON, EloTable, play_game, run_tournament, swiss_pairings
+
+
+class SleepingPlayer(object):
+    """
+    Bot that never answers
+    """
+
+    def __init__(self, seed=None):
+        pass
+
+    def choose_move(self, game):
+        time.sleep(600)
+
+
+class TournamentTest(unittest.TestCase):
+    def test_play_game(self):
+        """
+        Plays negamax against random on 3x3 from both sides, checks negamax never loses
+        :return:
+        """
+        for seed in range(4):
+            outcome, moves, forfeit = play_game(('negamax:1', 'random', 3, 3, 10.0, seed))
+            self.assertIn(outcome, (FIRST_WON, DRAW))
+            outcome, moves, forfeit = play_game(('random', 'negamax:1', 3, 3, 10.0, seed))
+            self.assertIn(outcome, (SECOND_WON, DRAW))
+            self.assertFalse(forfeit)
+
+    def test_time_limit(self):
+        """
+        Checks a bot that never answers loses on its first move once the time limit is up, rather than holding up the
+        game, and that without a limit the bots play in this process
+        :return:
+        """
+        start = time.perf_counter()
+        self.assertEqual(play_game(('random', 'test_tournament:SleepingPlayer', 3, 3, 0.5, 0)), (FIRST_WON, 1, True))
+        self.assertLess(time.perf_counter() - start, 60)
+        outcome, moves, forfeit = play_game(('random', 'random', 3, 3, None, 0))
+        self.assertFalse(forfeit)
+
+    def test_ratings(self):
+        """
+        Feeds a bot scoring 75% against another, checks the gap is close to the 191 points that score means, and that
+        a clean sweep still gives finite ratings
+        :return:
+        """
+        table = EloTable(['strong', 'weak'])
+        for game in range(400):
+            outcome = FIRST_WON if game % 4 else SECOND_WON
+            table.add(game % 2, 1 - game % 2, outcome if game % 2 == 0 else 3 - outcome)
+        strong, weak = table.ratings()
+        self.assertAlmostEqual(strong - weak, 191, delta=2)
+        self.assertLess(table.interval(0), 80)
+        sweep = EloTable(['a', 'b'])
+        sweep.add(0, 1, FIRST_WON)
+        self.assertTrue(all(math.isfinite(rating) for rating in sweep.ratings()))
+
+    def test_swiss_pairings(self):
+        """
+        Checks bots are paired by score and a rematch is avoided when another opponent is free
+        :return:
+        """
+        table = EloTable(['a', 'b', 'c', 'd'])
+        table.add(0, 1, FIRST_WON)
+        table.add(2, 3, FIRST_WON)
+        self.assertEqual(swiss_pairings(table, set()), [(0, 2), (1, 3)])
+        self.assertEqual(swiss_pairings(table, {frozenset((0, 2))}), [(0, 1), (2, 3)])
+
+    def test_run_tournament(self):
+        """
+        Runs a round robin of three bots over two worker processes and a Swiss tournament in this process, checks the
+        game counts and that negamax comes first
+        :return:
+        """
+        reports = []
+        table = run_tournament(['random', 'negamax:1', 'mcts:50'], games=6, workers=2, report_every=9,
+                               output=reports.append)
+        self.assertEqual(sum(sum(row) for row in table.games), 2 * 18)
+        self.assertEqual(len(reports), 2)
+        ratings = table.ratings()
+        self.assertEqual(max(range(3), key=lambda bot: ratings[bot]), 1)
+        table = run_tournament(['random', 'random', 'mcts:20', 'mcts:20'], games=2, grid_size=4, win_length=3,
+                               swiss_rounds=2, workers=1)
+        self.assertEqual([sum(row) for row in table.games], [4, 4, 4, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
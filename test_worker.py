@@ -0,0 +1,51 @@
+import queue
+import threading
+import unittest
+
+from engine import GameState
+from worker import BackgroundPlayer, position_key
+
+
+class BackgroundPlayerTest(unittest.TestCase):
+    def test_request_returns_at_once(self):
+        """
+        Asks a player that thinks until it is let go for a move, checks the requests return while it is still thinking,
+        that a request is not repeated for the same position, and that only the latest of the positions queued
+        meanwhile is searched
+        :return:
+        """
+        class SlowPlayer(object):
+            searched = []
+            started = threading.Event()
+            release = threading.Event()
+
+            def choose_move(self, game):
+                SlowPlayer.started.set()
+                SlowPlayer.release.wait(5)
+                SlowPlayer.searched.append(game.moves)
+                return game.legal_moves()[0]
+
+        moves = queue.Queue()
+        thinker = BackgroundPlayer(SlowPlayer(), lambda key, move: moves.put((key, move)))
+        game = GameState()
+        self.assertTrue(thinker.request(game))
+        self.assertFalse(thinker.request(game))
+        SlowPlayer.started.wait(5)
+        for index in (4, 0, 8):
+            game.place(index)
+            thinker.request(game)
+        self.assertEqual((SlowPlayer.searched, moves.qsize()), ([], 0))
+        SlowPlayer.release.set()
+        self.assertEqual(moves.get(timeout=5), ((0, GameState().hash), 0))
+        key, move = moves.get(timeout=5)
+        self.assertEqual((key, move), (position_key(game), 1))
+        self.assertEqual(SlowPlayer.searched, [0, 3])
+        thinker.done(key)
+        self.assertIsNone(thinker.pending)
+        thinker.close()
+        thinker.thread.join(5)
+        self.assertFalse(thinker.thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Threat tracking for k-in-a-row on large grids.
+
+A line here is one of the winning combinations from GameState.lines, the table behind Board.calculate_winners: a run of
+win_length boxes. A line is open for a player while the opponent has no mark in it, and an open line holding n of the
+player's marks is an open n, so with 5 in a row an open four wins next move unless it is blocked. ThreatTracker follows
+a game as an Observer and keeps, for each player, the open lines at each count, their total value for the search's
+evaluation, and a score for every box from the open lines through it. A move only touches the lines through its box.
+
+ranked() turns that into the moves worth searching: a win if there is one, otherwise the blocks the opponent's open
+fours force, otherwise the boxes sharing an open line with a mark, best first. On a 15x15 grid that is a few dozen
+boxes instead of a couple of hundred.
+
+    tracker = ThreatTracker(game)
+    moves = tracker.ranked(game.turn, 16)
+"""
+from engine import Observer
+
+
+class ThreatTracker(Observer):
+    """
+    Open lines of each player by the number of marks in them, kept up to date as a game is played
+    """
+
+    def __init__(self, game):
+        """
+        Starts from the game's current position and follows it from then on
+        :param game: GameState
+        """
+        self.game = game
+        win_length = game.win_length
+        # A box scores weights[n] for each open n through it. The base is more than twice the number of lines through
+        # a box, so one open n outranks every open n - 1 through a box, even counted twice for the player to move
+        base = 8 * win_length + 1
+        self.weights = (0,) + tuple(base ** count for count in range(1, win_length + 1))
+        # Value of an open n for the evaluation, as NegamaxPlayer has always scored it
+        self.values = (0,) + tuple(1 << (2 * count) for count in range(1, win_length + 1))
+        self.rebuild()
+        game.add_observer(self)
+
+    def rebuild(self):
+        """
+        Works out the open lines, totals and box scores from the game's line counters
+        :return:
+        """
+        game = self.game
+        # open[player][n] holds the numbers of the player's open lines with n marks; open[player][0] stays empty
+        self.open = [None] + [[set() for _ in range(game.win_length + 1)] for _ in (1, 2)]
+        # Sum of values over each player's open lines
+        self.totals = [None, 0, 0]
+        # scores[player][index] is the sum of weights over the player's open lines through the box
+        self.scores = [None, [0] * game.size, [0] * game.size]
+        # Boxes on at least one open line holding a mark, marked or not
+        self.near = set()
+        counts = game.counts
+        for line in range(len(game.lines)):
+            for player in (1, 2):
+                if counts[player][line] and not counts[3 - player][line]:
+                    self.shift(player, line, 0, counts[player][line])
+
+    def shift(self, player, line, old, new):
+        """
+        Moves one of a player's lines from one count to another, updating the totals and the scores of its boxes
+        :param player: 1 or 2
+        :param line: line number
+        :param old: marks the line was counted with, 0 if it was not open with a mark
+        :param new: marks it is counted with now, 0 if it is no longer open with a mark
+        :return:
+        """
+        lines = self.open[player]
+        if old:
+            lines[old].discard(line)
+        if new:
+            lines[new].add(line)
+        self.totals[player] += self.values[new] - self.values[old]
+        delta = self.weights[new] - self.weights[old]
+        scores = self.scores[player]
+        other = self.scores[3 - player]
+        near = self.near
+        for index in self.game.lines[line]:
+            scores[index] += delta
+            if scores[index] or other[index]:
+                near.add(index)
+            else:
+                near.discard(index)
+
+    def on_reset(self, game):
+        self.rebuild()
+
+    def on_move(self, game, index, player):
+        counts = game.counts
+        mine = counts[player]
+        theirs = counts[3 - player]
+        for line in game.cell_lines[index]:
+            if not theirs[line]:
+                self.shift(player, line, mine[line] - 1, mine[line])
+            elif mine[line] == 1:
+                # The opponent's line is blocked
+                self.shift(3 - player, line, theirs[line], 0)
+
+    def on_undo(self, game, index, player):
+        counts = game.counts
+        mine = counts[player]
+        theirs = counts[3 - player]
+        for line in game.cell_lines[index]:
+            if not theirs[line]:
+                self.shift(player, line, mine[line] + 1, mine[line])
+            elif not mine[line]:
+                # The opponent's line is open again
+                self.shift(3 - player, line, 0, theirs[line])
+
+    def threats(self, player):
+        """
+        Counts a player's open lines by the number of marks in them
+        :param player: 1 or 2
+        :return: list where entry n is the number of open n's, for n from 0 to win_length - 1; entry 0 is always 0
+        """
+        return [len(lines) for lines in self.open[player][:-1]]
+
+    def winning_boxes(self, player):
+        """
+        Finds the boxes that would complete one of a player's open lines
+        :param player: 1 or 2
+        :return: sorted list of box indices
+        """
+        if self.game.win_length < 2:
+            return []
+        cells = self.game.cells
+        lines = self.game.lines
+        return sorted({index for line in self.open[player][-2] for index in lines[line] if not cells[index]})
+
+    def ranked(self, player, limit=None):
+        """
+        Lists the moves worth searching for a player, best first: the boxes that win if there are any, otherwise the
+        boxes that block the opponent's wins, otherwise the empty boxes sharing an open line with a mark, ranked by the
+        player's own open lines through them counted twice plus the opponent's
+        :param player: player to move
+        :param limit: largest number of boxes to return, or None for all of them
+        :return: list of box indices
+        """
+        game = self.game
+        if not game.moves:
+            middle = game.grid_size // 2
+            return [middle * game.grid_size + middle]
+        moves = self.winning_boxes(player) or self.winning_boxes(3 - player)
+        if not moves:
+            cells = game.cells
+            mine = self.scores[player]
+            theirs = self.scores[3 - player]
+            moves = sorted((index for index in self.near if not cells[index]),
+                           key=lambda index: (-2 * mine[index] - theirs[index], index))
+            if not moves:
+                # Every line is blocked, so no move matters
+                moves = game.legal_moves()
+        return moves if limit is None else moves[:limit]
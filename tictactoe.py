@@ -1,21 +1,176 @@
-import pygame, sys
-from pygame.locals import QUIT, MOUSEBUTTONUP
+import time
+started = time.perf_counter()
 
-from lib import Board
+import argparse, atexit, pygame, sys
+from pygame.locals import QUIT, KEYDOWN, MOUSEBUTTONUP, MOUSEMOTION, VIDEOEXPOSE, USEREVENT, K_r, K_u
 
+from lib import Board, BoardRenderer, sound_bank
+from profiling import Profiler, enabled_from_environment
 
-pygame.init()
+
+parser = argparse.ArgumentParser(description='Tic Tac Toe')
+parser.add_argument('--ai', action='store_true', help='let the computer play as player 2')
+parser.add_argument('--think', type=float, default=1.0 / 30, metavar='SECONDS',
+                    help='time the computer may search for each move; the window stays responsive meanwhile')
+parser.add_argument('--solved', help='solved-position file from solvedb.py for the computer to look moves up in')
+parser.add_argument('--book', help='opening book from openingbook.py for the computer\'s first moves')
+parser.add_argument('--record', metavar='PATH', help='append every game to a move log, see movelog.py')
+parser.add_argument('--connect', metavar='HOST:PORT', help='play against someone else through server.py')
+parser.add_argument('--profile', action='store_true',
+                    help='time each part of the frame and show FPS and frame times in the corner of the window')
+parser.add_argument('--trace', metavar='PATH', help='with profiling, write a Chrome trace of every frame on exit')
+parser.add_argument('--cprofile', metavar='PATH', help='with profiling, write cProfile stats on exit')
+parser.add_argument('--startup-time', action='store_true', help='print how long the first frame took to show')
+args = parser.parse_args()
+
+profiler = Profiler(args.profile or bool(args.trace or args.cprofile) or enabled_from_environment(),
+                    trace_path=args.trace, cprofile_path=args.cprofile)
+if profiler.enabled:
+    atexit.register(lambda: print(profiler.summary()))
+
+# Only the display is started here; fonts start when text is first drawn and the mixer with the sounds below
+pygame.display.init()
 clock = pygame.time.Clock()
+# The shared sound bank is wrapped before its sounds start loading below
+profiler.wrap(sound_bank(), 'load', 'sound_load')
+profiler.wrap(sound_bank(), 'play', 'sound_play')
 board = Board(grid_size=3, box_size=100, border=50, line_width=10)
+profiler.wrap(board, 'process_click')
+profiler.wrap(board, 'check_game_over', 'win_check')
+for observer in board.game.observers:
+    if isinstance(observer, BoardRenderer):
+        for method in ('on_reset', 'on_move', 'on_undo', 'on_game_over'):
+            profiler.wrap(observer, method, 'draw')
+
+# Show the empty board first, then load what the first move needs
+pygame.display.update(board.pop_dirty_rects())
+first_frame = time.perf_counter()
+if profiler.enabled:
+    profiler.record('first_frame', started, first_frame)
+if args.startup_time:
+    print('First frame after %.1f ms' % ((first_frame - started) * 1000), file=sys.stderr)
+sound_bank().load_in_background()
+
+# The computer searches on a worker thread and posts its move back as an AI_MOVE event, so the window keeps drawing
+# and taking input however long it thinks. The board is only ever changed on this thread
+AI_MOVE = pygame.event.custom_type()
+opponent = None
+if args.ai:
+    from ai import NegamaxPlayer
+    from worker import BackgroundPlayer, position_key
+    player = NegamaxPlayer(time_budget=args.think)
+    profiler.wrap(player, 'choose_move', 'ai')
+    opponent = BackgroundPlayer(player, lambda position, move: pygame.event.post(
+        pygame.event.Event(AI_MOVE, position=position, move=move)))
+if args.solved:
+    board.load_solved(args.solved)
+if args.book:
+    board.load_book(args.book)
+if args.record:
+    board.record(args.record)
+
+# With --connect the server decides every move; the player this window plays is only known once the match starts
+remote = None
+local_player = None
+if args.connect:
+    from client import RemoteGame
+    host, port = args.connect.rsplit(':', 1)
+    # The reader thread only posts lines to the event queue, the board is changed on this thread
+    remote = RemoteGame(host, int(port), lambda line: pygame.event.post(pygame.event.Event(USEREVENT, line=line)))
+    remote.join(board.grid_size, board.game.win_length)
+    pygame.display.set_caption('Tic Tac Toe - Waiting for an opponent')
+
+# Only wake up for the events the game handles
+pygame.event.set_blocked(None)
+pygame.event.set_allowed([QUIT, KEYDOWN, MOUSEBUTTONUP, MOUSEMOTION, VIDEOEXPOSE, USEREVENT, AI_MOVE])
 
 while True:
-    for event in pygame.event.get():
-        if event.type == QUIT:
-            pygame.quit()
-            sys.exit()
-        elif event.type == MOUSEBUTTONUP:
-            x, y = event.pos
-            board.process_click(x, y)
-
-    pygame.display.update()
+    profiler.frame()
+    overlay = profiler.draw_overlay(board.surface)
+
+    # Push only the areas drawn on since the last frame, if any
+    dirty_rects = board.pop_dirty_rects()
+    if overlay is not None:
+        dirty_rects.append(overlay)
+    if dirty_rects:
+        with profiler.section('display_update'):
+            pygame.display.update(dirty_rects)
+
+    # Sleep until something happens instead of polling while the board is idle. While profiling, the loop keeps
+    # running at the clock's rate so the frame times mean something and the overlay stays current
+    events = pygame.event.get() if profiler.enabled else [pygame.event.wait()] + pygame.event.get()
+    # The game draws on the surface without the overlay, which is drawn again at the top of the next frame
+    profiler.clear_overlay(board.surface)
+    with profiler.section('events'):
+        for event in events:
+            if event.type == QUIT:
+                if remote is not None:
+                    remote.close()
+                if opponent is not None:
+                    opponent.close()
+                pygame.quit()
+                sys.exit()
+            elif event.type == MOUSEBUTTONUP and remote is not None:
+                x, y = event.pos
+                if board.game_over:
+                    if board.rect1.collidepoint(x, y):
+                        local_player = None
+                        remote.join(board.grid_size, board.game.win_length)
+                    board.ending_menu(x, y)
+                    if local_player is None:
+                        pygame.display.set_caption('Tic Tac Toe - Waiting for an opponent')
+                elif board.turn == local_player:
+                    box = board.get_box_at_pixel(x, y)
+                    if box is not None and box.state == 0:
+                        remote.send_move(box.index)
+            elif event.type == MOUSEBUTTONUP:
+                # While the computer thinks, only the end of game menu takes clicks
+                if opponent is None or board.turn == 1 or board.game_over:
+                    x, y = event.pos
+                    board.process_click(x, y)
+            elif event.type == MOUSEMOTION:
+                board.highlight_at(*event.pos)
+            elif event.type == KEYDOWN and remote is None and event.key in (K_u, K_r):
+                # U takes a move back and R plays it again; against the computer its reply goes with it
+                step = board.undo if event.key == K_u else board.redo
+                step()
+                if opponent is not None and board.turn == 2:
+                    step()
+            elif event.type == VIDEOEXPOSE:
+                board.mark_dirty()
+            elif event.type == AI_MOVE:
+                opponent.done(event.position)
+                # A move chosen before an undo or a new game is for a position no longer on the board
+                if event.position == position_key(board.game) and board.turn == 2 and not board.game_over:
+                    board.play_turn(board.boxes[event.move])
+                    board.check_game_over()
+            elif event.type == USEREVENT:
+                words = event.line.split() if event.line is not None else ['CLOSED']
+                if words[0] == 'START':
+                    board.setup()
+                    local_player = int(words[1])
+                    pygame.display.set_caption('Tic Tac Toe - You are player %d' % local_player)
+                elif words[0] == 'MOVED':
+                    board.play_turn(board.boxes[int(words[2])])
+                    board.check_game_over()
+                elif words[0] == 'LEFT':
+                    board.setup()
+                    local_player = None
+                    remote.join(board.grid_size, board.game.win_length)
+                    pygame.display.set_caption('Tic Tac Toe - Opponent left, waiting for another')
+                elif words[0] == 'ERROR':
+                    pygame.display.set_caption('Tic Tac Toe - %s' % ' '.join(words[1:]))
+                elif words[0] == 'CLOSED':
+                    local_player = None
+                    pygame.display.set_caption('Tic Tac Toe - Disconnected from the server')
+
+    # Solved positions and book moves are instant lookups; anything else is searched on the worker thread
+    if opponent is not None and remote is None and board.turn == 2 and not board.game_over:
+        move = board.best_move()
+        if move is None:
+            opponent.request(board.game)
+        else:
+            board.play_turn(board.boxes[move])
+            board.check_game_over()
+
     clock.tick(30)
@@ -0,0 +1,461 @@
+"""
+Tournaments between bots on headless boards.
+
+Bots are named by spec strings: 'random', 'negamax:<seconds per move>', 'mcts:<iterations>', or 'module:Class' for any
+class whose instances have a choose_move(game) method and whose constructor takes a seed. Each game is played in a
+worker process on a headless Board and only its outcome comes back, so a run of any length keeps just the win, draw
+and loss counts of each pair of bots. Players swap who moves first from one game to the next, a bot that takes longer
+than the time limit over a move or picks an illegal box loses the game, and ratings with 95% intervals are printed
+as results come in. With a time limit, the bots play from two child processes of each worker, and a process is
+stopped as soon as its bot runs out of time, so a bot that never answers loses the game instead of holding up the
+worker.
+
+    python tournament.py random mcts:200 negamax:0.05 --games 100
+    python tournament.py random mcts:100 mcts:400 negamax:0.02 --swiss --rounds 5 --games 20 --grid-size 7 --win-length 4
+"""
+import argparse
+import importlib
+import math
+import multiprocessing
+import os
+import random
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from engine import GameState
+from lib import Board
+
+
+# Outcomes of a game, from the point of view of the bot that moved first
+FIRST_WON, SECOND_WON, DRAW = 1, 2, 0
+
+# Ratings are reported relative to the average of all bots
+ELO_SCALE = 400 / math.log(10)
+
+# Games in flight per worker; results are taken as they finish, so memory does not grow with the number of games
+QUEUE_PER_WORKER = 4
+
+# BotProcess of each seat, kept between games
+_bot_processes = {}
+
+
+class RandomPlayer(object):
+    """
+    Marks a random empty box
+    """
+
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+
+    def choose_move(self, game):
+        return self.random.choice(game.legal_moves())
+
+
+def make_bot(spec, seed=None):
+    """
+    Creates a bot from its spec string
+    :param spec: 'random', 'negamax:<seconds>', 'mcts:<iterations>' or 'module:Class'
+    :param seed: seed for bots that play randomly
+    :return: object with a choose_move(game) method
+    """
+    name, _, argument = spec.partition(':')
+    if name == 'random':
+        return RandomPlayer(seed)
+    if name == 'negamax':
+        from ai import NegamaxPlayer
+        return NegamaxPlayer(time_budget=float(argument or 1.0 / 30))
+    if name == 'mcts':
+        from mcts import MCTSPlayer
+        return MCTSPlayer(iterations=int(argument or 1000), time_budget=None, seed=seed)
+    if argument:
+        return getattr(importlib.import_module(name), argument)(seed)
+    raise ValueError('Unknown bot %s' % spec)
+
+
+def serve_bot(connection):
+    """
+    Runs in a child process started by BotProcess: creates a bot for each game it is told about, keeps a copy of the
+    game up to date with the moves it is sent and answers each batch of moves with the bot's move
+    :param connection: child end of a multiprocessing Pipe
+    :return:
+    """
+    # SDL turns SIGTERM into a quit event once pygame is initialised, and a forked child keeps that handler, so
+    # BotProcess.close could not stop the child
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    game = bot = None
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if isinstance(message, tuple):
+            spec, seed, grid_size, win_length = message
+            game = GameState(grid_size, win_length)
+            bot = make_bot(spec, seed)
+            connection.send(None)
+        else:
+            for index in message:
+                game.place(index)
+            connection.send(bot.choose_move(game))
+
+
+class BotProcess(object):
+    """
+    A child process playing one bot's moves at a time, so a move that goes over the time limit can be cut off by
+    stopping the process. It is kept from one game to the next as long as its bots answer in time
+    """
+
+    def __init__(self):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=serve_bot, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.spec = None
+        # Number of the game's moves already sent to the child
+        self.sent = 0
+        # True while a request has not been answered
+        self.busy = False
+
+    def send(self, message):
+        self.connection.send(message)
+        self.busy = True
+
+    def receive(self):
+        """
+        Reads the child's answer to the last request
+        :return: the answer
+        """
+        try:
+            answer = self.connection.recv()
+        except EOFError:
+            raise RuntimeError('Bot %s stopped without answering' % self.spec)
+        self.busy = False
+        return answer
+
+    def new_game(self, spec, seed, grid_size, win_length):
+        """
+        Creates the bot for a game and waits until it is ready; creating it is not timed
+        :param spec: bot spec
+        :param seed: seed for bots that play randomly
+        :param grid_size: number of boxes along one side of the grid
+        :param win_length: marks in a row needed to win
+        :return:
+        """
+        self.spec = spec
+        self.sent = 0
+        self.send((spec, seed, grid_size, win_length))
+        self.receive()
+
+    def choose_move(self, game, time_limit):
+        """
+        Asks for a move, stopping the child if it has not answered within the time limit
+        :param game: GameState of the game being played
+        :param time_limit: seconds
+        :return: box index, or None if the time ran out
+        """
+        self.send(game.history[self.sent:])
+        self.sent = len(game.history)
+        if not self.connection.poll(time_limit):
+            self.close()
+            return None
+        return self.receive()
+
+    def close(self):
+        """
+        Stops the child process
+        :return:
+        """
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+def bot_process(seat):
+    """
+    Gets this process's bot process for a seat, starting a new one if the last was stopped or left waiting on a move
+    :param seat: 1 for the bot moving first, 2 for the other
+    :return: BotProcess
+    """
+    # Keyed by process id too, as a forked worker inherits the dict but cannot use its parent's children
+    key = (os.getpid(), seat)
+    process = _bot_processes.get(key)
+    if process is not None and process.busy and process.process.is_alive():
+        process.close()
+    if process is None or not process.process.is_alive():
+        process = _bot_processes[key] = BotProcess()
+    return process
+
+
+def play_game(job):
+    """
+    Plays one game between two bots on a headless board
+    :param job: tuple of (first bot spec, second bot spec, grid_size, win_length, time limit in seconds or None for
+                no limit, seed)
+    :return: tuple of (outcome, moves played, True if the game was lost by running out of time or an illegal move)
+    """
+    first, second, grid_size, win_length, time_limit, seed = job
+    board = Board(grid_size, headless=True, win_length=win_length)
+    if time_limit is None:
+        bots = (None, make_bot(first, seed), make_bot(second, seed + 1))
+    else:
+        bots = (None, bot_process(1), bot_process(2))
+        bots[1].new_game(first, seed, grid_size, win_length)
+        bots[2].new_game(second, seed + 1, grid_size, win_length)
+    while not board.game_over:
+        player = board.turn
+        if time_limit is None:
+            move = bots[player].choose_move(board.game)
+        else:
+            move = bots[player].choose_move(board.game, time_limit)
+        if move is None or not board.game.is_legal(move):
+            return 3 - player, board.game.moves, True
+        board.play_turn(board.boxes[move])
+        board.check_game_over()
+    return board.check_for_winner(), board.game.moves, False
+
+
+def run_games(jobs, workers=None):
+    """
+    Plays games over a pool of worker processes, keeping only a few in flight at a time
+    :param jobs: iterable of (key, job), where job is the argument of play_game; it is read lazily
+    :param workers: number of processes, defaults to the number of CPUs; 1 plays the games in this process
+    :return: generator of (key, result of play_game), in the order games finish
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for key, job in jobs:
+            yield key, play_game(job)
+        return
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(workers) as executor:
+        pending = {}
+        while True:
+            for key, job in jobs:
+                pending[executor.submit(play_game, job)] = key
+                if len(pending) >= workers * QUEUE_PER_WORKER:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+class EloTable(object):
+    """
+    Running win, draw and loss counts between bots, turned into ratings on demand
+    """
+
+    def __init__(self, bots):
+        """
+        :param bots: bot specs
+        """
+        self.bots = list(bots)
+        count = len(self.bots)
+        # points[i][j] is the score of bot i against bot j, a win counting 1 and a draw 0.5; games[i][j] is the count
+        self.points = [[0.0] * count for _ in range(count)]
+        self.games = [[0] * count for _ in range(count)]
+        # Per bot: wins, draws, losses, forfeits
+        self.records = [[0, 0, 0, 0] for _ in range(count)]
+        self.moves = 0
+
+    def add(self, first, second, outcome, moves=0, forfeit=False):
+        """
+        Adds the result of a game
+        :param first: index of the bot that moved first
+        :param second: index of the other bot
+        :param outcome: FIRST_WON, SECOND_WON or DRAW
+        :param moves: moves played
+        :param forfeit: True if the loser lost by time or an illegal move
+        :return:
+        """
+        score = {FIRST_WON: 1.0, SECOND_WON: 0.0, DRAW: 0.5}[outcome]
+        self.points[first][second] += score
+        self.points[second][first] += 1 - score
+        self.games[first][second] += 1
+        self.games[second][first] += 1
+        self.moves += moves
+        if outcome == DRAW:
+            self.records[first][1] += 1
+            self.records[second][1] += 1
+        else:
+            winner, loser = (first, second) if outcome == FIRST_WON else (second, first)
+            self.records[winner][0] += 1
+            self.records[loser][2] += 1
+            if forfeit:
+                self.records[loser][3] += 1
+
+    def score(self, bot):
+        """
+        Gets a bot's total points
+        :param bot: bot index
+        :return: float
+        """
+        return sum(self.points[bot])
+
+    def ratings(self, iterations=200):
+        """
+        Fits Bradley-Terry ratings on the Elo scale to the results. Each pair that has played gets one extra drawn game,
+        which keeps the ratings of bots that won or lost every game finite
+        :param iterations: Newton steps
+        :return: list of ratings, averaging 0
+        """
+        count = len(self.bots)
+        ratings = [0.0] * count
+        for _ in range(iterations):
+            for i in range(count):
+                actual = expected = variance = 0.0
+                for j in range(count):
+                    games = self.games[i][j]
+                    if not games:
+                        continue
+                    p = 1 / (1 + 10 ** ((ratings[j] - ratings[i]) / 400))
+                    actual += self.points[i][j] + 0.5
+                    expected += (games + 1) * p
+                    variance += (games + 1) * p * (1 - p)
+                if variance:
+                    ratings[i] += ELO_SCALE * (actual - expected) / variance
+            mean = sum(ratings) / count
+            ratings = [rating - mean for rating in ratings]
+        return ratings
+
+    def interval(self, bot):
+        """
+        Gets the half-width of a 95% interval on a bot's rating, from the spread of its game scores
+        :param bot: bot index
+        :return: Elo points, or infinity before any game
+        """
+        wins, draws, losses, forfeits = self.records[bot]
+        games = wins + draws + losses
+        if not games:
+            return float('inf')
+        # One extra draw, as in ratings, keeps the score strictly between 0 and 1
+        score = (wins + 0.5 * draws + 0.5) / (games + 1)
+        variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+        error = math.sqrt(max(variance, 1e-9) / games)
+        return 1.96 * error * ELO_SCALE / (score * (1 - score))
+
+    def report(self):
+        """
+        Formats the standings
+        :return: str
+        """
+        ratings = self.ratings()
+        lines = ['%-4s %-24s %7s %7s %8s %7s %6s %6s %6s %8s' % ('rank', 'bot', 'elo', '+/-', 'score', 'games', 'won',
+                                                                'drawn', 'lost', 'forfeits')]
+        order = sorted(range(len(self.bots)), key=lambda bot: -ratings[bot])
+        for rank, bot in enumerate(order, 1):
+            wins, draws, losses, forfeits = self.records[bot]
+            games = wins + draws + losses
+            lines.append('%-4d %-24s %7.0f %7.0f %7.1f%% %7d %6d %6d %6d %8d'
+                         % (rank, self.bots[bot], ratings[bot], self.interval(bot),
+                            100.0 * self.score(bot) / games if games else 0, games, wins, draws, losses, forfeits))
+        return '\n'.join(lines)
+
+
+def round_robin_pairings(count):
+    """
+    Pairs every bot with every other
+    :param count: number of bots
+    :return: list of (i, j) index pairs
+    """
+    return [(i, j) for i in range(count) for j in range(i + 1, count)]
+
+
+def swiss_pairings(table, played):
+    """
+    Pairs bots with similar scores, avoiding rematches where it can. A bot left over with an odd number of bots sits
+    the round out
+    :param table: EloTable
+    :param played: set of frozenset pairs that have met
+    :return: list of (i, j) index pairs
+    """
+    waiting = sorted(range(len(table.bots)), key=lambda bot: (-table.score(bot), bot))
+    pairs = []
+    while len(waiting) > 1:
+        bot = waiting.pop(0)
+        opponent = next((other for other in waiting if frozenset((bot, other)) not in played), waiting[0])
+        waiting.remove(opponent)
+        pairs.append((bot, opponent))
+    return pairs
+
+
+def pairing_jobs(bots, pairs, games, grid_size, win_length, time_limit, seed):
+    """
+    Lists the games of a set of pairings, alternating which bot of each pair moves first
+    :param bots: bot specs
+    :param pairs: (i, j) index pairs
+    :param games: games per pair
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win
+    :param time_limit: seconds allowed per move, or None for no limit
+    :param seed: seed of the first game; each game gets its own
+    :return: generator of ((first index, second index), job for play_game)
+    """
+    for pair_number, (i, j) in enumerate(pairs):
+        for game in range(games):
+            first, second = (i, j) if game % 2 == 0 else (j, i)
+            game_seed = seed + 2 * (pair_number * games + game)
+            yield (first, second), (bots[first], bots[second], grid_size, win_length, time_limit, game_seed)
+
+
+def run_tournament(bots, games=10, grid_size=3, win_length=None, time_limit=1.0, swiss_rounds=None, workers=None,
+                   seed=0, report_every=None, output=print):
+    """
+    Plays a tournament and keeps the standings
+    :param bots: bot specs
+    :param games: games per pairing
+    :param grid_size: number of boxes along one side of the grid
+    :param win_length: marks in a row needed to win, defaults to grid_size
+    :param time_limit: seconds allowed per move, or None for no limit
+    :param swiss_rounds: number of Swiss rounds, or None for a round robin
+    :param workers: number of processes, 1 to play in this process
+    :param seed: seed for the bots' random choices
+    :param report_every: print the standings after this many games, or None
+    :param output: function taking the report text
+    :return: EloTable
+    """
+    if win_length is None:
+        win_length = grid_size
+    table = EloTable(bots)
+    finished = 0
+    if swiss_rounds is None:
+        rounds = [round_robin_pairings(len(bots))]
+    else:
+        rounds = range(swiss_rounds)
+    played = set()
+    for number, pairs in enumerate(rounds):
+        if swiss_rounds is not None:
+            pairs = swiss_pairings(table, played)
+            played.update(frozenset(pair) for pair in pairs)
+        jobs = pairing_jobs(bots, pairs, games, grid_size, win_length, time_limit, seed + 1000003 * number)
+        for (first, second), (outcome, moves, forfeit) in run_games(jobs, workers):
+            table.add(first, second, outcome, moves, forfeit)
+            finished += 1
+            if report_every and finished % report_every == 0:
+                output('After %d games\n%s\n' % (finished, table.report()))
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Play bots against each other and rate them')
+    parser.add_argument('bots', nargs='+', help="bot specs: random, negamax:<seconds>, mcts:<iterations>, module:Class")
+    parser.add_argument('--games', type=int, default=10, help='games per pairing, alternating who moves first')
+    parser.add_argument('--grid-size', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--time-limit', type=float, default=1.0,
+                        help='seconds per move before a bot forfeits, 0 for no limit (bots then play in the worker)')
+    parser.add_argument('--swiss', action='store_true', help='pair bots by score instead of playing a round robin')
+    parser.add_argument('--rounds', type=int, default=5, help='rounds of a Swiss tournament')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report-every', type=int, default=1000, help='print the standings every so many games')
+    args = parser.parse_args()
+    start = time.perf_counter()
+    table = run_tournament(args.bots, args.games, args.grid_size, args.win_length, args.time_limit or None,
+                           args.rounds if args.swiss else None, args.workers, args.seed, args.report_every)
+    elapsed = time.perf_counter() - start
+    print(table.report())
+    games = sum(sum(row) for row in table.games) // 2
+    print('%d games, %d moves in %.1f s' % (games, table.moves, elapsed))
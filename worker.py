@@ -0,0 +1,85 @@
+"""
+Background thinking for computer players.
+
+A search can take far longer than a frame, so BackgroundPlayer runs a player's choose_move on its own thread. The game
+loop hands it a snapshot of the position, a copy of the GameState that nothing else touches, and goes on pumping
+events and drawing. The move comes back through a callback, which in the game posts a pygame event, so the board is
+still only changed on the main thread. Each snapshot is tagged with the position's move count and hash, so a move that
+arrives after an undo or a new game is recognised as stale and dropped.
+
+    thinker = BackgroundPlayer(NegamaxPlayer(time_budget=2), lambda position, move: print(position, move))
+    thinker.request(board.game)
+"""
+import queue
+import threading
+
+
+def position_key(game):
+    """
+    Tells positions apart well enough to match a move to the position it was chosen for
+    :param game: GameState
+    :return: tuple of (moves played, Zobrist hash)
+    """
+    return game.moves, game.hash
+
+
+class BackgroundPlayer(object):
+    """
+    Runs a player's searches on a daemon thread, one position at a time, always on the latest position asked for
+    """
+
+    def __init__(self, player, on_move):
+        """
+        :param player: object with a choose_move(game) method; only the worker thread calls it
+        :param on_move: called on the worker thread with (position key, box index) once a move is chosen
+        """
+        self.player = player
+        self.on_move = on_move
+        self.requests = queue.Queue()
+        # Key of the last position asked for whose move has not been taken with done, read on the caller's thread only
+        self.pending = None
+        self.thread = threading.Thread(target=self.run, name='ai', daemon=True)
+        self.thread.start()
+
+    def request(self, game):
+        """
+        Asks for a move in a position, unless that position is already being thought about. Returns at once
+        :param game: GameState, copied before this returns
+        :return: True if a new search was queued
+        """
+        key = position_key(game)
+        if key == self.pending:
+            return False
+        self.pending = key
+        self.requests.put((key, game.copy()))
+        return True
+
+    def done(self, key):
+        """
+        Marks the move for a position as received, so the position can be asked for again
+        :param key: position key passed to on_move
+        :return:
+        """
+        if key == self.pending:
+            self.pending = None
+
+    def run(self):
+        """
+        Worker thread: searches the latest queued position, skipping any asked for before it, until closed
+        :return:
+        """
+        while True:
+            request = self.requests.get()
+            while request is not None and not self.requests.empty():
+                request = self.requests.get()
+            if request is None:
+                return
+            key, snapshot = request
+            self.on_move(key, self.player.choose_move(snapshot))
+
+    def close(self):
+        """
+        Stops the worker thread once its current search is over
+        :return:
+        """
+        self.requests.put(None)